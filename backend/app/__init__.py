@@ -1,15 +1,20 @@
+import logging
+
 from flask import Flask
 from flask_sqlalchemy import SQLAlchemy
 from flask_migrate import Migrate
 from flask_cors import CORS
 from dotenv import load_dotenv
+from app.db_routing import RoutingSession
+from app.logging_config import configure_logging
 
 # Load environment variables
 load_dotenv()
 
-# Initialize SQLAlchemy
-db = SQLAlchemy()
+# Initialize SQLAlchemy; reads of replica_reads views may go to a replica
+db = SQLAlchemy(session_options={"class_": RoutingSession})
 migrate = Migrate()
+logger = logging.getLogger(__name__)
 
 
 def create_app():
@@ -19,7 +24,20 @@ def create_app():
 
     # Configure the app
     app.config["SECRET_KEY"] = os.environ.get("SECRET_KEY", "dev-key")
-    app.config["SQLALCHEMY_DATABASE_URI"] = os.environ.get(
+
+    # Logging goes through a queue to a listener thread (see app.logging_config)
+    app.config["LOG_LEVEL"] = os.environ.get("LOG_LEVEL", "INFO")
+    # Per-logger overrides, e.g. "app.services.telegram=DEBUG,httpx=WARNING"
+    app.config["LOG_LEVELS"] = os.environ.get("LOG_LEVELS", "httpx=WARNING")
+    app.config["LOG_FORMAT"] = os.environ.get("LOG_FORMAT", "json")
+    # Share of high-volume events kept, by sample key
+    app.config["LOG_SAMPLE_RATES"] = os.environ.get(
+        "LOG_SAMPLE_RATES", "join=1,leave=1,join_request=1,approval=1"
+    )
+    # Records beyond this many waiting to be written are dropped, not waited on
+    app.config["LOG_QUEUE_SIZE"] = int(os.environ.get("LOG_QUEUE_SIZE", "10000"))
+    configure_logging(app.config)
+    database_url = os.environ.get(
         "DATABASE_URL",
         f"postgresql://{os.environ.get('POSTGRES_USER', 'postgres')}:"
         f"{os.environ.get('POSTGRES_PASSWORD', 'postgres')}@"
@@ -27,12 +45,154 @@ def create_app():
         f"{os.environ.get('POSTGRES_DB', 'tg_manager')}",
     )
     app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
+    # Connection pools: web requests, the bot and background jobs each get
+    # their own pool on the primary (see app.db_pool)
+    app.config["DB_POOL_SIZE"] = int(os.environ.get("DB_POOL_SIZE", "10"))
+    app.config["DB_BOT_POOL_SIZE"] = int(os.environ.get("DB_BOT_POOL_SIZE", "4"))
+    app.config["DB_BACKGROUND_POOL_SIZE"] = int(
+        os.environ.get("DB_BACKGROUND_POOL_SIZE", "3")
+    )
+    app.config["DB_MAX_OVERFLOW"] = int(os.environ.get("DB_MAX_OVERFLOW", "5"))
+    app.config["DB_POOL_TIMEOUT"] = float(os.environ.get("DB_POOL_TIMEOUT", "10"))
+    app.config["DB_POOL_RECYCLE"] = int(os.environ.get("DB_POOL_RECYCLE", "1800"))
+    app.config["DB_POOL_PRE_PING"] = os.environ.get(
+        "DB_POOL_PRE_PING", "1"
+    ) not in ("0", "false", "False")
+    # 0 disables the timeout; background jobs (sweeps, archiving) default to none
+    app.config["DB_STATEMENT_TIMEOUT_MS"] = int(
+        os.environ.get("DB_STATEMENT_TIMEOUT_MS", "30000")
+    )
+    app.config["DB_BACKGROUND_STATEMENT_TIMEOUT_MS"] = int(
+        os.environ.get("DB_BACKGROUND_STATEMENT_TIMEOUT_MS", "0")
+    )
+    app.config["DB_APPLICATION_NAME"] = os.environ.get(
+        "DB_APPLICATION_NAME", "tg-subscription-manager"
+    )
+    # Behind PgBouncer in transaction mode: no local pooling, no startup options
+    app.config["DB_PGBOUNCER"] = os.environ.get("DB_PGBOUNCER", "0") in (
+        "1",
+        "true",
+        "True",
+    )
+    # Read replicas for list/report endpoints, as comma-separated URLs
+    replica_urls = [
+        url.strip()
+        for url in os.environ.get("DATABASE_REPLICA_URLS", "").split(",")
+        if url.strip()
+    ]
+    from app.db_pool import configure_engines
+    configure_engines(app.config, database_url, replica_urls)
+    # Replicas further behind than this are skipped; lag is re-measured
+    # at most every REPLICA_LAG_CHECK_SECONDS
+    app.config["REPLICA_MAX_LAG_SECONDS"] = float(
+        os.environ.get("REPLICA_MAX_LAG_SECONDS", "5")
+    )
+    app.config["REPLICA_LAG_CHECK_SECONDS"] = float(
+        os.environ.get("REPLICA_LAG_CHECK_SECONDS", "2")
+    )
+    # Conditional GET caching: how long a worker trusts its cached table
+    # versions, and how long shared caches may keep the public catalog
+    app.config["TABLE_VERSION_CACHE_SECONDS"] = float(
+        os.environ.get("TABLE_VERSION_CACHE_SECONDS", "1")
+    )
+    app.config["CATALOG_CACHE_MAX_AGE"] = int(
+        os.environ.get("CATALOG_CACHE_MAX_AGE", "30")
+    )
+    # How long stored Idempotency-Key responses are replayed
+    app.config["IDEMPOTENCY_KEY_TTL_HOURS"] = float(
+        os.environ.get("IDEMPOTENCY_KEY_TTL_HOURS", "24")
+    )
+    # Admission control for endpoints that wait on the Telegram Bot API
+    app.config["ADMISSION_MAX_CONCURRENCY"] = int(
+        os.environ.get("ADMISSION_MAX_CONCURRENCY", "8")
+    )
+    app.config["ADMISSION_MAX_QUEUE"] = int(os.environ.get("ADMISSION_MAX_QUEUE", "32"))
+    app.config["ADMISSION_QUEUE_TIMEOUT"] = float(
+        os.environ.get("ADMISSION_QUEUE_TIMEOUT", "5")
+    )
+
+    # Largest list accepted by the bulk cancel/regenerate endpoints
+    app.config["BULK_MAX_ITEMS"] = int(os.environ.get("BULK_MAX_ITEMS", "500"))
+
+    # Membership reconciliation: roster from chat_member updates vs. subscriptions
+    app.config["MEMBERSHIP_RECONCILE_INTERVAL_MINUTES"] = float(
+        os.environ.get("MEMBERSHIP_RECONCILE_INTERVAL_MINUTES", "15")
+    )
+    app.config["MEMBERSHIP_RECONCILE_BATCH_SIZE"] = int(
+        os.environ.get("MEMBERSHIP_RECONCILE_BATCH_SIZE", "500")
+    )
+    app.config["MEMBERSHIP_RECONCILE_GRACE_SECONDS"] = int(
+        os.environ.get("MEMBERSHIP_RECONCILE_GRACE_SECONDS", "300")
+    )
+    app.config["MEMBERSHIP_RECONCILE_KICK_INTRUDERS"] = os.environ.get(
+        "MEMBERSHIP_RECONCILE_KICK_INTRUDERS", "0"
+    ) not in ("0", "false", "False")
+
+    # Periodic check of known groups against Telegram (titles, removals, migrations)
+    app.config["GROUP_VERIFY_INTERVAL_HOURS"] = float(
+        os.environ.get("GROUP_VERIFY_INTERVAL_HOURS", "6")
+    )
+    app.config["GROUP_VERIFY_BATCH_SIZE"] = int(
+        os.environ.get("GROUP_VERIFY_BATCH_SIZE", "10")
+    )
+
+    # Expired/cancelled subscriptions older than this move to subscriptions_archive
+    app.config["SUBSCRIPTION_ARCHIVE_AFTER_DAYS"] = float(
+        os.environ.get("SUBSCRIPTION_ARCHIVE_AFTER_DAYS", "90")
+    )
+    app.config["SUBSCRIPTION_ARCHIVE_BATCH_SIZE"] = int(
+        os.environ.get("SUBSCRIPTION_ARCHIVE_BATCH_SIZE", "1000")
+    )
+    # Monthly subscription partitions kept created ahead (PostgreSQL only)
+    app.config["SUBSCRIPTION_PARTITION_MONTHS_AHEAD"] = int(
+        os.environ.get("SUBSCRIPTION_PARTITION_MONTHS_AHEAD", "12")
+    )
+    # The hourly expiry sweep only looks this far back; a daily sweep covers the rest
+    app.config["EXPIRY_SWEEP_LOOKBACK_DAYS"] = float(
+        os.environ.get("EXPIRY_SWEEP_LOOKBACK_DAYS", "31")
+    )
+
+    # Unused invite links older than this are revoked and their subscriptions expired
+    app.config["PENDING_JOIN_TTL_HOURS"] = float(
+        os.environ.get("PENDING_JOIN_TTL_HOURS", "168")
+    )
+    app.config["PENDING_REAPER_INTERVAL_MINUTES"] = float(
+        os.environ.get("PENDING_REAPER_INTERVAL_MINUTES", "60")
+    )
+    app.config["PENDING_REAPER_BATCH_SIZE"] = int(
+        os.environ.get("PENDING_REAPER_BATCH_SIZE", "200")
+    )
+    # revokeChatInviteLink calls in flight at once (they still queue for the bulk lane)
+    app.config["PENDING_REAPER_CONCURRENCY"] = int(
+        os.environ.get("PENDING_REAPER_CONCURRENCY", "5")
+    )
+
+    # Seconds the bot, scheduler and audit log writer get to drain on shutdown;
+    # keep it below gunicorn's graceful_timeout
+    app.config["SHUTDOWN_TIMEOUT_SECONDS"] = float(
+        os.environ.get("SHUTDOWN_TIMEOUT_SECONDS", "20")
+    )
 
     # Initialize extensions
     db.init_app(app)
     migrate.init_app(app, db)
     CORS(app)
 
+    # Subscription audit events are written in batches off the request path
+    from app.services.subscription_event_service import event_appender
+    event_appender.init_app(app)
+
+    # Background services stop in reverse order of registration on exit
+    from app.lifecycle import lifecycle
+    lifecycle.init_app(app)
+    lifecycle.register("events", event_appender.stop)
+
+    from app.admission import telegram_admission
+    telegram_admission.init_app(app)
+
+    from app.db_routing import read_router
+    read_router.init_app(app)
+
     # Initialize Swagger API
     from app.swagger_config import api
     # Configure API for HTTPS in production
@@ -42,13 +202,14 @@ def create_app():
         api.init_app(app)
 
     # Register Swagger namespaces
-    from app.swagger_routes import products_ns, groups_ns, subscriptions_ns, users_ns, telegram_ns, subscribe_ns
+    from app.swagger_routes import products_ns, groups_ns, subscriptions_ns, users_ns, telegram_ns, subscribe_ns, database_ns
     api.add_namespace(products_ns)
     api.add_namespace(groups_ns)
     api.add_namespace(subscriptions_ns)
     api.add_namespace(users_ns)
     api.add_namespace(telegram_ns)
     api.add_namespace(subscribe_ns)
+    api.add_namespace(database_ns)
 
     # Add redirect route for /api-docs
     @app.route('/api-docs')
@@ -71,20 +232,49 @@ def create_app():
 
     # Legacy routes removed - using Swagger API only
 
+    # CLI commands such as `flask db upgrade` don't need the bot or scheduler,
+    # so skip importing and starting them there
+    if not _should_start_background_services():
+        return app
+
     # Initialize Telegram bot
-    telegram_token = os.environ.get("TELEGRAM_BOT_TOKEN")
+    telegram_token = os.environ.get("TELEGRAM_BOT_TOKEN") or os.environ.get(
+        "TELEGRAM_BOT_TOKENS"
+    )
     if telegram_token:
         from app.services.telegram import tg_bot
         tg_bot.init_app(app)
         tg_bot.start_bot()
+        lifecycle.register("bot", tg_bot.shutdown)
     else:
-        print("Warning: Telegram bot token not set.")
+        logger.warning("Telegram bot token not set")
 
     # Initialize scheduled tasks
     try:
         from app.tasks.subscription_tasks import init_scheduler
-        init_scheduler()
+        init_scheduler(app)
     except Exception as e:
-        print(f"Warning: Failed to initialize scheduler: {e}")
+        logger.warning(f"Failed to initialize scheduler: {e}")
 
     return app
+
+
+def _should_start_background_services():
+    """Decide whether this process should run the bot poller and scheduler.
+
+    START_BACKGROUND_SERVICES overrides the detection. Otherwise services run
+    for WSGI workers and `flask run`, but not for other `flask` CLI commands.
+    """
+    import os
+
+    flag = os.environ.get("START_BACKGROUND_SERVICES")
+    if flag is not None:
+        return flag.lower() in ("1", "true", "yes")
+
+    if os.environ.get("FLASK_RUN_FROM_CLI") != "true":
+        return True
+
+    import click
+
+    ctx = click.get_current_context(silent=True)
+    return ctx is not None and ctx.command.name == "run"
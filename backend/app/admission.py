@@ -0,0 +1,133 @@
+"""Admission control for endpoints that block on the Telegram Bot API.
+
+Telegram-bound requests hold a greenlet for up to the bot call timeout, so an
+unbounded burst of them can starve the single worker and time out unrelated
+cheap reads. The controller caps how many run at once, lets a bounded number
+wait for a slot until a deadline, and rejects everything else immediately
+with 503 + Retry-After.
+"""
+import math
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+from http import HTTPStatus
+
+from app.serialization import json_response
+
+
+class Overloaded(Exception):
+    def __init__(self, reason, retry_after):
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    def __init__(self, max_concurrency=8, max_queue=32, queue_timeout=5.0):
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self._cond = threading.Condition()
+        self.in_flight = 0
+        self.queued = 0
+        self.peak_queued = 0
+        self.admitted_total = 0
+        self.shed_queue_full = 0
+        self.shed_timeout = 0
+        self.queue_wait_seconds = 0.0
+
+    def init_app(self, app):
+        self.max_concurrency = app.config.get("ADMISSION_MAX_CONCURRENCY", self.max_concurrency)
+        self.max_queue = app.config.get("ADMISSION_MAX_QUEUE", self.max_queue)
+        self.queue_timeout = app.config.get("ADMISSION_QUEUE_TIMEOUT", self.queue_timeout)
+
+    @property
+    def retry_after(self):
+        return max(1, math.ceil(self.queue_timeout))
+
+    def acquire(self):
+        """Take a slot, waiting up to queue_timeout; raises Overloaded if shed"""
+        with self._cond:
+            if self.in_flight < self.max_concurrency and not self.queued:
+                self.in_flight += 1
+                self.admitted_total += 1
+                return
+            if self.queued >= self.max_queue:
+                self.shed_queue_full += 1
+                raise Overloaded("queue_full", self.retry_after)
+
+            self.queued += 1
+            self.peak_queued = max(self.peak_queued, self.queued)
+            started = time.monotonic()
+            deadline = started + self.queue_timeout
+            try:
+                while self.in_flight >= self.max_concurrency:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self.shed_timeout += 1
+                        raise Overloaded("queue_timeout", self.retry_after)
+                    self._cond.wait(remaining)
+            finally:
+                self.queued -= 1
+                self.queue_wait_seconds += time.monotonic() - started
+            self.in_flight += 1
+            self.admitted_total += 1
+
+    def release(self):
+        with self._cond:
+            self.in_flight -= 1
+            self._cond.notify()
+
+    @contextmanager
+    def admit(self):
+        """Hold a slot for the duration of the block; raises Overloaded if shed"""
+        self.acquire()
+        try:
+            yield
+        finally:
+            self.release()
+
+    def stats(self):
+        with self._cond:
+            return {
+                "in_flight": self.in_flight,
+                "queued": self.queued,
+                "peak_queued": self.peak_queued,
+                "max_concurrency": self.max_concurrency,
+                "max_queue": self.max_queue,
+                "queue_timeout": self.queue_timeout,
+                "admitted_total": self.admitted_total,
+                "shed_total": self.shed_queue_full + self.shed_timeout,
+                "shed_queue_full": self.shed_queue_full,
+                "shed_timeout": self.shed_timeout,
+                "queue_wait_seconds_total": round(self.queue_wait_seconds, 3),
+            }
+
+
+# Shared by every endpoint that waits on the Bot API
+telegram_admission = AdmissionController()
+
+
+def admission_controlled(controller=telegram_admission):
+    """Run the view only once admitted; shed with 503 + Retry-After otherwise"""
+
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            try:
+                controller.acquire()
+            except Overloaded as e:
+                return json_response(
+                    {"message": "Server is busy, please retry later"},
+                    HTTPStatus.SERVICE_UNAVAILABLE,
+                    {"Retry-After": str(e.retry_after)},
+                )
+            try:
+                return func(*args, **kwargs)
+            finally:
+                controller.release()
+
+        return wrapper
+
+    return decorator
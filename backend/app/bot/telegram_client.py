@@ -4,10 +4,6 @@ from datetime import datetime
 from telegram.ext import ApplicationBuilder, CommandHandler, MessageHandler, filters
 import uuid
 
-# Configure logging
-logging.basicConfig(
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s", level=logging.INFO
-)
 logger = logging.getLogger(__name__)
 
 # Global instances
@@ -46,9 +42,6 @@ def initialize_bot():
         else:
             logger.info("Using webhook mode for updates")
 
-        # Sync groups the bot is already a member of
-        sync_bot_groups()
-
         return bot
     except Exception as e:
         logger.error(f"Failed to initialize Telegram bot: {e}")
@@ -241,65 +234,19 @@ def kick_user_from_group(chat_id, user_id):
 
 
 def sync_bot_groups():
-    """Fetch and register all groups the bot is currently a member of.
+    """Check the groups the bot is known to be in and record any changes.
 
-    This is useful when the bot was added to groups while the server was down.
+    Groups are discovered from the live update stream by the bot service and
+    re-checked periodically; calling getUpdates here would steal updates from
+    the running poller. This runs the same verify pass on demand.
 
     Returns:
-        list: List of registered group IDs or None if failed
+        dict: Counts from the verify pass, or None if it failed
     """
-    from app.services import TelegramGroupService
-    import asyncio
-
-    bot_instance = get_bot()
-    if not bot_instance:
-        logger.error("Bot not initialized")
-        return None
+    from app.services.telegram import tg_bot
 
     try:
-        registered_groups = []
-
-        # Use the existing event loop if available, otherwise create a new one
-        try:
-            loop = asyncio.get_event_loop()
-            if loop.is_running():
-                # We're in an async context, use run_coroutine_threadsafe
-                future = asyncio.run_coroutine_threadsafe(
-                    bot_instance.get_updates(limit=100, timeout=0), loop
-                )
-                updates = future.result(timeout=30)
-            else:
-                # We're not in an async context, use run_until_complete
-                updates = loop.run_until_complete(
-                    bot_instance.get_updates(limit=100, timeout=0)
-                )
-        except RuntimeError:
-            # No event loop exists, create a new one
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            try:
-                updates = loop.run_until_complete(
-                    bot_instance.get_updates(limit=100, timeout=0)
-                )
-            finally:
-                loop.close()
-
-        # Process each update to find groups
-        for update in updates:
-            if update.my_chat_member and update.my_chat_member.chat.type in [
-                "group",
-                "supergroup",
-            ]:
-                chat = update.my_chat_member.chat
-                chat_id = str(chat.id)
-                chat_title = chat.title
-
-                # Register the group
-                TelegramGroupService.create_or_update_group(chat_id, chat_title)
-                registered_groups.append(chat_id)
-                logger.info(f"Registered group: {chat_title} ({chat_id})")
-
-        return registered_groups
+        return tg_bot.verify_groups()
     except Exception as e:
         logger.exception(f"Failed to sync bot groups: {e}")
         return None
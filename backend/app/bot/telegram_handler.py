@@ -1,15 +1,10 @@
 import logging
-import json
 from telegram.ext import CommandHandler, MessageHandler, filters, CallbackContext
 from telegram import Update
 from app import db
 from app.services import TelegramGroupService, SubscriptionService
 from app.models import User
 
-# Configure logging
-logging.basicConfig(
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s", level=logging.INFO
-)
 logger = logging.getLogger(__name__)
 
 
@@ -20,7 +15,8 @@ def process_update(update):
         update: The update object from Telegram
     """
     try:
-        logger.info(f"Processing update: {json.dumps(update, default=str)}")
+        # Serialized on the logging thread, and only when DEBUG is enabled
+        logger.debug("Processing update", extra={"fields": {"update": update}})
 
         # Handle new chat members (user joining a group)
         if "message" in update and "new_chat_members" in update["message"]:
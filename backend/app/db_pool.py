@@ -0,0 +1,152 @@
+"""Connection pools per process component.
+
+The web workers, the Telegram bot's executor threads and background jobs
+(APScheduler, the event appender) each get their own engine on the primary,
+so a sweep cannot take the connections a checkout request is waiting for.
+Code picks its pool by running inside ``db_component(name)``; the routing
+session does the rest. Pools record how long checkouts waited.
+"""
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import NullPool, QueuePool
+
+COMPONENTS = ("web", "bot", "background")
+
+_component = ContextVar("db_component", default="web")
+
+
+@contextmanager
+def db_component(name):
+    """Use the ``name`` pool for database work in this context"""
+    token = _component.set(name)
+    try:
+        yield
+    finally:
+        _component.reset(token)
+
+
+def current_component():
+    return _component.get()
+
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool that records checkout counts, wait times and timeouts"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._stats_lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    def _do_get(self):
+        started = time.monotonic()
+        try:
+            connection = super()._do_get()
+        except PoolTimeoutError:
+            with self._stats_lock:
+                self.timeouts += 1
+            raise
+        waited = time.monotonic() - started
+        with self._stats_lock:
+            self.checkouts += 1
+            self.wait_seconds_total += waited
+            self.wait_seconds_max = max(self.wait_seconds_max, waited)
+        return connection
+
+    def recreate(self):
+        # Invalidation swaps in a new pool; keep the counters going
+        pool = super().recreate()
+        pool.checkouts = self.checkouts
+        pool.timeouts = self.timeouts
+        pool.wait_seconds_total = self.wait_seconds_total
+        pool.wait_seconds_max = self.wait_seconds_max
+        return pool
+
+    def stats(self):
+        return {
+            "size": self.size(),
+            "checked_out": self.checkedout(),
+            "overflow": max(0, self.overflow()),
+            "checkouts": self.checkouts,
+            "timeouts": self.timeouts,
+            "wait_seconds_total": round(self.wait_seconds_total, 3),
+            "wait_seconds_max": round(self.wait_seconds_max, 3),
+            "wait_seconds_avg": (
+                round(self.wait_seconds_total / self.checkouts, 4) if self.checkouts else 0.0
+            ),
+        }
+
+
+def engine_options(config, url, component):
+    """SQLAlchemy engine options for ``component``'s engine on ``url``"""
+    if not str(url).startswith("postgresql"):
+        return {"url": url}
+
+    application_name = f"{config['DB_APPLICATION_NAME']}-{component}"
+    if config["DB_PGBOUNCER"]:
+        # PgBouncer does the pooling and rejects unknown startup parameters,
+        # so statement_timeout has to be set on the database role instead
+        return {
+            "url": url,
+            "poolclass": NullPool,
+            "connect_args": {"application_name": application_name},
+        }
+
+    pool_size = {
+        "bot": config["DB_BOT_POOL_SIZE"],
+        "background": config["DB_BACKGROUND_POOL_SIZE"],
+    }.get(component, config["DB_POOL_SIZE"])
+    statement_timeout = (
+        config["DB_BACKGROUND_STATEMENT_TIMEOUT_MS"]
+        if component == "background"
+        else config["DB_STATEMENT_TIMEOUT_MS"]
+    )
+    connect_args = {"application_name": application_name}
+    if statement_timeout:
+        connect_args["options"] = f"-c statement_timeout={statement_timeout}"
+    return {
+        "url": url,
+        "poolclass": InstrumentedQueuePool,
+        "pool_size": pool_size,
+        "max_overflow": config["DB_MAX_OVERFLOW"],
+        "pool_timeout": config["DB_POOL_TIMEOUT"],
+        "pool_recycle": config["DB_POOL_RECYCLE"],
+        "pool_pre_ping": config["DB_POOL_PRE_PING"],
+        "connect_args": connect_args,
+    }
+
+
+def configure_engines(config, url, replica_urls):
+    """Fill SQLALCHEMY_ENGINE_OPTIONS and SQLALCHEMY_BINDS for the primary
+    (one engine per component) and the read replicas."""
+    options = engine_options(config, url, "web")
+    options.pop("url")
+    config["SQLALCHEMY_DATABASE_URI"] = url
+    config["SQLALCHEMY_ENGINE_OPTIONS"] = options
+    binds = {}
+    if str(url).startswith("postgresql"):
+        binds.update(
+            (component, engine_options(config, url, component))
+            for component in COMPONENTS
+            if component != "web"
+        )
+    for index, replica_url in enumerate(replica_urls):
+        binds[f"replica_{index}"] = engine_options(config, replica_url, "replica")
+    config["SQLALCHEMY_BINDS"] = binds
+
+
+def pool_stats(engines):
+    """Return one row per engine with its pool's occupancy and checkout waits"""
+    rows = []
+    for key, engine in sorted(engines.items(), key=lambda item: item[0] or ""):
+        row = {"bind": key or "web", "pool": type(engine.pool).__name__}
+        if isinstance(engine.pool, InstrumentedQueuePool):
+            row.update(engine.pool.stats())
+        rows.append(row)
+    return rows
@@ -0,0 +1,190 @@
+"""Route read-only endpoints to database replicas.
+
+Replicas are configured as SQLALCHEMY_BINDS named ``replica_<n>``. Views
+decorated with ``replica_reads`` send their SELECTs to a replica whose
+measured lag is below REPLICA_MAX_LAG_SECONDS; everything else, and any read
+after a write in the same request, goes to the primary.
+
+Read-your-writes across requests: a response to a request that wrote sets a
+short-lived cookie with the write time and, on PostgreSQL, the primary's WAL
+position. While it is present only replicas that have replayed up to that
+position (or, without one, lag less than the time since the write) are used.
+"""
+import logging
+import math
+import random
+import threading
+import time
+from functools import wraps
+
+from flask import current_app, g, has_request_context, request
+from flask_sqlalchemy.session import Session
+from app.db_pool import current_component
+from sqlalchemy import text
+from sqlalchemy.sql import CompoundSelect, Delete, Insert, Select, Update
+
+logger = logging.getLogger(__name__)
+
+REPLICA_BIND_PREFIX = "replica_"
+LAST_WRITE_COOKIE = "db_last_write"
+
+# 0 when caught up; the lag probe on an idle primary would otherwise keep growing
+LAG_QUERY = text(
+    "SELECT CASE "
+    "WHEN NOT pg_is_in_recovery() THEN 0 "
+    "WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) "
+    "END"
+)
+CURRENT_LSN_QUERY = text("SELECT pg_current_wal_lsn()::text")
+REPLAYED_QUERY = text("SELECT pg_last_wal_replay_lsn() >= CAST(:lsn AS pg_lsn)")
+
+
+class ReplicaRouter:
+    def __init__(self, max_lag=5.0, check_interval=2.0):
+        self.max_lag = max_lag
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        # bind key -> (checked_at, lag in seconds or None if unreachable)
+        self._lag = {}
+
+    def init_app(self, app):
+        self.max_lag = app.config.get("REPLICA_MAX_LAG_SECONDS", self.max_lag)
+        self.check_interval = app.config.get("REPLICA_LAG_CHECK_SECONDS", self.check_interval)
+
+        @app.after_request
+        def remember_write(response):
+            if g.get("_db_wrote") and self.replica_keys():
+                response.set_cookie(
+                    LAST_WRITE_COOKIE,
+                    self._write_marker(),
+                    max_age=max(1, math.ceil(self.max_lag)),
+                    httponly=True,
+                    samesite="Lax",
+                )
+            return response
+
+    def replica_keys(self):
+        engines = current_app.extensions["sqlalchemy"].engines
+        return sorted(
+            key for key in engines if key and key.startswith(REPLICA_BIND_PREFIX)
+        )
+
+    def _write_marker(self):
+        marker = f"{time.time():.3f}"
+        engine = current_app.extensions["sqlalchemy"].engine
+        if engine.dialect.name != "postgresql":
+            return marker
+        try:
+            with engine.connect() as connection:
+                return f"{marker}/{connection.execute(CURRENT_LSN_QUERY).scalar()}"
+        except Exception as e:
+            logger.warning(f"Could not read primary WAL position: {e}")
+            return marker
+
+    def _replayed(self, key, lsn):
+        engine = current_app.extensions["sqlalchemy"].engines[key]
+        try:
+            with engine.connect() as connection:
+                return bool(connection.execute(REPLAYED_QUERY, {"lsn": lsn}).scalar())
+        except Exception:
+            return False
+
+    def lag(self, key):
+        """Replication lag of a replica in seconds, re-measured every check_interval"""
+        now = time.monotonic()
+        checked_at, lag = self._lag.get(key, (None, None))
+        if checked_at is not None and now - checked_at < self.check_interval:
+            return lag
+
+        engine = current_app.extensions["sqlalchemy"].engines[key]
+        try:
+            with engine.connect() as connection:
+                if engine.dialect.name == "postgresql":
+                    lag = float(connection.execute(LAG_QUERY).scalar())
+                else:
+                    connection.execute(text("SELECT 1"))
+                    lag = 0.0
+        except Exception as e:
+            if self._lag.get(key, (None, None))[1] is not None:
+                logger.warning(f"Replica {key} unreachable, reading from primary: {e}")
+            lag = None
+        with self._lock:
+            self._lag[key] = (now, lag)
+        return lag
+
+    def engine_for_request(self):
+        """The replica engine for this request's reads, or None for the primary"""
+        if not has_request_context() or not g.get("_replica_reads") or g.get("_db_wrote"):
+            return None
+        if "_replica_engine" in g:
+            return g._replica_engine
+
+        # A replica must have replayed past this client's last write
+        max_lag = self.max_lag
+        lsn = None
+        last_write = request.cookies.get(LAST_WRITE_COOKIE)
+        if last_write:
+            written_at, _, lsn = last_write.partition("/")
+            try:
+                if not lsn:
+                    max_lag = min(max_lag, time.time() - float(written_at))
+            except ValueError:
+                max_lag = 0
+
+        candidates = []
+        for key in self.replica_keys():
+            lag = self.lag(key)
+            if lag is not None and lag < max_lag:
+                candidates.append(key)
+        random.shuffle(candidates)
+
+        engine = None
+        for key in candidates:
+            if lsn and not self._replayed(key, lsn):
+                continue
+            engine = current_app.extensions["sqlalchemy"].engines[key]
+            break
+        g._replica_engine = engine
+        return engine
+
+
+read_router = ReplicaRouter()
+
+
+def replica_reads(func):
+    """Let a read-only view run its SELECTs on a replica when one is fresh enough"""
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        g._replica_reads = True
+        return func(*args, **kwargs)
+
+    return wrapper
+
+
+class RoutingSession(Session):
+    """Session that sends replica-eligible SELECTs to a replica engine.
+
+    Flushes and INSERT/UPDATE/DELETE statements always use the primary and
+    pin the rest of the request to it. Outside requests, the bot and
+    background jobs use their own primary pools (see app.db_pool).
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        component = current_component()
+        if bind is None and component != "web":
+            engine = current_app.extensions["sqlalchemy"].engines.get(component)
+            if engine is not None:
+                return engine
+        if bind is None and has_request_context():
+            if self._flushing or isinstance(clause, (Insert, Update, Delete)):
+                g._db_wrote = True
+            elif (
+                isinstance(clause, (Select, CompoundSelect))
+                and clause._for_update_arg is None
+            ):
+                engine = read_router.engine_for_request()
+                if engine is not None:
+                    return engine
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
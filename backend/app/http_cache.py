@@ -0,0 +1,76 @@
+"""Conditional GET support for read endpoints backed by versioned tables.
+
+The ETag is derived from the request path and the current version of every
+table the response depends on (see TableVersionService), so a matching
+If-None-Match is answered with 304 before the view runs and without querying
+the underlying tables.
+"""
+from datetime import timezone
+from functools import wraps
+from hashlib import blake2b
+from http import HTTPStatus
+
+from flask import Response, current_app, request
+
+from app.services.table_version_service import TableVersionService
+
+
+def _cache_control(response, public, max_age):
+    if public:
+        if max_age is None:
+            max_age = current_app.config.get("CATALOG_CACHE_MAX_AGE", 30)
+        response.cache_control.public = True
+        response.cache_control.max_age = max_age
+    else:
+        response.cache_control.private = True
+        response.cache_control.no_cache = True
+
+
+def cached_by_versions(*tables, public=False, max_age=None):
+    """Add ETag/Last-Modified validation to a GET view.
+
+    ``tables`` are the TableVersion names whose writes change the response.
+    Public responses get ``Cache-Control: public, max-age`` so nginx may serve
+    them; everything else must be revalidated on each use. Apply above
+    ``serialize_with`` so the 304 short-circuits serialization as well.
+    """
+
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            versions = TableVersionService.get_versions(*tables)
+            key = request.full_path + "|" + ",".join(
+                f"{name}:{versions[name][0]}" for name in tables
+            )
+            etag = blake2b(key.encode(), digest_size=12).hexdigest()
+            stamps = [stamp for _, stamp in versions.values() if stamp is not None]
+            last_modified = (
+                max(stamps).replace(tzinfo=timezone.utc, microsecond=0) if stamps else None
+            )
+
+            if request.if_none_match:
+                not_modified = request.if_none_match.contains_weak(etag)
+            else:
+                not_modified = (
+                    last_modified is not None
+                    and request.if_modified_since is not None
+                    and last_modified <= request.if_modified_since
+                )
+
+            if not_modified:
+                response = Response(status=HTTPStatus.NOT_MODIFIED)
+            else:
+                response = current_app.make_response(func(*args, **kwargs))
+                if response.status_code != HTTPStatus.OK:
+                    return response
+
+            # Weak because nginx gzips the body on the way out
+            response.set_etag(etag, weak=True)
+            if last_modified is not None:
+                response.last_modified = last_modified
+            _cache_control(response, public, max_age)
+            return response
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,97 @@
+"""``Idempotency-Key`` support for POST endpoints.
+
+The first request with a given key runs normally and its response is stored;
+retries with the same key and body get the stored response back from a single
+primary-key lookup, without re-running the view.
+"""
+import hashlib
+import json
+from functools import wraps
+from http import HTTPStatus
+
+from flask import Response, current_app, request
+
+from app.serialization import json_response
+from app.services.idempotency_service import (
+    KEY_IN_PROGRESS,
+    KEY_MISMATCH,
+    IdempotencyService,
+)
+
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+MAX_KEY_LENGTH = 255
+
+IDEMPOTENCY_DOC = {
+    "params": {
+        IDEMPOTENCY_HEADER: {
+            "in": "header",
+            "type": "string",
+            "description": "Client-generated key; retries with the same key return the original response",
+        }
+    },
+    "responses": {
+        "409": KEY_IN_PROGRESS,
+        "422": KEY_MISMATCH,
+    },
+}
+
+
+def _request_hash():
+    payload = request.get_json(silent=True)
+    if payload is None:
+        body = request.get_data()
+    else:
+        body = json.dumps(payload, sort_keys=True, default=str).encode()
+    return hashlib.sha256(body).hexdigest()
+
+
+def idempotent(scope):
+    """Make a view replay its stored response for repeated Idempotency-Keys.
+
+    Apply above ``serialize_with``. 2xx and 4xx responses are stored, so a
+    view must only return 4xx for errors a retry cannot fix; server errors,
+    including 503 for a transient upstream failure, release the key so the
+    client can retry.
+    """
+
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            key = request.headers.get(IDEMPOTENCY_HEADER)
+            if not key:
+                return func(*args, **kwargs)
+            if len(key) > MAX_KEY_LENGTH:
+                return json_response(
+                    {"message": f"{IDEMPOTENCY_HEADER} must be at most {MAX_KEY_LENGTH} characters"},
+                    HTTPStatus.BAD_REQUEST,
+                )
+
+            record, error = IdempotencyService.begin(scope, key, _request_hash())
+            if error:
+                if error == KEY_MISMATCH:
+                    return json_response({"message": error}, HTTPStatus.UNPROCESSABLE_ENTITY)
+                return json_response({"message": error}, HTTPStatus.CONFLICT, {"Retry-After": "1"})
+            if record is not None:
+                return Response(
+                    record.response_body,
+                    status=record.response_code,
+                    mimetype="application/json",
+                    headers={"Idempotent-Replayed": "true"},
+                )
+
+            try:
+                response = current_app.make_response(func(*args, **kwargs))
+            except Exception:
+                IdempotencyService.release(scope, key)
+                raise
+            if response.status_code >= 500:
+                IdempotencyService.release(scope, key)
+            else:
+                IdempotencyService.complete(
+                    scope, key, response.status_code, response.get_data(as_text=True)
+                )
+            return response
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,79 @@
+"""Ordered, time-bounded shutdown of the process's background services.
+
+Services register a stop function in the order they start; shutdown() calls
+them in reverse, so the scheduler stops handing out jobs before the bot they
+use goes away, and the audit log is flushed after both. Each stop function
+gets the remaining time and returns counts of the work it drained and the
+work it had to abandon; the totals are logged as one record.
+
+Under gunicorn the ``worker_exit`` hook (gunicorn.conf.py) triggers the
+shutdown once the worker has finished its HTTP requests. Elsewhere SIGTERM
+is turned into a normal interpreter exit, and an atexit handler runs it.
+"""
+import atexit
+import logging
+import signal
+import sys
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class LifecycleManager:
+    def __init__(self, timeout=20.0):
+        self.timeout = timeout
+        self.report = None
+        self._stops = []
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.timeout = app.config.get("SHUTDOWN_TIMEOUT_SECONDS", self.timeout)
+        atexit.register(self.shutdown)
+        if (
+            threading.current_thread() is threading.main_thread()
+            and signal.getsignal(signal.SIGTERM) is signal.SIG_DFL
+        ):
+            # The default action kills the process without running atexit
+            signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+
+    def register(self, name, stop):
+        """Call ``stop(timeout)`` on shutdown; it returns a dict of counts"""
+        with self._lock:
+            self._stops.append((name, stop))
+
+    def shutdown(self, reason="exit"):
+        """Stop every registered service, newest first, within the timeout.
+
+        Runs once; later calls return the first report.
+        """
+        with self._lock:
+            if self.report is not None:
+                return self.report
+            self.report = {}
+            stops = list(reversed(self._stops))
+
+        deadline = time.monotonic() + self.timeout
+        logger.info(f"Shutting down ({reason}), {self.timeout:.0f}s to drain")
+        for name, stop in stops:
+            remaining = max(0.0, deadline - time.monotonic())
+            try:
+                self.report[name] = stop(remaining) or {}
+            except Exception as e:
+                logger.exception(f"Error stopping {name}: {e}")
+                self.report[name] = {"error": str(e)}
+
+        totals = {"drained": 0, "abandoned": 0}
+        for counts in self.report.values():
+            for key, value in counts.items():
+                for total in totals:
+                    if key.endswith(total) and isinstance(value, int):
+                        totals[total] += value
+        logger.info(
+            "Shutdown complete",
+            extra={"fields": {"reason": reason, **totals, "services": self.report}},
+        )
+        return self.report
+
+
+lifecycle = LifecycleManager()
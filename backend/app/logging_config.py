@@ -0,0 +1,204 @@
+"""Non-blocking, structured application logging.
+
+Every record goes through a QueueHandler into an in-memory queue; a listener
+thread formats and writes it, so a log call from the bot's event loop costs
+an enqueue, never a write to stdout. The record is not formatted before it is
+queued: message arguments and ``fields`` are only turned into text on the
+listener thread, and ``lazy(func, ...)`` values are not computed at all when
+the record is filtered out.
+
+Structured data goes in ``extra={"fields": {...}}``. High-volume events pass
+``extra={"sample": "<key>"}`` and are kept at the LOG_SAMPLE_RATES rate for
+that key; warnings and errors are never sampled. When the queue is full the
+record is dropped and counted rather than blocking the caller.
+"""
+import atexit
+import json
+import logging
+import queue
+import random
+import threading
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+
+TEXT_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+
+# Attributes every LogRecord has; anything else came in through ``extra``
+_RECORD_ATTRIBUTES = set(
+    logging.LogRecord("", 0, "", 0, "", (), None).__dict__
+) | {"message", "asctime", "fields", "sample", "taskName"}
+
+_listener = None
+_lock = threading.Lock()
+
+
+class lazy:
+    """A log field computed only when the record is actually written"""
+
+    __slots__ = ("func", "args", "kwargs")
+
+    def __init__(self, func, *args, **kwargs):
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+
+    def __call__(self):
+        return self.func(*self.args, **self.kwargs)
+
+    def __str__(self):
+        return str(self())
+
+
+def _record_fields(record):
+    fields = dict(getattr(record, "fields", None) or {})
+    for key, value in record.__dict__.items():
+        if key not in _RECORD_ATTRIBUTES and not key.startswith("_"):
+            fields.setdefault(key, value)
+    return {
+        key: value() if isinstance(value, lazy) else value
+        for key, value in fields.items()
+    }
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: time, level, logger, message and the fields"""
+
+    def format(self, record):
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "thread": record.threadName,
+            "message": record.getMessage(),
+        }
+        entry.update(_record_fields(record))
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exc"] = record.exc_text
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class TextFormatter(logging.Formatter):
+    """The classic line format with the fields appended as key=value"""
+
+    def __init__(self):
+        super().__init__(TEXT_FORMAT)
+
+    def format(self, record):
+        line = super().format(record)
+        fields = _record_fields(record)
+        if fields:
+            line = line.splitlines()
+            line[0] += " " + " ".join(f"{key}={value}" for key, value in fields.items())
+            line = "\n".join(line)
+        return line
+
+
+class SamplingFilter(logging.Filter):
+    """Keep records tagged ``sample=<key>`` with probability rates[key]"""
+
+    def __init__(self, rates):
+        super().__init__()
+        self.rates = rates
+
+    def filter(self, record):
+        key = getattr(record, "sample", None)
+        if key is None or record.levelno >= logging.WARNING:
+            return True
+        rate = self.rates.get(key, 1.0)
+        return rate >= 1.0 or random.random() < rate
+
+
+class NonBlockingQueueHandler(QueueHandler):
+    """QueueHandler that hands records over unformatted and never waits"""
+
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record):
+        # Formatting happens on the listener thread; the stock prepare()
+        # would render the message (and any json.dumps in it) right here
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+            return
+        if self.dropped:
+            dropped, self.dropped = self.dropped, 0
+            try:
+                self.queue.put_nowait(
+                    logging.makeLogRecord(
+                        {
+                            "name": __name__,
+                            "levelno": logging.WARNING,
+                            "levelname": "WARNING",
+                            "msg": "Log queue full, dropped %d records",
+                            "args": (dropped,),
+                        }
+                    )
+                )
+            except queue.Full:
+                self.dropped += dropped
+
+
+class _Listener(QueueListener):
+    def enqueue_sentinel(self):
+        # The queue may be full; stopping is allowed to wait for room
+        self.queue.put(self._sentinel)
+
+
+def _parse_pairs(value, convert):
+    """Parse "a=1,b=2" into {"a": convert("1"), "b": convert("2")}"""
+    pairs = {}
+    for item in (value or "").split(","):
+        key, sep, raw = item.partition("=")
+        if sep and key.strip():
+            pairs[key.strip()] = convert(raw.strip())
+    return pairs
+
+
+def configure_logging(config):
+    """Route all logging through the queue and start the listener thread.
+
+    Reads LOG_LEVEL, LOG_LEVELS ("logger=LEVEL,..."), LOG_FORMAT ("json" or
+    "text"), LOG_SAMPLE_RATES ("key=rate,...") and LOG_QUEUE_SIZE from
+    ``config``. Safe to call again; later calls replace the settings.
+    """
+    global _listener
+
+    stream = logging.StreamHandler()
+    stream.setFormatter(
+        TextFormatter() if config["LOG_FORMAT"] == "text" else JsonFormatter()
+    )
+    handler = NonBlockingQueueHandler(queue.Queue(maxsize=config["LOG_QUEUE_SIZE"]))
+    handler.addFilter(SamplingFilter(_parse_pairs(config["LOG_SAMPLE_RATES"], float)))
+
+    with _lock:
+        root = logging.getLogger()
+        if _listener is not None:
+            _listener.stop()
+        for existing in list(root.handlers):
+            root.removeHandler(existing)
+        root.addHandler(handler)
+        root.setLevel(config["LOG_LEVEL"].upper())
+        for name, level in _parse_pairs(config["LOG_LEVELS"], str.upper).items():
+            logging.getLogger(name).setLevel(level)
+        _listener = _Listener(handler.queue, stream, respect_handler_level=True)
+        _listener.start()
+
+
+def stop_logging():
+    """Write out everything still queued and stop the listener thread"""
+    global _listener
+    with _lock:
+        if _listener is not None:
+            _listener.stop()
+            _listener = None
+
+
+atexit.register(stop_logging)
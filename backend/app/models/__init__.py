@@ -1,4 +1,11 @@
 from app.models.product import Product
 from app.models.telegram_group import TelegramGroup
 from app.models.user import User
-from app.models.subscription import Subscription
\ No newline at end of file
+from app.models.subscription import Subscription
+from app.models.subscription_event import SubscriptionEvent
+from app.models.membership_counter import MembershipCounter
+from app.models.table_version import TableVersion
+from app.models.idempotency_key import IdempotencyKey
+from app.models.group_member import GroupMember
+from app.models.bot_update_offset import BotUpdateOffset
+from app.models.subscription_archive import SubscriptionArchive
@@ -0,0 +1,20 @@
+from datetime import datetime, timezone
+from app import db
+
+
+class BotUpdateOffset(db.Model):
+    """Highest update_id each pool bot has processed.
+
+    Advanced once a polled batch of updates has been handled and written
+    every few seconds, so it may trail the live stream slightly. Polling
+    resumes after it on restart.
+    """
+
+    __tablename__ = "bot_update_offsets"
+
+    bot_id = db.Column(db.String(20), primary_key=True)
+    update_id = db.Column(db.BigInteger, nullable=False)
+    updated_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
+
+    def __repr__(self):
+        return f"<BotUpdateOffset {self.bot_id}={self.update_id}>"
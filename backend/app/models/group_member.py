@@ -0,0 +1,34 @@
+from app import db
+
+# Chat member statuses that mean the user is currently in the group
+PRESENT_STATUSES = ("creator", "administrator", "member", "restricted")
+# Present statuses the reconciliation job may act on (admins are left alone)
+REGULAR_STATUSES = ("member", "restricted")
+GONE_STATUSES = ("left", "kicked")
+
+
+class GroupMember(db.Model):
+    """Last known membership of a Telegram user in a group.
+
+    Maintained from chat_member updates rather than per-member API calls, so
+    it only knows users whose join or leave the bot has seen. ``changed_at`` is
+    the date of the update that set ``status``, used to ignore updates that
+    arrive out of order.
+    """
+
+    __tablename__ = "group_members"
+    __table_args__ = (
+        db.Index("ix_group_members_group_status", "telegram_group_id", "status"),
+    )
+
+    telegram_group_id = db.Column(
+        db.Integer,
+        db.ForeignKey("telegram_groups.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    telegram_user_id = db.Column(db.String(100), primary_key=True)
+    status = db.Column(db.String(20), nullable=False)
+    changed_at = db.Column(db.DateTime, nullable=False)
+
+    def __repr__(self):
+        return f"<GroupMember {self.telegram_user_id} in {self.telegram_group_id}: {self.status}>"
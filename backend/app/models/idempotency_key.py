@@ -0,0 +1,21 @@
+from datetime import datetime, timezone
+from app import db
+
+
+class IdempotencyKey(db.Model):
+    """Stored outcome of a request made with an ``Idempotency-Key`` header"""
+
+    __tablename__ = "idempotency_keys"
+
+    scope = db.Column(db.String(50), primary_key=True)
+    key = db.Column(db.String(255), primary_key=True)
+    request_hash = db.Column(db.String(64), nullable=False)
+    # in_progress while the first request runs, completed once a response is stored
+    status = db.Column(db.String(20), nullable=False, default="in_progress")
+    response_code = db.Column(db.Integer, nullable=True)
+    response_body = db.Column(db.Text, nullable=True)
+    created_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
+
+    def __repr__(self):
+        return f"<IdempotencyKey {self.scope}:{self.key} {self.status}>"
@@ -0,0 +1,27 @@
+from app import db
+
+
+class MembershipCounter(db.Model):
+    """Number of subscriptions per (product, group, status).
+
+    Maintained incrementally in the same transaction as every status change
+    and rebuilt from the subscriptions table by a periodic reconciliation job.
+    """
+
+    __tablename__ = "membership_counters"
+
+    product_id = db.Column(
+        db.String(24),
+        db.ForeignKey("products.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    telegram_group_id = db.Column(
+        db.Integer,
+        db.ForeignKey("telegram_groups.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    status = db.Column(db.String(20), primary_key=True)
+    count = db.Column(db.Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<MembershipCounter {self.product_id}/{self.telegram_group_id} {self.status}={self.count}>"
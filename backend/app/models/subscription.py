@@ -3,7 +3,25 @@ from app import db
 
 
 class Subscription(db.Model):
+    """On PostgreSQL the table is range-partitioned by expiry month.
+
+    The database primary key there is (id, subscription_expires_at) and
+    invite_link_token uniqueness is enforced by SubscriptionService, since a
+    partitioned table cannot carry unique constraints without the partition
+    key. The ORM keeps ``id`` as the identity, which is still unique.
+    """
+
     __tablename__ = "subscriptions"
+    __table_args__ = (
+        db.Index(
+            "ix_subscriptions_group_status_user",
+            "telegram_group_id",
+            "status",
+            "user_id",
+        ),
+        db.Index("ix_subscriptions_status_expires_at", "status", "subscription_expires_at"),
+        {"postgresql_partition_by": "RANGE (subscription_expires_at)"},
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False)
@@ -12,7 +30,7 @@ class Subscription(db.Model):
     telegram_group_id = db.Column(
         db.Integer, db.ForeignKey("telegram_groups.id"), nullable=False
     )
-    invite_link_token = db.Column(db.String(255), unique=True, nullable=True)
+    invite_link_token = db.Column(db.String(255), index=True, nullable=True)
     invite_link_url = db.Column(db.String(512), nullable=True)
     invite_link_expires_at = db.Column(db.DateTime, nullable=True)
 
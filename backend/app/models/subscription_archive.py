@@ -0,0 +1,52 @@
+from datetime import datetime, timezone
+from app import db
+
+# Columns copied verbatim from subscriptions when a row is archived
+ARCHIVED_COLUMNS = (
+    "id",
+    "user_id",
+    "product_id",
+    "telegram_group_id",
+    "invite_link_token",
+    "invite_link_url",
+    "invite_link_expires_at",
+    "subscription_starts_at",
+    "subscription_expires_at",
+    "status",
+    "created_at",
+    "updated_at",
+)
+
+
+class SubscriptionArchive(db.Model):
+    """Expired and cancelled subscriptions moved out of the hot table.
+
+    Rows keep their original IDs and timestamps. There are no foreign keys,
+    so archived history is not touched by later changes to users, products
+    or groups (the same reasoning as subscription_events).
+    """
+
+    __tablename__ = "subscriptions_archive"
+    __table_args__ = (
+        db.Index("ix_subscriptions_archive_user_id", "user_id"),
+        db.Index("ix_subscriptions_archive_product_id", "product_id"),
+    )
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    user_id = db.Column(db.Integer, nullable=False)
+    product_id = db.Column(db.String(24), nullable=False)
+    telegram_group_id = db.Column(db.Integer, nullable=False)
+    invite_link_token = db.Column(db.String(255), nullable=True)
+    invite_link_url = db.Column(db.String(512), nullable=True)
+    invite_link_expires_at = db.Column(db.DateTime, nullable=True)
+    subscription_starts_at = db.Column(db.DateTime, nullable=True)
+    subscription_expires_at = db.Column(db.DateTime, nullable=False)
+    status = db.Column(db.String(20), nullable=False)
+    created_at = db.Column(db.DateTime, nullable=True)
+    updated_at = db.Column(db.DateTime, nullable=True)
+    archived_at = db.Column(
+        db.DateTime, nullable=False, default=lambda: datetime.now(timezone.utc)
+    )
+
+    def __repr__(self):
+        return f"<SubscriptionArchive {self.id} - {self.status}>"
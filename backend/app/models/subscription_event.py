@@ -0,0 +1,49 @@
+from datetime import datetime, timezone
+from app import db
+
+# Event types recorded in the subscription audit log
+EVENT_TYPES = (
+    "created",
+    "invite_issued",
+    "join_approved",
+    "join_declined",
+    "expired",
+    "cancelled",
+    "renewed",
+    "kicked",
+    "kick_failed",
+    "invite_revoked",
+)
+
+
+class SubscriptionEvent(db.Model):
+    """Append-only audit log entry for a subscription.
+
+    On PostgreSQL the table is range-partitioned by month on created_at, which
+    is why created_at is part of the primary key. subscription_id deliberately
+    has no foreign key so the history outlives archived or deleted rows.
+    """
+
+    __tablename__ = "subscription_events"
+    __table_args__ = (
+        db.Index(
+            "ix_subscription_events_subscription_id_created_at",
+            "subscription_id",
+            "created_at",
+        ),
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
+
+    id = db.Column(
+        db.BigInteger, db.Sequence("subscription_events_id_seq"), primary_key=True
+    )
+    created_at = db.Column(
+        db.DateTime, primary_key=True, default=lambda: datetime.now(timezone.utc)
+    )
+    subscription_id = db.Column(db.Integer, nullable=False)
+    event_type = db.Column(db.String(32), nullable=False)
+    telegram_user_id = db.Column(db.String(100), nullable=True)
+    details = db.Column(db.JSON, nullable=True)
+
+    def __repr__(self):
+        return f"<SubscriptionEvent {self.event_type} - Subscription: {self.subscription_id}>"
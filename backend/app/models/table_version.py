@@ -0,0 +1,19 @@
+from datetime import datetime, timezone
+from app import db
+
+
+class TableVersion(db.Model):
+    """Monotonic version per table, bumped in the same transaction as writes.
+
+    Used to derive ETag/Last-Modified for cached read endpoints without
+    re-querying the underlying tables.
+    """
+
+    __tablename__ = "table_versions"
+
+    name = db.Column(db.String(64), primary_key=True)
+    version = db.Column(db.BigInteger, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
+
+    def __repr__(self):
+        return f"<TableVersion {self.name}={self.version}>"
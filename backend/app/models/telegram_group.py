@@ -12,6 +12,9 @@ class TelegramGroup(db.Model):
         db.String(24), db.ForeignKey("products.id"), nullable=True
     )
     is_active = db.Column(db.Boolean, default=True)
+    # Numeric ID of the pool bot that makes Bot API calls for this group;
+    # NULL means the primary bot (TELEGRAM_BOT_TOKEN)
+    bot_id = db.Column(db.String(20), nullable=True, index=True)
     created_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
     updated_at = db.Column(
         db.DateTime,
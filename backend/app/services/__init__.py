@@ -1,3 +1,13 @@
 from app.services.product_service import ProductService
 from app.services.telegram_group_service import TelegramGroupService
-from app.services.subscription_service import SubscriptionService
\ No newline at end of file
+from app.services.subscription_service import SubscriptionService
+from app.services.subscription_event_service import SubscriptionEventService
+from app.services.membership_stats_service import MembershipStatsService
+from app.services.user_service import UserService
+from app.services.table_version_service import TableVersionService
+from app.services.idempotency_service import IdempotencyService
+from app.services.group_member_service import GroupMemberService
+from app.services.group_discovery_service import GroupDiscoveryService
+from app.services.subscription_archive_service import SubscriptionArchiveService
+from app.services.subscription_partition_service import SubscriptionPartitionService
+from app.services.pending_join_service import PendingJoinService
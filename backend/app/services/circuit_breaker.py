@@ -0,0 +1,238 @@
+"""Circuit breakers for Telegram Bot API calls.
+
+One breaker per Bot API method trips on transport-level failures (timeouts,
+network errors, flood control), and one breaker per chat trips on errors that
+only concern that chat (chat not found, bot kicked, missing admin rights).
+While a breaker is open calls fail immediately with CircuitOpenError instead
+of waiting for the HTTP timeout; after ``reset_timeout`` a single probe call is
+let through (half-open) and its outcome closes or re-opens the breaker.
+"""
+import threading
+import time
+from collections import deque
+from typing import Iterable, Optional, Tuple
+
+from telegram.error import (
+    BadRequest,
+    ChatMigrated,
+    Forbidden,
+    RetryAfter,
+    TelegramError,
+)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+# BadRequest descriptions that mean "this chat is unusable", not "this call was wrong"
+CHAT_ERROR_MARKERS = (
+    "chat not found",
+    "not enough rights",
+    "need administrator rights",
+    "chat_admin_required",
+    "bot is not a member",
+    "have no rights",
+)
+
+
+class CircuitOpenError(TelegramError):
+    """Raised instead of calling the Bot API while a breaker is open.
+
+    Subclasses TelegramError so existing ``except TelegramError`` handlers
+    treat it as a failed call.
+    """
+
+    def __init__(self, name: str, retry_after: float):
+        super().__init__(f"Circuit open for {name}, retry in {retry_after:.0f}s")
+        self.name = name
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    def __init__(
+        self,
+        name: str,
+        window_size: int = 20,
+        min_calls: int = 5,
+        failure_rate: float = 0.5,
+        reset_timeout: float = 30.0,
+    ):
+        self.name = name
+        self.window_size = window_size
+        self.min_calls = min_calls
+        self.failure_rate = failure_rate
+        self.reset_timeout = reset_timeout
+        self.state = CLOSED
+        self.opened_until = 0.0
+        self.trips = 0
+        self._outcomes = deque(maxlen=window_size)
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    def retry_after(self) -> float:
+        """Seconds until a call would be allowed, 0 if it would be now"""
+        with self._lock:
+            if self.state == OPEN:
+                return max(0.0, self.opened_until - time.monotonic())
+            return 0.0
+
+    def before_call(self):
+        with self._lock:
+            if self.state == OPEN:
+                remaining = self.opened_until - time.monotonic()
+                if remaining > 0:
+                    raise CircuitOpenError(self.name, remaining)
+                self.state = HALF_OPEN
+                self._probe_in_flight = False
+            if self.state == HALF_OPEN:
+                if self._probe_in_flight:
+                    raise CircuitOpenError(self.name, 1.0)
+                self._probe_in_flight = True
+
+    def record_success(self):
+        with self._lock:
+            if self.state == HALF_OPEN:
+                self.state = CLOSED
+                self._outcomes.clear()
+                self._probe_in_flight = False
+            self._outcomes.append(True)
+
+    def record_failure(self, open_for: Optional[float] = None):
+        """Count a failure; ``open_for`` trips immediately (e.g. flood control)"""
+        with self._lock:
+            self._outcomes.append(False)
+            failures = self._outcomes.count(False)
+            if (
+                open_for is not None
+                or self.state == HALF_OPEN
+                or (
+                    len(self._outcomes) >= self.min_calls
+                    and failures / len(self._outcomes) >= self.failure_rate
+                )
+            ):
+                self._trip(open_for or self.reset_timeout)
+
+    def release_probe(self):
+        """Let another probe through if the half-open call ended without a verdict"""
+        with self._lock:
+            self._probe_in_flight = False
+
+    def _trip(self, duration: float):
+        if self.state != OPEN:
+            self.trips += 1
+        self.state = OPEN
+        self.opened_until = time.monotonic() + duration
+        self._outcomes.clear()
+        self._probe_in_flight = False
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            remaining = max(0.0, self.opened_until - time.monotonic())
+            return {
+                "name": self.name,
+                "state": self.state,
+                "retry_after": round(remaining, 1) if self.state == OPEN else 0,
+                "recent_calls": len(self._outcomes),
+                "recent_failures": self._outcomes.count(False),
+                "trips": self.trips,
+            }
+
+
+def classify_error(error: Exception) -> Optional[str]:
+    """Return "chat", "method" or None (a caller error that says nothing about health)"""
+    if isinstance(error, CircuitOpenError):
+        return None
+    if isinstance(error, (Forbidden, ChatMigrated)):
+        return "chat"
+    if isinstance(error, BadRequest):
+        message = str(error).lower()
+        if any(marker in message for marker in CHAT_ERROR_MARKERS):
+            return "chat"
+        return None
+    # Timeouts, network errors, flood control and anything unexpected
+    return "method"
+
+
+class CircuitBreakerRegistry:
+    def __init__(self):
+        self._breakers = {}
+        self._lock = threading.Lock()
+
+    def _get(self, name: str) -> CircuitBreaker:
+        breaker = self._breakers.get(name)
+        if breaker is None:
+            with self._lock:
+                breaker = self._breakers.get(name)
+                if breaker is None:
+                    if name.startswith("chat:"):
+                        # Chat errors are deterministic, so trip sooner and stay open longer
+                        breaker = CircuitBreaker(
+                            name, window_size=5, min_calls=2, failure_rate=1.0, reset_timeout=300.0
+                        )
+                    else:
+                        breaker = CircuitBreaker(name)
+                    self._breakers[name] = breaker
+        return breaker
+
+    def method(self, method: str) -> CircuitBreaker:
+        return self._get(f"method:{method}")
+
+    def chat(self, chat_id) -> CircuitBreaker:
+        return self._get(f"chat:{chat_id}")
+
+    def before_call(self, method: str, chat_id=None):
+        self.method(method).before_call()
+        if chat_id is not None:
+            try:
+                self.chat(chat_id).before_call()
+            except CircuitOpenError:
+                self.method(method).release_probe()
+                raise
+
+    def release_probe(self, method: str, chat_id=None):
+        self.method(method).release_probe()
+        if chat_id is not None:
+            self.chat(chat_id).release_probe()
+
+    def record_success(self, method: str, chat_id=None):
+        self.method(method).record_success()
+        if chat_id is not None:
+            self.chat(chat_id).record_success()
+
+    def record_error(self, method: str, chat_id, error: Exception):
+        kind = classify_error(error)
+        open_for = error.retry_after if isinstance(error, RetryAfter) else None
+        if kind == "method":
+            self.method(method).record_failure(open_for)
+        else:
+            # The API answered, so the method itself is healthy
+            self.method(method).record_success()
+        if chat_id is not None:
+            if kind == "chat":
+                self.chat(chat_id).record_failure()
+            elif kind == "method":
+                # Says nothing about the chat
+                self.chat(chat_id).release_probe()
+            else:
+                self.chat(chat_id).record_success()
+
+    def blocked(self, methods: Iterable[str], chat_id=None) -> Optional[Tuple[str, float]]:
+        """Return (scope, retry_after) for the first open breaker, else None.
+
+        ``scope`` is "method" or "chat", so batch jobs can pause entirely or
+        just skip the chat. Does not consume a half-open probe.
+        """
+        for method in methods:
+            wait = self.method(method).retry_after()
+            if wait > 0:
+                return "method", wait
+        if chat_id is not None:
+            wait = self.chat(chat_id).retry_after()
+            if wait > 0:
+                return "chat", wait
+        return None
+
+    def snapshot(self) -> list:
+        with self._lock:
+            breakers = list(self._breakers.values())
+        return [breaker.snapshot() for breaker in breakers]
@@ -0,0 +1,186 @@
+from datetime import datetime, timezone
+from app import db
+from app.models import BotUpdateOffset, TelegramGroup
+from app.services.table_version_service import TableVersionService
+from sqlalchemy import select
+from sqlalchemy.exc import SQLAlchemyError
+
+
+class GroupDiscoveryService:
+    @staticmethod
+    def record_stream(chats, offsets):
+        """Persist what the update stream observer saw since its last flush.
+
+        ``chats`` maps chat ID to (title, bot_id) for group chats seen in
+        updates. Only chats without a TelegramGroup row are inserted; existing
+        rows, including deactivated ones, are left to the my_chat_member
+        handler and the verify pass. ``offsets`` maps bot ID to the highest
+        update_id seen. Everything is written in one transaction. Returns the
+        chat IDs that were newly registered.
+        """
+        try:
+            registered = []
+            if chats:
+                existing = set(
+                    db.session.scalars(
+                        select(TelegramGroup.telegram_group_id).where(
+                            TelegramGroup.telegram_group_id.in_(
+                                [str(chat_id) for chat_id in chats]
+                            )
+                        )
+                    )
+                )
+                for chat_id, (title, bot_id) in chats.items():
+                    if str(chat_id) in existing:
+                        continue
+                    db.session.add(
+                        TelegramGroup(
+                            telegram_group_id=str(chat_id),
+                            telegram_group_name=title or str(chat_id),
+                            bot_id=bot_id,
+                        )
+                    )
+                    registered.append(str(chat_id))
+                if registered:
+                    TableVersionService.bump("telegram_groups")
+
+            if offsets:
+                GroupDiscoveryService._advance_offsets(offsets)
+
+            db.session.commit()
+            return registered
+        except SQLAlchemyError as e:
+            db.session.rollback()
+            raise e
+
+    @staticmethod
+    def _advance_offsets(offsets):
+        # Runs in the caller's transaction; offsets only ever move forward
+        now = datetime.now(timezone.utc)
+        rows = [
+            {"bot_id": bot_id, "update_id": update_id, "updated_at": now}
+            for bot_id, update_id in sorted(offsets.items())
+        ]
+        table = BotUpdateOffset.__table__
+        dialect = db.engine.dialect.name
+        if dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert as upsert
+        elif dialect == "sqlite":
+            from sqlalchemy.dialects.sqlite import insert as upsert
+        else:
+            for row in rows:
+                offset = BotUpdateOffset.query.get(row["bot_id"])
+                if offset is None:
+                    db.session.add(BotUpdateOffset(**row))
+                elif offset.update_id < row["update_id"]:
+                    offset.update_id = row["update_id"]
+                    offset.updated_at = now
+            return
+
+        stmt = upsert(table)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["bot_id"],
+            set_={
+                "update_id": stmt.excluded.update_id,
+                "updated_at": stmt.excluded.updated_at,
+            },
+            where=table.c.update_id < stmt.excluded.update_id,
+        )
+        db.session.execute(stmt, rows)
+
+    @staticmethod
+    def get_offsets(max_age=None):
+        """Return {bot_id: last processed update_id}.
+
+        With ``max_age`` (a timedelta), offsets not advanced for that long are
+        left out.
+        """
+        query = db.session.query(BotUpdateOffset.bot_id, BotUpdateOffset.update_id)
+        if max_age is not None:
+            query = query.filter(
+                BotUpdateOffset.updated_at >= datetime.now(timezone.utc) - max_age
+            )
+        return dict(query)
+
+    @staticmethod
+    def get_groups_to_verify():
+        """Return [(telegram_group_id, telegram_group_name, bot_id)] for active groups"""
+        return (
+            db.session.query(
+                TelegramGroup.telegram_group_id,
+                TelegramGroup.telegram_group_name,
+                TelegramGroup.bot_id,
+            )
+            .filter(TelegramGroup.is_active.is_(True))
+            .order_by(TelegramGroup.id)
+            .all()
+        )
+
+    @staticmethod
+    def apply_verification(results):
+        """Apply the outcome of a verify pass in one transaction.
+
+        ``results`` is a list of {"telegram_group_id", "status", "title",
+        "new_chat_id"} where status is ok, not_admin, gone, migrated or error.
+        Titles are refreshed, groups the bot was removed from are
+        deactivated, and groups upgraded to supergroups take their new chat
+        ID. Errors change nothing. Returns counts per outcome.
+        """
+        summary = {
+            "checked": len(results),
+            "renamed": 0,
+            "deactivated": 0,
+            "migrated": 0,
+            "not_admin": 0,
+            "errors": 0,
+        }
+        if not results:
+            return summary
+
+        try:
+            chat_ids = [result["telegram_group_id"] for result in results]
+            chat_ids += [
+                str(result["new_chat_id"]) for result in results if result.get("new_chat_id")
+            ]
+            groups = {
+                group.telegram_group_id: group
+                for group in TelegramGroup.query.filter(
+                    TelegramGroup.telegram_group_id.in_(chat_ids)
+                )
+            }
+
+            for result in results:
+                group = groups.get(result["telegram_group_id"])
+                status = result["status"]
+                if status == "error":
+                    summary["errors"] += 1
+                    continue
+                if group is None:
+                    continue
+                if status == "gone":
+                    group.is_active = False
+                    summary["deactivated"] += 1
+                elif status == "migrated":
+                    new_chat_id = str(result["new_chat_id"])
+                    if new_chat_id in groups:
+                        # The supergroup is already registered on its own
+                        group.is_active = False
+                    else:
+                        group.telegram_group_id = new_chat_id
+                        groups[new_chat_id] = group
+                    summary["migrated"] += 1
+                else:
+                    if status == "not_admin":
+                        summary["not_admin"] += 1
+                    title = result.get("title")
+                    if title and title != group.telegram_group_name:
+                        group.telegram_group_name = title
+                        summary["renamed"] += 1
+
+            if summary["renamed"] or summary["deactivated"] or summary["migrated"]:
+                TableVersionService.bump("telegram_groups")
+            db.session.commit()
+            return summary
+        except SQLAlchemyError as e:
+            db.session.rollback()
+            raise e
@@ -0,0 +1,300 @@
+import logging
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from app import db
+from app.models import GroupMember, Subscription, TelegramGroup, User
+from app.models.group_member import GONE_STATUSES, REGULAR_STATUSES
+from app.services.membership_stats_service import MembershipStatsService
+from app.services.subscription_event_service import SubscriptionEventService
+from sqlalchemy import and_, exists, select, tuple_
+from sqlalchemy.exc import SQLAlchemyError
+
+logger = logging.getLogger(__name__)
+
+LIVE_STATUSES = ("pending_join", "active")
+
+
+def _utc_naive(value):
+    if value is None:
+        return datetime.utcnow()
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+class GroupMemberService:
+    @staticmethod
+    def record_update(telegram_group_id, telegram_user_id, status, changed_at=None):
+        """Store the membership status reported by a chat_member update.
+
+        Updates older than the stored one are ignored, so redelivered or
+        reordered updates cannot resurrect a member who already left. Returns
+        False for groups the service does not know.
+        """
+        try:
+            group_pk = (
+                db.session.query(TelegramGroup.id)
+                .filter_by(telegram_group_id=str(telegram_group_id))
+                .scalar()
+            )
+            if group_pk is None:
+                return False
+
+            row = {
+                "telegram_group_id": group_pk,
+                "telegram_user_id": str(telegram_user_id),
+                "status": status,
+                "changed_at": _utc_naive(changed_at),
+            }
+            table = GroupMember.__table__
+            dialect = db.engine.dialect.name
+            if dialect in ("postgresql", "sqlite"):
+                if dialect == "postgresql":
+                    from sqlalchemy.dialects.postgresql import insert as upsert
+                else:
+                    from sqlalchemy.dialects.sqlite import insert as upsert
+                stmt = upsert(table).values(**row)
+                stmt = stmt.on_conflict_do_update(
+                    index_elements=["telegram_group_id", "telegram_user_id"],
+                    set_={
+                        "status": stmt.excluded.status,
+                        "changed_at": stmt.excluded.changed_at,
+                    },
+                    where=table.c.changed_at <= stmt.excluded.changed_at,
+                )
+                db.session.execute(stmt)
+            else:
+                member = GroupMember.query.get((group_pk, row["telegram_user_id"]))
+                if member is None:
+                    db.session.add(GroupMember(**row))
+                elif member.changed_at <= row["changed_at"]:
+                    member.status = status
+                    member.changed_at = row["changed_at"]
+
+            db.session.commit()
+            return True
+        except SQLAlchemyError as e:
+            db.session.rollback()
+            raise e
+
+    @staticmethod
+    def find_departed(batch_size=500, after_id=0):
+        """Active subscriptions whose user has left or been removed from the group.
+
+        Only departures recorded after the subscription started count, so an
+        old leave does not cancel a later purchase. Returns up to
+        ``batch_size`` rows of (subscription_id, product_id, group_pk,
+        telegram_user_id) ordered by subscription ID, for keyset paging.
+        """
+        return (
+            db.session.query(
+                Subscription.id,
+                Subscription.product_id,
+                Subscription.telegram_group_id,
+                User.telegram_user_id,
+            )
+            .join(User, User.id == Subscription.user_id)
+            .join(
+                GroupMember,
+                and_(
+                    GroupMember.telegram_group_id == Subscription.telegram_group_id,
+                    GroupMember.telegram_user_id == User.telegram_user_id,
+                ),
+            )
+            .filter(
+                Subscription.status == "active",
+                GroupMember.status.in_(GONE_STATUSES),
+                GroupMember.changed_at > Subscription.subscription_starts_at,
+                Subscription.id > after_id,
+            )
+            .order_by(Subscription.id)
+            .limit(batch_size)
+            .all()
+        )
+
+    @staticmethod
+    def expire_departed(rows):
+        """Expire a batch from find_departed in one statement.
+
+        Rows that are no longer active (e.g. expired by the sweep meanwhile)
+        are left alone; counters and events follow the rows actually updated.
+        Returns the number of subscriptions expired.
+        """
+        if not rows:
+            return 0
+        users = {subscription_id: user_id for subscription_id, _, _, user_id in rows}
+        try:
+            updated = db.session.execute(
+                Subscription.__table__.update()
+                .where(
+                    Subscription.id.in_(list(users)),
+                    Subscription.status == "active",
+                )
+                .values(status="expired", updated_at=datetime.now(timezone.utc))
+                .returning(
+                    Subscription.id,
+                    Subscription.product_id,
+                    Subscription.telegram_group_id,
+                )
+            ).all()
+
+            moved = Counter(
+                (product_id, group_pk) for _, product_id, group_pk in updated
+            )
+            deltas = {}
+            for (product_id, group_pk), amount in moved.items():
+                deltas[(product_id, group_pk, "active")] = -amount
+                deltas[(product_id, group_pk, "expired")] = amount
+            MembershipStatsService.apply_deltas(deltas)
+            db.session.commit()
+        except SQLAlchemyError as e:
+            db.session.rollback()
+            raise e
+
+        for subscription_id, _, _ in updated:
+            SubscriptionEventService.record(
+                subscription_id,
+                "expired",
+                users[subscription_id],
+                reason="left_group",
+            )
+        return len(updated)
+
+    @staticmethod
+    def find_intruders(joined_before, batch_size=500, after=None):
+        """Members with no live subscription in a product-mapped group.
+
+        Administrators and the group creator are never returned, nor are
+        members who joined after ``joined_before`` (their join approval may
+        still be committing). Returns up to ``batch_size`` rows of
+        (group_pk, chat_id, telegram_user_id), ordered for keyset paging with
+        ``after=(group_pk, telegram_user_id)``.
+        """
+        live_subscription = (
+            select(Subscription.id)
+            .join(User, User.id == Subscription.user_id)
+            .where(
+                Subscription.telegram_group_id == GroupMember.telegram_group_id,
+                Subscription.status.in_(LIVE_STATUSES),
+                User.telegram_user_id == GroupMember.telegram_user_id,
+            )
+        )
+        query = (
+            db.session.query(
+                GroupMember.telegram_group_id,
+                TelegramGroup.telegram_group_id,
+                GroupMember.telegram_user_id,
+            )
+            .join(TelegramGroup, TelegramGroup.id == GroupMember.telegram_group_id)
+            .filter(
+                TelegramGroup.product_id.isnot(None),
+                TelegramGroup.is_active.is_(True),
+                GroupMember.status.in_(REGULAR_STATUSES),
+                GroupMember.changed_at <= joined_before,
+                ~exists(live_subscription),
+            )
+        )
+        if after is not None:
+            query = query.filter(
+                tuple_(GroupMember.telegram_group_id, GroupMember.telegram_user_id)
+                > tuple_(*after)
+            )
+        return (
+            query.order_by(GroupMember.telegram_group_id, GroupMember.telegram_user_id)
+            .limit(batch_size)
+            .all()
+        )
+
+    @staticmethod
+    def mark_removed(group_pk, telegram_user_ids):
+        """Record members the reconciliation job kicked as gone"""
+        if not telegram_user_ids:
+            return
+        try:
+            db.session.execute(
+                GroupMember.__table__.update()
+                .where(
+                    GroupMember.telegram_group_id == group_pk,
+                    GroupMember.telegram_user_id.in_(list(telegram_user_ids)),
+                )
+                .values(status="kicked", changed_at=datetime.utcnow())
+            )
+            db.session.commit()
+        except SQLAlchemyError as e:
+            db.session.rollback()
+            raise e
+
+    @staticmethod
+    def reconcile(dry_run=False, kick_intruders=True, batch_size=500, grace_seconds=300):
+        """Diff the roster against subscriptions and act on the differences.
+
+        Active subscriptions of users who left are expired in bulk. Members
+        without a live subscription are kicked through the bulk lane, skipping
+        chats whose circuit is open and stopping if the Bot API is failing as a
+        whole. With ``dry_run`` nothing changes and only the counts are
+        returned.
+        """
+        summary = {
+            "dry_run": dry_run,
+            "departed": 0,
+            "expired": 0,
+            "intruders": 0,
+            "kicked": 0,
+            "kick_failed": 0,
+            "skipped": 0,
+            "paused_for": 0,
+        }
+
+        after_id = 0
+        while True:
+            rows = GroupMemberService.find_departed(batch_size, after_id)
+            if not rows:
+                break
+            summary["departed"] += len(rows)
+            if not dry_run:
+                summary["expired"] += GroupMemberService.expire_departed(rows)
+            after_id = rows[-1][0]
+
+        joined_before = datetime.utcnow() - timedelta(seconds=grace_seconds)
+        after = None
+        tg_bot = None
+        if not dry_run and kick_intruders:
+            from app.services.telegram import tg_bot
+
+        while True:
+            rows = GroupMemberService.find_intruders(joined_before, batch_size, after)
+            if not rows:
+                break
+            summary["intruders"] += len(rows)
+            after = (rows[-1][0], rows[-1][2])
+            if tg_bot is None:
+                continue
+
+            removed = {}
+            for group_pk, chat_id, telegram_user_id in rows:
+                blocked = tg_bot.circuit_blocked("remove_user", chat_id)
+                if blocked:
+                    scope, retry_after = blocked
+                    if scope == "method":
+                        summary["paused_for"] = round(retry_after)
+                        break
+                    summary["skipped"] += 1
+                    continue
+                success, message = tg_bot.remove_user(
+                    chat_id, int(telegram_user_id), lane="bulk"
+                )
+                if success:
+                    removed.setdefault(group_pk, []).append(telegram_user_id)
+                    summary["kicked"] += 1
+                else:
+                    logger.error(
+                        f"Failed to remove unsubscribed member {telegram_user_id} from {chat_id}: {message}"
+                    )
+                    summary["kick_failed"] += 1
+
+            for group_pk, telegram_user_ids in removed.items():
+                GroupMemberService.mark_removed(group_pk, telegram_user_ids)
+            if summary["paused_for"]:
+                break
+
+        return summary
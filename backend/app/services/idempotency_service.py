@@ -0,0 +1,106 @@
+from datetime import datetime, timedelta
+from app import db
+from app.models import IdempotencyKey
+from flask import current_app
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+
+# An in_progress key older than this is assumed to belong to a crashed request
+# and may be taken over by a retry
+IN_PROGRESS_TIMEOUT = timedelta(minutes=2)
+
+KEY_MISMATCH = "Idempotency-Key was already used with a different request"
+KEY_IN_PROGRESS = "A request with this Idempotency-Key is still in progress"
+
+
+class IdempotencyService:
+    @staticmethod
+    def begin(scope, key, request_hash):
+        """Claim ``key`` for a new request or return the stored outcome.
+
+        Returns (record, error):
+        - (None, None): the key was claimed; run the request and call complete()
+        - (record, None): a completed record whose response should be replayed
+        - (None, error): the key is in use by a different or still-running request
+        """
+        now = datetime.utcnow()
+        ttl = timedelta(hours=current_app.config.get("IDEMPOTENCY_KEY_TTL_HOURS", 24))
+        try:
+            record = db.session.get(IdempotencyKey, (scope, key))
+            if record is not None and record.expires_at > now:
+                if record.request_hash != request_hash:
+                    return None, KEY_MISMATCH
+                if record.status == "completed":
+                    return record, None
+                if now - record.created_at < IN_PROGRESS_TIMEOUT:
+                    return None, KEY_IN_PROGRESS
+
+            if record is None:
+                db.session.add(
+                    IdempotencyKey(
+                        scope=scope,
+                        key=key,
+                        request_hash=request_hash,
+                        created_at=now,
+                        expires_at=now + ttl,
+                    )
+                )
+            else:
+                # Expired or abandoned: reuse the row for this request
+                record.request_hash = request_hash
+                record.status = "in_progress"
+                record.response_code = None
+                record.response_body = None
+                record.created_at = now
+                record.expires_at = now + ttl
+            db.session.commit()
+            return None, None
+        except IntegrityError:
+            # A concurrent request inserted the same key first
+            db.session.rollback()
+            return None, KEY_IN_PROGRESS
+        except SQLAlchemyError as e:
+            db.session.rollback()
+            raise e
+
+    @staticmethod
+    def complete(scope, key, response_code, response_body):
+        try:
+            db.session.query(IdempotencyKey).filter_by(scope=scope, key=key).update(
+                {
+                    "status": "completed",
+                    "response_code": response_code,
+                    "response_body": response_body,
+                },
+                synchronize_session=False,
+            )
+            db.session.commit()
+        except SQLAlchemyError as e:
+            db.session.rollback()
+            raise e
+
+    @staticmethod
+    def release(scope, key):
+        """Forget a claimed key so the client can retry after a server error"""
+        try:
+            db.session.query(IdempotencyKey).filter_by(
+                scope=scope, key=key, status="in_progress"
+            ).delete(synchronize_session=False)
+            db.session.commit()
+        except SQLAlchemyError as e:
+            db.session.rollback()
+            raise e
+
+    @staticmethod
+    def purge_expired():
+        """Delete expired keys; returns the number of rows removed"""
+        try:
+            deleted = (
+                db.session.query(IdempotencyKey)
+                .filter(IdempotencyKey.expires_at <= datetime.utcnow())
+                .delete(synchronize_session=False)
+            )
+            db.session.commit()
+            return deleted
+        except SQLAlchemyError as e:
+            db.session.rollback()
+            raise e
@@ -0,0 +1,166 @@
+from app import db
+from app.models import MembershipCounter, Product, Subscription, SubscriptionArchive, TelegramGroup
+from sqlalchemy import func, insert, select, text, union_all
+from sqlalchemy.exc import SQLAlchemyError
+
+STATUSES = ("pending_join", "active", "expired", "cancelled")
+
+
+class MembershipStatsService:
+    @staticmethod
+    def record_transition(
+        product_id, telegram_group_id, old_status, new_status, amount=1
+    ):
+        """Move ``amount`` subscriptions from old_status to new_status.
+
+        Runs in the caller's transaction and does not commit, so the counters
+        change atomically with the subscription rows. Either status may be None
+        for subscriptions being created or removed.
+        """
+        if old_status == new_status:
+            return
+
+        deltas = {}
+        if old_status:
+            deltas[(product_id, telegram_group_id, old_status)] = -amount
+        if new_status:
+            deltas[(product_id, telegram_group_id, new_status)] = amount
+        MembershipStatsService.apply_deltas(deltas)
+
+    @staticmethod
+    def apply_deltas(deltas):
+        """Apply {(product_id, telegram_group_id, status): delta} in one statement"""
+        rows = [
+            {
+                "product_id": product_id,
+                "telegram_group_id": telegram_group_id,
+                "status": status,
+                "count": delta,
+            }
+            # Sorted so concurrent transactions lock counter rows in the same order
+            for (product_id, telegram_group_id, status), delta in sorted(
+                deltas.items()
+            )
+            if delta
+        ]
+        if not rows:
+            return
+
+        table = MembershipCounter.__table__
+        dialect = db.engine.dialect.name
+        if dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert as upsert
+        elif dialect == "sqlite":
+            from sqlalchemy.dialects.sqlite import insert as upsert
+        else:
+            for row in rows:
+                updated = db.session.execute(
+                    table.update()
+                    .where(
+                        table.c.product_id == row["product_id"],
+                        table.c.telegram_group_id == row["telegram_group_id"],
+                        table.c.status == row["status"],
+                    )
+                    .values(count=table.c.count + row["count"])
+                )
+                if not updated.rowcount:
+                    db.session.execute(table.insert(), row)
+            return
+
+        stmt = upsert(table)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["product_id", "telegram_group_id", "status"],
+            set_={"count": table.c.count + stmt.excluded["count"]},
+        )
+        db.session.execute(stmt, rows)
+
+    @staticmethod
+    def get_stats(product_id=None, telegram_group_id=None):
+        """Aggregate counters per product and per group in a single query"""
+        query = db.session.query(
+            MembershipCounter.product_id,
+            MembershipCounter.status,
+            MembershipCounter.count,
+            TelegramGroup.id,
+            TelegramGroup.telegram_group_id,
+            TelegramGroup.telegram_group_name,
+        ).join(TelegramGroup, TelegramGroup.id == MembershipCounter.telegram_group_id)
+
+        if product_id:
+            query = query.filter(MembershipCounter.product_id == product_id)
+
+        if telegram_group_id:
+            query = query.filter(
+                TelegramGroup.telegram_group_id == str(telegram_group_id)
+            )
+
+        products = {}
+        groups = {}
+        for pid, status, count, group_id, tg_group_id, group_name in query:
+            product = products.setdefault(
+                pid, dict({"product_id": pid}, **dict.fromkeys(STATUSES, 0))
+            )
+            group = groups.setdefault(
+                group_id,
+                dict(
+                    {
+                        "id": group_id,
+                        "telegram_group_id": tg_group_id,
+                        "telegram_group_name": group_name,
+                    },
+                    **dict.fromkeys(STATUSES, 0),
+                ),
+            )
+            if status in STATUSES:
+                product[status] += count
+                group[status] += count
+
+        return {"products": list(products.values()), "groups": list(groups.values())}
+
+    @staticmethod
+    def rebuild():
+        """Recompute every counter from the subscriptions table and its archive"""
+        try:
+            if db.engine.dialect.name == "postgresql":
+                # Hold off concurrent increments so the rebuilt counts are exact
+                db.session.execute(
+                    text("LOCK TABLE membership_counters IN EXCLUSIVE MODE")
+                )
+
+            # Archived rows still count; those whose product or group has
+            # since been deleted are skipped (the counters would cascade away)
+            rows = union_all(
+                select(
+                    Subscription.product_id,
+                    Subscription.telegram_group_id,
+                    Subscription.status,
+                ).where(Subscription.status.isnot(None)),
+                select(
+                    SubscriptionArchive.product_id,
+                    SubscriptionArchive.telegram_group_id,
+                    SubscriptionArchive.status,
+                )
+                .join(Product, Product.id == SubscriptionArchive.product_id)
+                .join(TelegramGroup, TelegramGroup.id == SubscriptionArchive.telegram_group_id),
+            ).subquery()
+
+            db.session.query(MembershipCounter).delete()
+            db.session.execute(
+                insert(MembershipCounter).from_select(
+                    ["product_id", "telegram_group_id", "status", "count"],
+                    select(
+                        rows.c.product_id,
+                        rows.c.telegram_group_id,
+                        rows.c.status,
+                        func.count(),
+                    ).group_by(
+                        rows.c.product_id,
+                        rows.c.telegram_group_id,
+                        rows.c.status,
+                    ),
+                )
+            )
+            db.session.commit()
+        except SQLAlchemyError as e:
+            db.session.rollback()
+            raise e
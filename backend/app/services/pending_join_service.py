@@ -0,0 +1,158 @@
+import logging
+from datetime import datetime, timedelta, timezone
+from app import db
+from app.models import Subscription, TelegramGroup
+from sqlalchemy import func, select
+from sqlalchemy.exc import SQLAlchemyError
+from app.services.subscription_event_service import SubscriptionEventService
+from app.services.membership_stats_service import MembershipStatsService
+
+logger = logging.getLogger(__name__)
+
+
+class PendingJoinService:
+    @staticmethod
+    def find_stale(cutoff, batch_size=200, after_id=0):
+        """Return the next ``batch_size`` stale pending_join subscriptions after ``after_id``.
+
+        A subscription is stale once its invite link was last issued before
+        ``cutoff`` or the subscription itself has expired. Rows are
+        (id, chat_id, invite_link_url, group_active), ordered by id.
+        """
+        return db.session.execute(
+            select(
+                Subscription.id,
+                TelegramGroup.telegram_group_id.label("chat_id"),
+                Subscription.invite_link_url,
+                TelegramGroup.is_active.label("group_active"),
+            )
+            .join(TelegramGroup, TelegramGroup.id == Subscription.telegram_group_id)
+            .where(
+                Subscription.status == "pending_join",
+                Subscription.id > after_id,
+                (
+                    func.coalesce(Subscription.updated_at, Subscription.created_at) < cutoff
+                )
+                | (Subscription.subscription_expires_at <= datetime.utcnow()),
+            )
+            .order_by(Subscription.id)
+            .limit(batch_size)
+        ).all()
+
+    @staticmethod
+    def expire_stale(ids):
+        """Expire the subscriptions in ``ids`` that are still pending_join.
+
+        One UPDATE for the batch; a subscription whose member joined in the
+        meantime is no longer pending_join and is left alone. Returns the
+        IDs that were expired.
+        """
+        if not ids:
+            return []
+        hot = Subscription.__table__
+        try:
+            rows = db.session.execute(
+                hot.update()
+                .where(hot.c.id.in_(ids), hot.c.status == "pending_join")
+                .values(status="expired", updated_at=datetime.now(timezone.utc))
+                .returning(hot.c.id, hot.c.product_id, hot.c.telegram_group_id)
+            ).all()
+
+            deltas = {}
+            for _, product_id, group_pk in rows:
+                deltas[(product_id, group_pk, "pending_join")] = (
+                    deltas.get((product_id, group_pk, "pending_join"), 0) - 1
+                )
+                deltas[(product_id, group_pk, "expired")] = (
+                    deltas.get((product_id, group_pk, "expired"), 0) + 1
+                )
+            MembershipStatsService.apply_deltas(deltas)
+            db.session.commit()
+        except SQLAlchemyError as e:
+            db.session.rollback()
+            raise e
+        return [row[0] for row in rows]
+
+    @staticmethod
+    def reap(ttl_hours=168, batch_size=200, concurrency=5, max_batches=None):
+        """Revoke the invite links of stale pending_join subscriptions and expire them.
+
+        Works through the stale rows ``batch_size`` at a time: each batch's
+        links are revoked concurrently through the bulk lane, then the batch
+        is expired in one statement. Rows whose revocation failed for a
+        retryable reason, or whose group's circuit is open, stay pending_join
+        for the next run; rows in inactive groups or without a link are
+        expired straight away. Returns a summary of the run.
+        """
+        from app.services.telegram import tg_bot
+
+        cutoff = datetime.utcnow() - timedelta(hours=ttl_hours)
+        summary = {
+            "found": 0,
+            "revoked": 0,
+            "rejected": 0,
+            "revoke_failed": 0,
+            "revoke_skipped": 0,
+            "expired": 0,
+            "paused_for": 0,
+        }
+        after_id = 0
+        batches = 0
+        while max_batches is None or batches < max_batches:
+            rows = PendingJoinService.find_stale(cutoff, batch_size, after_id)
+            if not rows:
+                break
+            after_id = rows[-1].id
+            batches += 1
+            summary["found"] += len(rows)
+
+            to_expire = []
+            to_revoke = []
+            for row in rows:
+                if not row.invite_link_url or not row.group_active:
+                    to_expire.append(row.id)
+                    continue
+                if summary["paused_for"]:
+                    summary["revoke_skipped"] += 1
+                    continue
+                blocked = tg_bot.circuit_blocked("revoke_invite_link", row.chat_id)
+                if blocked:
+                    scope, retry_after = blocked
+                    if scope == "method":
+                        summary["paused_for"] = round(retry_after)
+                    summary["revoke_skipped"] += 1
+                    continue
+                to_revoke.append(row)
+
+            results = tg_bot.revoke_invite_links(
+                [(int(row.chat_id), row.invite_link_url) for row in to_revoke],
+                lane="bulk",
+                concurrency=concurrency,
+            )
+            messages = {}
+            for row, (status, message) in zip(to_revoke, results):
+                if status == "failed":
+                    summary["revoke_failed"] += 1
+                    continue
+                summary[status] += 1
+                messages[row.id] = message
+                to_expire.append(row.id)
+
+            expired = PendingJoinService.expire_stale(to_expire)
+            summary["expired"] += len(expired)
+            for subscription_id in expired:
+                if subscription_id in messages:
+                    SubscriptionEventService.record(
+                        subscription_id, "invite_revoked", message=messages[subscription_id]
+                    )
+                SubscriptionEventService.record(
+                    subscription_id, "expired", reason="never_joined"
+                )
+
+            if summary["paused_for"]:
+                # Telegram is failing as a whole; the rest waits for the next run
+                break
+
+        if summary["found"]:
+            logger.info(f"Reaped stale pending subscriptions: {summary}")
+        return summary
@@ -1,11 +1,129 @@
+import threading
+import time
+from typing import NamedTuple
 from app import db
 from app.models import Product
+from app.services.table_version_service import TableVersionService
 from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import selectinload
+
+# In-process cache of the (id, name) product list used by admin dropdowns.
+# Cleared on every product write in this process; the TTL bounds staleness
+# for writes made by other workers.
+SUMMARY_TTL_SECONDS = 60
+_summary_cache = {"data": None, "loaded_at": 0.0, "generation": 0}
+_summary_lock = threading.Lock()
+
+
+class CatalogSnapshot(NamedTuple):
+    """Immutable, pre-built view of every product with its groups"""
+
+    versions: tuple
+    products: tuple
+    by_id: dict
+    groups_by_product: dict
+
+
+# The catalog is rebuilt whenever the versions of these tables move (see
+# TableVersionService) and replaced with a single reference assignment, so
+# readers never observe a half-built snapshot.
+CATALOG_TABLES = ("products", "telegram_groups")
+_catalog = None
+_catalog_lock = threading.Lock()
+
+
+def _group_to_dict(group):
+    return {
+        "id": group.id,
+        "telegram_group_id": group.telegram_group_id,
+        "telegram_group_name": group.telegram_group_name,
+        "product_id": group.product_id,
+        "is_active": group.is_active,
+        "bot_id": group.bot_id,
+    }
+
+
+def _build_catalog(versions):
+    # Two queries in total: products, then all their groups via selectinload
+    products = (
+        Product.query.options(selectinload(Product.telegram_groups))
+        .order_by(Product.created_at, Product.id)
+        .all()
+    )
+    items = []
+    groups_by_product = {}
+    for product in products:
+        groups = tuple(
+            _group_to_dict(group)
+            for group in sorted(product.telegram_groups, key=lambda g: g.id)
+        )
+        groups_by_product[product.id] = groups
+        items.append(
+            {
+                "id": product.id,
+                "name": product.name,
+                "description": product.description,
+                "telegram_groups": groups,
+            }
+        )
+    items = tuple(items)
+    return CatalogSnapshot(
+        versions=versions,
+        products=items,
+        by_id={item["id"]: item for item in items},
+        groups_by_product=groups_by_product,
+    )
+
 
 class ProductService:
     @staticmethod
     def get_all_products():
         return Product.query.all()
+
+    @staticmethod
+    def get_catalog():
+        """Return the current CatalogSnapshot, rebuilding it if a write moved
+        the products or telegram_groups version.
+
+        Reads between writes are served from memory; only the (cached) table
+        versions are checked.
+        """
+        global _catalog
+        versions = TableVersionService.get_versions(*CATALOG_TABLES)
+        key = tuple(versions[name][0] for name in CATALOG_TABLES)
+        snapshot = _catalog
+        if snapshot is not None and snapshot.versions == key:
+            return snapshot
+        with _catalog_lock:
+            snapshot = _catalog
+            if snapshot is None or snapshot.versions != key:
+                snapshot = _build_catalog(key)
+                _catalog = snapshot
+        return snapshot
+
+    @staticmethod
+    def get_products_summary():
+        """Return [{"id", "name"}] for all products, served from a short-lived cache"""
+        with _summary_lock:
+            data = _summary_cache["data"]
+            if data is not None and time.monotonic() - _summary_cache["loaded_at"] < SUMMARY_TTL_SECONDS:
+                return data
+            generation = _summary_cache["generation"]
+
+        rows = db.session.query(Product.id, Product.name).order_by(Product.name).all()
+        data = [{"id": row.id, "name": row.name} for row in rows]
+        with _summary_lock:
+            # Don't cache a result that raced with a write
+            if _summary_cache["generation"] == generation:
+                _summary_cache["data"] = data
+                _summary_cache["loaded_at"] = time.monotonic()
+        return data
+
+    @staticmethod
+    def invalidate_products_summary():
+        with _summary_lock:
+            _summary_cache["data"] = None
+            _summary_cache["generation"] += 1
     
     @staticmethod
     def get_product_by_id(product_id):
@@ -20,7 +138,9 @@ class ProductService:
                 description=product_data.get('description')
             )
             db.session.add(product)
+            TableVersionService.bump("products")
             db.session.commit()
+            ProductService.invalidate_products_summary()
             return product
         except SQLAlchemyError as e:
             db.session.rollback()
@@ -36,7 +156,9 @@ class ProductService:
             product.name = product_data.get('name', product.name)
             product.description = product_data.get('description', product.description)
             
+            TableVersionService.bump("products")
             db.session.commit()
+            ProductService.invalidate_products_summary()
             return product
         except SQLAlchemyError as e:
             db.session.rollback()
@@ -50,7 +172,10 @@ class ProductService:
                 return False
             
             db.session.delete(product)
+            # Mapped groups are unlinked/removed along with the product
+            TableVersionService.bump("products", "telegram_groups")
             db.session.commit()
+            ProductService.invalidate_products_summary()
             return True
         except SQLAlchemyError as e:
             db.session.rollback()
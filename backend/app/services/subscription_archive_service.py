@@ -0,0 +1,76 @@
+from datetime import datetime, timedelta, timezone
+from app import db
+from app.models import Subscription, SubscriptionArchive
+from app.models.subscription_archive import ARCHIVED_COLUMNS
+from sqlalchemy import func, insert, literal, select
+from sqlalchemy.exc import SQLAlchemyError
+
+TERMINAL_STATUSES = ("expired", "cancelled")
+
+
+class SubscriptionArchiveService:
+    @staticmethod
+    def archive_batch(cutoff, batch_size=1000):
+        """Move up to ``batch_size`` terminal subscriptions last changed before ``cutoff``.
+
+        Copy and delete happen in one transaction, so an interrupted run
+        loses nothing and the next one carries on where it stopped.
+        Membership counters are left alone since they include archived rows.
+        Returns the number of rows moved.
+        """
+        hot = Subscription.__table__
+        try:
+            ids_query = (
+                select(hot.c.id)
+                .where(
+                    hot.c.status.in_(TERMINAL_STATUSES),
+                    func.coalesce(hot.c.updated_at, hot.c.created_at) < cutoff,
+                )
+                .order_by(hot.c.id)
+                .limit(batch_size)
+            )
+            if db.engine.dialect.name == "postgresql":
+                # Concurrent archivers take disjoint batches
+                ids_query = ids_query.with_for_update(skip_locked=True)
+            ids = list(db.session.scalars(ids_query))
+            if not ids:
+                return 0
+
+            db.session.execute(
+                insert(SubscriptionArchive).from_select(
+                    [*ARCHIVED_COLUMNS, "archived_at"],
+                    select(
+                        *(hot.c[name] for name in ARCHIVED_COLUMNS),
+                        literal(datetime.now(timezone.utc), db.DateTime),
+                    ).where(hot.c.id.in_(ids)),
+                )
+            )
+            db.session.execute(hot.delete().where(hot.c.id.in_(ids)))
+            db.session.commit()
+            return len(ids)
+        except SQLAlchemyError as e:
+            db.session.rollback()
+            raise e
+
+    @staticmethod
+    def archive(older_than_days=90, batch_size=1000, max_batches=None):
+        """Archive terminal subscriptions in batches until none are left.
+
+        On PostgreSQL whole expiry months are detached first; the row batches
+        then pick up what is left. ``max_batches`` bounds a single run; the
+        rest is picked up next time. Returns the total number of rows moved.
+        """
+        from app.services.subscription_partition_service import (
+            SubscriptionPartitionService,
+        )
+
+        cutoff = datetime.utcnow() - timedelta(days=older_than_days)
+        total = SubscriptionPartitionService.archive_partitions(cutoff)
+        batches = 0
+        while max_batches is None or batches < max_batches:
+            moved = SubscriptionArchiveService.archive_batch(cutoff, batch_size)
+            if not moved:
+                break
+            total += moved
+            batches += 1
+        return total
@@ -0,0 +1,176 @@
+import atexit
+import logging
+import queue
+import threading
+from datetime import date, datetime, timezone
+from app import db
+from app.db_pool import db_component
+from app.models import SubscriptionEvent
+from app.models.subscription_event import EVENT_TYPES
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+
+logger = logging.getLogger(__name__)
+
+
+class SubscriptionEventAppender:
+    """Buffers subscription events in memory and inserts them in batches.
+
+    append() only enqueues, so request handlers and bot callbacks never pay for
+    an extra synchronous INSERT. A daemon thread, started on first use, writes
+    up to ``batch_size`` rows per statement at least every ``flush_interval``
+    seconds, using its own app context and session.
+    """
+
+    def __init__(self, batch_size=200, flush_interval=1.0, max_pending=10000):
+        self.app = None
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._thread = None
+        self._lock = threading.Lock()
+        self._stopping = threading.Event()
+
+    def init_app(self, app):
+        self.app = app
+        atexit.register(self.stop)
+
+    def append(self, event):
+        if self.app is None:
+            logger.warning(f"Event appender not initialised, dropping event {event}")
+            return
+        self._ensure_started()
+        try:
+            self._queue.put_nowait(event)
+        except queue.Full:
+            logger.error(f"Event queue full, dropping event {event}")
+
+    def flush(self):
+        """Synchronously write everything queued so far; returns the number written"""
+        written = 0
+        while True:
+            batch = self._take_batch(timeout=None)
+            if not batch:
+                return written
+            if self._write(batch):
+                written += len(batch)
+
+    def stop(self, timeout=None):
+        """Stop the writer thread and write out what is still queued"""
+        self._stopping.set()
+        if self._thread and self._thread.is_alive():
+            join_timeout = self.flush_interval * 5
+            if timeout is not None:
+                join_timeout = min(join_timeout, timeout)
+            self._thread.join(timeout=join_timeout)
+        if self.app is None:
+            return {"events_drained": 0, "events_abandoned": 0}
+        queued = self._queue.qsize()
+        written = self.flush()
+        return {"events_drained": written, "events_abandoned": max(0, queued - written)}
+
+    def _ensure_started(self):
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="subscription-event-appender", daemon=True
+                )
+                self._thread.start()
+
+    def _run(self):
+        while not self._stopping.is_set():
+            batch = self._take_batch(timeout=self.flush_interval)
+            if batch:
+                self._write(batch)
+
+    def _take_batch(self, timeout):
+        batch = []
+        try:
+            if timeout is None:
+                batch.append(self._queue.get_nowait())
+            else:
+                batch.append(self._queue.get(timeout=timeout))
+        except queue.Empty:
+            return batch
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _write(self, batch):
+        with self.app.app_context(), db_component("background"):
+            try:
+                db.session.execute(SubscriptionEvent.__table__.insert(), batch)
+                db.session.commit()
+                return True
+            except SQLAlchemyError:
+                db.session.rollback()
+                logger.exception(f"Failed to write {len(batch)} subscription events")
+                return False
+
+
+event_appender = SubscriptionEventAppender()
+
+
+class SubscriptionEventService:
+    @staticmethod
+    def record(subscription_id, event_type, telegram_user_id=None, **details):
+        if event_type not in EVENT_TYPES:
+            raise ValueError("Invalid event type")
+
+        event_appender.append(
+            {
+                "subscription_id": subscription_id,
+                "event_type": event_type,
+                "telegram_user_id": (
+                    str(telegram_user_id) if telegram_user_id is not None else None
+                ),
+                "details": details or None,
+                "created_at": datetime.now(timezone.utc),
+            }
+        )
+
+    @staticmethod
+    def get_timeline(subscription_id):
+        # Make this process's pending events visible before reading
+        event_appender.flush()
+        return (
+            SubscriptionEvent.query.filter_by(subscription_id=subscription_id)
+            .order_by(SubscriptionEvent.created_at.asc(), SubscriptionEvent.id.asc())
+            .all()
+        )
+
+    @staticmethod
+    def ensure_partitions(months_ahead=2):
+        """Create monthly partitions from the current month up to months_ahead.
+
+        Only applies to PostgreSQL, where the table is partitioned by created_at.
+        Returns the names of the partitions that now exist for that range.
+        """
+        if db.engine.dialect.name != "postgresql":
+            return []
+
+        try:
+            names = []
+            start = date.today().replace(day=1)
+            for _ in range(months_ahead + 1):
+                end = date(start.year + start.month // 12, start.month % 12 + 1, 1)
+                name = f"subscription_events_y{start.year}m{start.month:02d}"
+                db.session.execute(
+                    text(
+                        f"CREATE TABLE IF NOT EXISTS {name} "
+                        f"PARTITION OF subscription_events "
+                        f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+                    )
+                )
+                names.append(name)
+                start = end
+            db.session.commit()
+            return names
+        except SQLAlchemyError as e:
+            db.session.rollback()
+            raise e
@@ -0,0 +1,145 @@
+import re
+from datetime import date, datetime, timezone
+from app import db
+from app.models.subscription_archive import ARCHIVED_COLUMNS
+from sqlalchemy import bindparam, text
+from sqlalchemy.exc import SQLAlchemyError
+
+DEFAULT_PARTITION = "subscriptions_default"
+PARTITION_NAME = re.compile(r"^subscriptions_y(\d{4})m(\d{2})$")
+TERMINAL_STATUSES = ("expired", "cancelled")
+
+
+def _add_months(day, months):
+    month = day.month - 1 + months
+    return date(day.year + month // 12, month % 12 + 1, 1)
+
+
+def _partitioned():
+    return db.engine.dialect.name == "postgresql"
+
+
+class SubscriptionPartitionService:
+    @staticmethod
+    def get_partitions():
+        """Return {name: (start, end)} for the monthly partitions attached to subscriptions"""
+        if not _partitioned():
+            return {}
+        names = db.session.scalars(
+            text(
+                "SELECT c.relname FROM pg_inherits i "
+                "JOIN pg_class c ON c.oid = i.inhrelid "
+                "WHERE i.inhparent = 'subscriptions'::regclass"
+            )
+        )
+        partitions = {}
+        for name in names:
+            match = PARTITION_NAME.match(name)
+            if match:
+                start = date(int(match.group(1)), int(match.group(2)), 1)
+                partitions[name] = (start, _add_months(start, 1))
+        return partitions
+
+    @staticmethod
+    def ensure_partitions(months_ahead=12):
+        """Create monthly partitions from the current month up to months_ahead.
+
+        Only applies to PostgreSQL. Rows already sitting in the default
+        partition for a new month are moved into it before it is attached.
+        Returns the names of the partitions created.
+        """
+        if not _partitioned():
+            return []
+
+        existing = SubscriptionPartitionService.get_partitions()
+        created = []
+        start = date.today().replace(day=1)
+        for _ in range(months_ahead + 1):
+            end = _add_months(start, 1)
+            name = f"subscriptions_y{start.year}m{start.month:02d}"
+            if name not in existing:
+                SubscriptionPartitionService._create_partition(name, start, end)
+                created.append(name)
+            start = end
+        return created
+
+    @staticmethod
+    def _create_partition(name, start, end):
+        bounds = {"start": start, "end": end}
+        try:
+            # Nothing may land in the default partition for this range meanwhile
+            db.session.execute(text(f"LOCK TABLE {DEFAULT_PARTITION} IN EXCLUSIVE MODE"))
+            db.session.execute(
+                text(f"CREATE TABLE {name} (LIKE subscriptions INCLUDING DEFAULTS)")
+            )
+            db.session.execute(
+                text(
+                    f"WITH moved AS ("
+                    f"DELETE FROM {DEFAULT_PARTITION} "
+                    f"WHERE subscription_expires_at >= :start AND subscription_expires_at < :end "
+                    f"RETURNING *) "
+                    f"INSERT INTO {name} SELECT * FROM moved"
+                ),
+                bounds,
+            )
+            db.session.execute(
+                text(
+                    f"ALTER TABLE subscriptions ATTACH PARTITION {name} "
+                    f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+                )
+            )
+            db.session.commit()
+        except SQLAlchemyError as e:
+            db.session.rollback()
+            raise e
+
+    @staticmethod
+    def archive_partitions(cutoff):
+        """Archive whole months that expired before ``cutoff``.
+
+        A monthly partition qualifies once its range ends before the cutoff
+        and it only holds expired or cancelled subscriptions. It is detached,
+        copied into subscriptions_archive and dropped in one transaction, so
+        the live table never sees a large DELETE. Returns the number of rows
+        moved; months that still hold live rows are left to the row archiver.
+        """
+        if not _partitioned():
+            return 0
+
+        cutoff = cutoff.date() if isinstance(cutoff, datetime) else cutoff
+        columns = ", ".join(ARCHIVED_COLUMNS)
+        moved = 0
+        partitions = SubscriptionPartitionService.get_partitions()
+        for name, (_, end) in sorted(partitions.items(), key=lambda item: item[1]):
+            if end > cutoff:
+                continue
+            try:
+                # DETACH needs this lock anyway; taking it first keeps the
+                # check and the detach atomic and the wait bounded
+                db.session.execute(text("SET LOCAL lock_timeout = '5s'"))
+                db.session.execute(text("LOCK TABLE subscriptions IN ACCESS EXCLUSIVE MODE"))
+                live = db.session.execute(
+                    text(
+                        f"SELECT EXISTS (SELECT 1 FROM {name} "
+                        f"WHERE status IS NULL OR status NOT IN :terminal)"
+                    ).bindparams(bindparam("terminal", expanding=True)),
+                    {"terminal": list(TERMINAL_STATUSES)},
+                ).scalar()
+                if live:
+                    db.session.rollback()
+                    continue
+                db.session.execute(text(f"ALTER TABLE subscriptions DETACH PARTITION {name}"))
+                result = db.session.execute(
+                    text(
+                        f"INSERT INTO subscriptions_archive ({columns}, archived_at) "
+                        f"SELECT {columns}, :archived_at FROM {name}"
+                    ),
+                    {"archived_at": datetime.now(timezone.utc)},
+                )
+                db.session.execute(text(f"DROP TABLE {name}"))
+                db.session.commit()
+                moved += result.rowcount
+            except SQLAlchemyError as e:
+                db.session.rollback()
+                raise e
+        return moved
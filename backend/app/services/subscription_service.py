@@ -1,12 +1,38 @@
+import logging
 from datetime import datetime, timedelta, timezone
 from app import db
-from app.models import User, Product, TelegramGroup, Subscription
+from app.models import User, Product, TelegramGroup, Subscription, SubscriptionArchive
+from app.models.subscription_archive import ARCHIVED_COLUMNS
+from sqlalchemy import bindparam, case, func, literal, select, tuple_, union_all
 from sqlalchemy.exc import SQLAlchemyError
-from app.bot.telegram_client import generate_invite_link
-from app.services.telegram import tg_bot
+from app.services.subscription_event_service import SubscriptionEventService
+from app.services.membership_stats_service import MembershipStatsService
+
+logger = logging.getLogger(__name__)
+
+LIVE_STATUSES = ("active", "pending_join")
+
+# Telegram could not issue the link; transient, unlike the other errors
+INVITE_LINK_FAILED = "Failed to generate invite link"
 
 
 class SubscriptionService:
+    @staticmethod
+    def _subscription_rows(include_archived=False):
+        """Return the subscriptions table, or a union of it with the archive.
+
+        The union has the same column names plus ``archived``, so callers can
+        build the same query against either.
+        """
+        if not include_archived:
+            return Subscription.__table__
+        hot = Subscription.__table__
+        cold = SubscriptionArchive.__table__
+        return union_all(
+            select(*(hot.c[name] for name in ARCHIVED_COLUMNS), literal(False).label("archived")),
+            select(*(cold.c[name] for name in ARCHIVED_COLUMNS), literal(True).label("archived")),
+        ).subquery("subscriptions_all")
+
     @staticmethod
     def get_all_subscriptions(
         page=1,
@@ -17,7 +43,13 @@ class SubscriptionService:
         status=None,
         product_id=None,
         user_id=None,
+        include_archived=False,
     ):
+        if include_archived:
+            return SubscriptionService._get_all_with_archived(
+                page, per_page, sort_by, sort_order, search, status, product_id, user_id
+            )
+
         query = Subscription.query
 
         # Apply filters
@@ -63,6 +95,175 @@ class SubscriptionService:
             "pages": (total + per_page - 1) // per_page,  # Ceiling division
         }
 
+    @staticmethod
+    def _get_all_with_archived(
+        page, per_page, sort_by, sort_order, search, status, product_id, user_id
+    ):
+        """get_all_subscriptions over live and archived rows, as plain dicts"""
+        rows = SubscriptionService._subscription_rows(include_archived=True)
+        query = select(rows)
+
+        if status:
+            query = query.where(rows.c.status == status)
+
+        if product_id:
+            query = query.where(rows.c.product_id == product_id)
+
+        if user_id:
+            query = query.where(rows.c.user_id == user_id)
+
+        if search or sort_by == "email":
+            query = query.outerjoin(User, User.id == rows.c.user_id)
+            if search:
+                query = query.where(User.email.ilike(f"%{search}%"))
+
+        sort_column = User.email if sort_by == "email" else rows.c.get(sort_by, rows.c.created_at)
+        query = query.order_by(
+            sort_column.asc() if sort_order == "asc" else sort_column.desc()
+        )
+
+        total = db.session.scalar(select(func.count()).select_from(query.subquery()))
+        items = [
+            row._asdict()
+            for row in db.session.execute(
+                query.limit(per_page).offset((page - 1) * per_page)
+            )
+        ]
+        return {
+            "items": items,
+            "total": total,
+            "page": page,
+            "per_page": per_page,
+            "pages": (total + per_page - 1) // per_page,
+        }
+
+    @staticmethod
+    def iter_members(
+        product_id=None,
+        telegram_group_id=None,
+        statuses=None,
+        batch_size=1000,
+        include_archived=False,
+    ):
+        """Stream joined members as plain dicts shaped like the Member model.
+
+        Selects only the needed columns and fetches them from a server-side
+        cursor in batches of ``batch_size``, so memory stays flat no matter how
+        many rows match. With ``include_archived`` archived subscriptions are
+        streamed too, flagged with ``archived``.
+        """
+        rows = SubscriptionService._subscription_rows(include_archived)
+        query = (
+            select(
+                rows.c.id,
+                rows.c.status,
+                rows.c.subscription_expires_at,
+                rows.c.invite_link_url,
+                rows.c.invite_link_expires_at,
+                User.id,
+                User.email,
+                User.telegram_user_id,
+                User.telegram_username,
+                Product.id,
+                Product.name,
+                Product.description,
+                TelegramGroup.id,
+                TelegramGroup.telegram_group_id,
+                TelegramGroup.telegram_group_name,
+                TelegramGroup.is_active,
+            )
+            .join(User, User.id == rows.c.user_id)
+            .join(Product, Product.id == rows.c.product_id)
+            .outerjoin(TelegramGroup, TelegramGroup.id == rows.c.telegram_group_id)
+            .where(User.telegram_user_id.isnot(None))
+            .order_by(rows.c.id)
+        )
+        if include_archived:
+            query = query.add_columns(rows.c.archived)
+
+        if product_id:
+            query = query.where(rows.c.product_id == product_id)
+
+        if telegram_group_id:
+            query = query.where(TelegramGroup.telegram_group_id == str(telegram_group_id))
+
+        if statuses:
+            query = query.where(rows.c.status.in_(statuses))
+
+        result = db.session.execute(
+            query.execution_options(yield_per=batch_size)
+        )
+        for row in result:
+            member = {
+                "subscription_id": row[0],
+                "status": row[1],
+                "subscription_expires_at": row[2],
+                "invite_link_url": row[3],
+                "invite_link_expires_at": row[4],
+                "user": {
+                    "id": row[5],
+                    "email": row[6],
+                    "telegram_user_id": row[7],
+                    "telegram_username": row[8],
+                },
+                "product": {
+                    "id": row[9],
+                    "name": row[10],
+                    "description": row[11],
+                },
+                "telegram_group": {
+                    "id": row[12],
+                    "telegram_group_id": row[13],
+                    "telegram_group_name": row[14],
+                    "is_active": row[15],
+                },
+            }
+            if include_archived:
+                member["archived"] = row[16]
+            yield member
+
+    @staticmethod
+    def iter_subscriptions(
+        status=None, product_id=None, user_id=None, batch_size=1000, include_archived=False
+    ):
+        """Stream subscriptions joined with the user's email as flat dicts"""
+        rows = SubscriptionService._subscription_rows(include_archived)
+        query = (
+            select(
+                rows.c.id,
+                rows.c.user_id,
+                User.email,
+                rows.c.product_id,
+                rows.c.telegram_group_id,
+                rows.c.status,
+                rows.c.subscription_starts_at,
+                rows.c.subscription_expires_at,
+                rows.c.invite_link_url,
+                rows.c.invite_link_expires_at,
+                rows.c.created_at,
+                rows.c.updated_at,
+            )
+            .join(User, User.id == rows.c.user_id)
+            .order_by(rows.c.id)
+        )
+        if include_archived:
+            query = query.add_columns(rows.c.archived)
+
+        if status:
+            query = query.where(rows.c.status == status)
+
+        if product_id:
+            query = query.where(rows.c.product_id == product_id)
+
+        if user_id:
+            query = query.where(rows.c.user_id == user_id)
+
+        result = db.session.execute(
+            query.execution_options(yield_per=batch_size)
+        )
+        for row in result:
+            yield row._asdict()
+
     @staticmethod
     def get_subscription_by_id(subscription_id):
         return Subscription.query.get(subscription_id)
@@ -76,11 +277,19 @@ class SubscriptionService:
         return Subscription.query.filter_by(user_id=user_id, status="active").all()
 
     @staticmethod
-    def get_expired_subscriptions():
+    def get_expired_subscriptions(since=None):
+        """Active subscriptions past expiry.
+
+        ``since`` bounds the expiry from below so PostgreSQL only scans the
+        partitions for recent months.
+        """
         now = datetime.utcnow()
-        return Subscription.query.filter(
+        query = Subscription.query.filter(
             Subscription.status == "active", Subscription.subscription_expires_at <= now
-        ).all()
+        )
+        if since is not None:
+            query = query.filter(Subscription.subscription_expires_at > since)
+        return query.all()
 
     @staticmethod
     def create_subsciption_by_product_name(
@@ -145,23 +354,38 @@ class SubscriptionService:
             )
             db.session.add(subscription)
             db.session.flush()  # Get subscription ID without committing
+            MembershipStatsService.record_transition(
+                product_id, telegram_group.id, None, "pending_join"
+            )
 
             import uuid
+            from app.services.telegram import tg_bot
 
             invite_token = str(uuid.uuid4())[:32]
+            # A buyer is waiting on this call
             success, _, invite_link = tg_bot.create_invite_link(
-                telegram_group.telegram_group_id, invite_token
+                telegram_group.telegram_group_id, invite_token, lane="interactive"
             )
 
             if not success or not invite_link:
                 db.session.rollback()
-                return None, "Failed to generate invite link"
+                return None, INVITE_LINK_FAILED
 
             subscription.invite_link_url = invite_link
             subscription.invite_link_token = invite_token
             subscription.invite_link_expires_at = subscription_expires_at
 
             db.session.commit()
+
+            SubscriptionEventService.record(
+                subscription.id,
+                "created",
+                product_id=product_id,
+                telegram_group_id=telegram_group.telegram_group_id,
+            )
+            SubscriptionEventService.record(
+                subscription.id, "invite_issued", invite_token=invite_token
+            )
             return subscription, None
         except SQLAlchemyError as e:
             db.session.rollback()
@@ -184,6 +408,12 @@ class SubscriptionService:
             user.telegram_username = telegram_username
 
             # Update subscription status
+            MembershipStatsService.record_transition(
+                subscription.product_id,
+                subscription.telegram_group_id,
+                subscription.status,
+                "active",
+            )
             subscription.status = "active"
 
             db.session.commit()
@@ -199,114 +429,545 @@ class SubscriptionService:
             if not subscription:
                 return False
 
+            MembershipStatsService.record_transition(
+                subscription.product_id,
+                subscription.telegram_group_id,
+                subscription.status,
+                "expired",
+            )
             subscription.status = "expired"
             db.session.commit()
+
+            SubscriptionEventService.record(subscription.id, "expired")
             return True
         except SQLAlchemyError as e:
             db.session.rollback()
             raise e
 
     @staticmethod
-    def cancel_subscription(subscription_id):
-        try:
-            subscription = Subscription.query.get(subscription_id)
-            if not subscription:
-                return None, "Subscription not found"
+    def _cancel_where(*criteria):
+        """Cancel the live subscriptions matching ``criteria``.
+
+        On PostgreSQL this is a single UPDATE ... FROM joined to users and
+        telegram_groups, returning what the kicks and counters need; the
+        target rows are locked in the subquery so the reported old status is
+        the one replaced. Runs in the caller's transaction. Returns rows of
+        (id, product_id, telegram_group_id, old_status, email,
+        telegram_user_id, chat_id).
+        """
+        target = (
+            select(
+                Subscription.id,
+                Subscription.status.label("old_status"),
+                User.email,
+                User.telegram_user_id,
+                TelegramGroup.telegram_group_id.label("chat_id"),
+            )
+            .join(User, User.id == Subscription.user_id)
+            .join(TelegramGroup, TelegramGroup.id == Subscription.telegram_group_id)
+            .where(Subscription.status.in_(LIVE_STATUSES), *criteria)
+        )
+        hot = Subscription.__table__
+        values = {"status": "cancelled", "updated_at": datetime.now(timezone.utc)}
+
+        if db.engine.dialect.name == "postgresql":
+            target = target.with_for_update(of=hot).subquery()
+            rows = db.session.execute(
+                hot.update()
+                .where(hot.c.id == target.c.id)
+                .values(**values)
+                .returning(
+                    hot.c.id,
+                    hot.c.product_id,
+                    hot.c.telegram_group_id,
+                    target.c.old_status,
+                    target.c.email,
+                    target.c.telegram_user_id,
+                    target.c.chat_id,
+                )
+            ).all()
+        else:
+            # Other backends cannot return columns of the joined tables
+            rows = db.session.execute(
+                target.add_columns(Subscription.product_id, Subscription.telegram_group_id)
+            ).all()
+            rows = [
+                (row.id, row.product_id, row.telegram_group_id, row.old_status,
+                 row.email, row.telegram_user_id, row.chat_id)
+                for row in rows
+            ]
+            if rows:
+                db.session.execute(
+                    hot.update().where(hot.c.id.in_([row[0] for row in rows])).values(**values)
+                )
+
+        deltas = {}
+        for _, product_id, group_pk, old_status, _, _, _ in rows:
+            deltas[(product_id, group_pk, old_status)] = (
+                deltas.get((product_id, group_pk, old_status), 0) - 1
+            )
+            deltas[(product_id, group_pk, "cancelled")] = (
+                deltas.get((product_id, group_pk, "cancelled"), 0) + 1
+            )
+        MembershipStatsService.apply_deltas(deltas)
+        return rows
 
-            return SubscriptionService.cancel_subscription_by_email_and_product_id(
-                subscription.user.email, subscription.product_id
+    @staticmethod
+    def _kick_cancelled(rows, lane=None):
+        """Remove cancelled members from their groups and record the outcome.
+
+        With the bulk lane, chats whose circuit is open are skipped and the
+        loop stops if the Bot API is failing as a whole; skipped members are
+        removed later by the membership reconciliation. Returns counts.
+        """
+        from app.services.telegram import tg_bot
+
+        summary = {"kicked": 0, "kick_failed": 0, "kick_skipped": 0, "paused_for": 0}
+        for index, (subscription_id, _, _, _, _, telegram_user_id, chat_id) in enumerate(rows):
+            SubscriptionEventService.record(subscription_id, "cancelled")
+            if not telegram_user_id:
+                continue
+            if summary["paused_for"]:
+                summary["kick_skipped"] += 1
+                continue
+            if lane == "bulk":
+                blocked = tg_bot.circuit_blocked("remove_user", chat_id)
+                if blocked:
+                    scope, retry_after = blocked
+                    if scope == "method":
+                        summary["paused_for"] = round(retry_after)
+                    summary["kick_skipped"] += 1
+                    continue
+
+            removed, message = tg_bot.remove_user(chat_id, telegram_user_id, lane=lane)
+            summary["kicked" if removed else "kick_failed"] += 1
+            SubscriptionEventService.record(
+                subscription_id,
+                "kicked" if removed else "kick_failed",
+                telegram_user_id,
+                reason="cancelled",
+                message=message,
             )
+        return summary
 
-        except Exception as e:
+    @staticmethod
+    def cancel_subscription(subscription_id):
+        try:
+            rows = SubscriptionService._cancel_where(Subscription.id == subscription_id)
+            db.session.commit()
+        except SQLAlchemyError as e:
             db.session.rollback()
             raise e
 
+        if not rows:
+            return None, "Subscription not found"
+        SubscriptionService._kick_cancelled(rows)
+        return rows[0], None
+
     @staticmethod
     def cancel_subscription_by_email_and_product_id(email: str, product_id: str):
         try:
-            user = User.query.filter_by(email=email).first()
-            if not user:
+            rows = SubscriptionService._cancel_where(
+                User.email == email, Subscription.product_id == product_id
+            )
+            db.session.commit()
+        except SQLAlchemyError as e:
+            db.session.rollback()
+            raise e
+
+        if not rows:
+            if not db.session.query(User.id).filter_by(email=email).first():
                 return None, "User not found"
+            return None, "Subscription not found"
+        SubscriptionService._kick_cancelled(rows)
+        return rows[0], None
 
-            subscription = Subscription.query.filter(
-                Subscription.user_id == user.id,
-                Subscription.product_id == product_id,
-                Subscription.status.in_(["active", "pending_join"]),
-            ).first()
-            if not subscription:
-                return None, "Subscription not found"
+    @staticmethod
+    def cancel_subscriptions_bulk(pairs):
+        """Cancel the live subscriptions for a list of (email, product_id) pairs.
+
+        All rows change in one statement and one transaction; members are
+        then kicked through the bulk lane. Returns a summary including the
+        pairs that had no live subscription.
+        """
+        pairs = list(dict.fromkeys((email, product_id) for email, product_id in pairs))
+        summary = {"requested": len(pairs), "cancelled": 0, "not_found": []}
+        if not pairs:
+            summary.update(kicked=0, kick_failed=0, kick_skipped=0, paused_for=0)
+            return summary
 
-            tg_bot.remove_user(
-                subscription.telegram_group.telegram_group_id, user.telegram_user_id
+        try:
+            rows = SubscriptionService._cancel_where(
+                tuple_(User.email, Subscription.product_id).in_(pairs)
             )
-
-            subscription.status = "cancelled"
-
             db.session.commit()
-            return subscription, None
-
-        except Exception as e:
+        except SQLAlchemyError as e:
             db.session.rollback()
             raise e
 
-    @staticmethod
-    def regenerate_invite_link(subscription_id, custom_token=None):
-        """Regenerate invite link for a subscription"""
-        try:
-            subscription = Subscription.query.get(subscription_id)
-            if not subscription:
-                return None, "Subscription not found"
+        matched = {(row[4], row[1]) for row in rows}
+        summary["cancelled"] = len(rows)
+        summary["not_found"] = [
+            {"email": email, "product_id": product_id}
+            for email, product_id in pairs
+            if (email, product_id) not in matched
+        ]
+        summary.update(SubscriptionService._kick_cancelled(rows, lane="bulk"))
+        return summary
 
-            if not subscription.telegram_group:
-                return None, "Subscription not linked to a Telegram group"
+    @staticmethod
+    def _invite_targets(*criteria):
+        """Return rows of (id, chat_id, email, product_id) for subscriptions matching ``criteria``"""
+        return (
+            db.session.query(
+                Subscription.id,
+                TelegramGroup.telegram_group_id.label("chat_id"),
+                User.email,
+                Subscription.product_id,
+            )
+            .join(TelegramGroup, TelegramGroup.id == Subscription.telegram_group_id)
+            .join(User, User.id == Subscription.user_id)
+            .filter(*criteria)
+            .all()
+        )
 
-            # Generate new token if not provided
-            if not custom_token:
-                import uuid
-                custom_token = str(uuid.uuid4())[:32]
+    @staticmethod
+    def _store_invite_links(links):
+        """Write [{"b_id", "b_url", "b_token"}] in one statement (executemany)"""
+        hot = Subscription.__table__
+        stmt = (
+            hot.update()
+            .where(hot.c.id == bindparam("b_id"))
+            .values(
+                invite_link_url=bindparam("b_url"),
+                invite_link_token=bindparam("b_token"),
+                updated_at=datetime.now(timezone.utc),
+            )
+        )
+        if len(links) == 1:
+            return db.session.execute(
+                stmt.returning(
+                    hot.c.id,
+                    hot.c.invite_link_url,
+                    hot.c.invite_link_token,
+                    hot.c.invite_link_expires_at,
+                ),
+                links[0],
+            ).one()
+        db.session.execute(stmt, links)
+        return None
 
-            # Create new invite link
-            from app.services.telegram import tg_bot
-            success, message, invite_link = tg_bot.create_invite_link(
-                int(subscription.telegram_group.telegram_group_id), custom_token
+    @staticmethod
+    def _regenerate(target, custom_token=None):
+        if not custom_token:
+            import uuid
+            custom_token = str(uuid.uuid4())[:32]
+        elif (
+            db.session.query(Subscription.id)
+            .filter(
+                Subscription.invite_link_token == custom_token,
+                Subscription.id != target.id,
             )
+            .first()
+        ):
+            # The partitioned table has no unique constraint on the token
+            return None, "Invite token already in use"
+
+        # Create new invite link
+        from app.services.telegram import tg_bot
+        success, message, invite_link = tg_bot.create_invite_link(
+            int(target.chat_id), custom_token
+        )
 
-            if not success or not invite_link:
-                return None, f"Failed to generate invite link: {message}"
+        if not success or not invite_link:
+            return None, f"Failed to generate invite link: {message}"
 
-            # Update subscription with new invite link
-            subscription.invite_link_url = invite_link
-            subscription.invite_link_token = custom_token
-            # Keep the same expiration time
-            
+        # Keep the same expiration time
+        try:
+            subscription = SubscriptionService._store_invite_links(
+                [{"b_id": target.id, "b_url": invite_link, "b_token": custom_token}]
+            )
             db.session.commit()
-            return subscription, None
         except SQLAlchemyError as e:
             db.session.rollback()
             raise e
 
+        SubscriptionEventService.record(
+            target.id,
+            "invite_issued",
+            invite_token=custom_token,
+            regenerated=True,
+        )
+        return subscription, None
+
+    @staticmethod
+    def regenerate_invite_link(subscription_id, custom_token=None):
+        """Regenerate invite link for a subscription.
+
+        Returns a row with id, invite_link_url, invite_link_token and
+        invite_link_expires_at.
+        """
+        targets = SubscriptionService._invite_targets(Subscription.id == subscription_id)
+        if not targets:
+            return None, "Subscription not found"
+        return SubscriptionService._regenerate(targets[0], custom_token)
+
     @staticmethod
     def regenerate_invite_link_by_product(product_id, user_email, custom_token=None):
         """Regenerate invite link for a user's subscription to a product"""
-        try:
-            user = User.query.filter_by(email=user_email).first()
-            if not user:
+        targets = SubscriptionService._invite_targets(
+            User.email == user_email,
+            Subscription.product_id == product_id,
+            Subscription.status.in_(LIVE_STATUSES),
+        )
+        if not targets:
+            if not db.session.query(User.id).filter_by(email=user_email).first():
                 return None, "User not found"
+            return None, "Active subscription not found for user and product"
+        return SubscriptionService._regenerate(targets[0], custom_token)
 
-            subscription = Subscription.query.filter(
-                Subscription.user_id == user.id,
-                Subscription.product_id == product_id,
-                Subscription.status.in_(["active", "pending_join"])
-            ).first()
+    @staticmethod
+    def regenerate_invite_links_bulk(pairs):
+        """Issue new invite links for a list of (email, product_id) pairs.
+
+        Targets are looked up in one query and the new links written in one
+        executemany UPDATE; the links themselves are created one by one
+        through the bulk lane, skipping chats whose circuit is open and
+        stopping if the Bot API is failing as a whole.
+        """
+        from app.services.telegram import tg_bot
+        import uuid
+
+        pairs = list(dict.fromkeys((email, product_id) for email, product_id in pairs))
+        summary = {
+            "requested": len(pairs),
+            "regenerated": 0,
+            "failed": 0,
+            "skipped": 0,
+            "paused_for": 0,
+            "not_found": [],
+            "items": [],
+        }
+        targets = []
+        if pairs:
+            targets = SubscriptionService._invite_targets(
+                tuple_(User.email, Subscription.product_id).in_(pairs),
+                Subscription.status.in_(LIVE_STATUSES),
+            )
+        matched = {(target.email, target.product_id) for target in targets}
+        summary["not_found"] = [
+            {"email": email, "product_id": product_id}
+            for email, product_id in pairs
+            if (email, product_id) not in matched
+        ]
+
+        links = []
+        for target in targets:
+            if summary["paused_for"]:
+                summary["skipped"] += 1
+                continue
+            blocked = tg_bot.circuit_blocked("create_invite_link", target.chat_id)
+            if blocked:
+                scope, retry_after = blocked
+                if scope == "method":
+                    summary["paused_for"] = round(retry_after)
+                summary["skipped"] += 1
+                continue
+
+            token = str(uuid.uuid4())[:32]
+            success, message, invite_link = tg_bot.create_invite_link(
+                int(target.chat_id), token, lane="bulk"
+            )
+            if not success or not invite_link:
+                logger.error(
+                    f"Failed to regenerate invite link for subscription {target.id}: {message}"
+                )
+                summary["failed"] += 1
+                continue
+            links.append({"b_id": target.id, "b_url": invite_link, "b_token": token})
+            summary["items"].append(
+                {
+                    "subscription_id": target.id,
+                    "email": target.email,
+                    "product_id": target.product_id,
+                    "invite_link": invite_link,
+                    "token": token,
+                }
+            )
 
-            if not subscription:
-                return None, "Active subscription not found for user and product"
+        if links:
+            try:
+                SubscriptionService._store_invite_links(links)
+                db.session.commit()
+            except SQLAlchemyError as e:
+                db.session.rollback()
+                raise e
+            for link in links:
+                SubscriptionEventService.record(
+                    link["b_id"], "invite_issued", invite_token=link["b_token"], regenerated=True
+                )
+        summary["regenerated"] = len(links)
+        return summary
 
-            return SubscriptionService.regenerate_invite_link(subscription.id, custom_token)
-        except Exception as e:
+    @staticmethod
+    def _renew_where(criteria, extend_days=None, expires_at=None):
+        """Push out the expiry of the live subscriptions matching ``criteria``.
+
+        With ``extend_days`` the new expiry is that many days after the
+        current one, or after now if it has already passed; with
+        ``expires_at`` it is that moment, but never earlier than the current
+        expiry. Runs in the caller's transaction. Returns rows of
+        (id, email, product_id, previous_expires_at, subscription_expires_at).
+        """
+        now = datetime.utcnow()
+        target = (
+            select(
+                Subscription.id,
+                Subscription.subscription_expires_at.label("previous_expires_at"),
+                User.email,
+            )
+            .join(User, User.id == Subscription.user_id)
+            .where(Subscription.status.in_(LIVE_STATUSES), *criteria)
+        )
+        hot = Subscription.__table__
+
+        if db.engine.dialect.name == "postgresql":
+            current = hot.c.subscription_expires_at
+            if extend_days is not None:
+                base = case((current > now, current), else_=literal(now, db.DateTime))
+                new_expiry = base + timedelta(days=extend_days)
+            else:
+                new_expiry = func.greatest(current, literal(expires_at, db.DateTime))
+            target = target.with_for_update(of=hot).subquery()
+            return db.session.execute(
+                hot.update()
+                .where(hot.c.id == target.c.id)
+                .values(
+                    subscription_expires_at=new_expiry,
+                    updated_at=datetime.now(timezone.utc),
+                )
+                .returning(
+                    hot.c.id,
+                    target.c.email,
+                    hot.c.product_id,
+                    target.c.previous_expires_at,
+                    hot.c.subscription_expires_at,
+                )
+            ).all()
+
+        # Other backends lack interval arithmetic; compute the expiry here
+        rows = []
+        for row in db.session.execute(target.add_columns(Subscription.product_id)):
+            if extend_days is not None:
+                new_expiry = max(row.previous_expires_at, now) + timedelta(days=extend_days)
+            else:
+                new_expiry = max(row.previous_expires_at, expires_at)
+            rows.append((row.id, row.email, row.product_id, row.previous_expires_at, new_expiry))
+        if rows:
+            db.session.execute(
+                hot.update()
+                .where(hot.c.id == bindparam("b_id"))
+                .values(
+                    subscription_expires_at=bindparam("b_expires_at"),
+                    updated_at=datetime.now(timezone.utc),
+                ),
+                [{"b_id": row[0], "b_expires_at": row[4]} for row in rows],
+            )
+        return rows
+
+    @staticmethod
+    def _record_renewals(rows):
+        for subscription_id, _, _, previous_expires_at, expires_at in rows:
+            SubscriptionEventService.record(
+                subscription_id,
+                "renewed",
+                previous_expires_at=previous_expires_at.isoformat(),
+                expires_at=expires_at.isoformat(),
+            )
+
+    @staticmethod
+    def renew_subscription(email, product_id, extend_days=None, expires_at=None):
+        """Extend a live subscription without touching Telegram.
+
+        The member stays in the group and keeps their invite link. Returns
+        (row, error) where row has id, previous_expires_at and
+        subscription_expires_at.
+        """
+        try:
+            rows = SubscriptionService._renew_where(
+                (User.email == email, Subscription.product_id == product_id),
+                extend_days,
+                expires_at,
+            )
+            db.session.commit()
+        except SQLAlchemyError as e:
             db.session.rollback()
             raise e
 
+        if not rows:
+            if not db.session.query(User.id).filter_by(email=email).first():
+                return None, "User not found"
+            return None, "Active subscription not found for user and product"
+        SubscriptionService._record_renewals(rows)
+        return rows[0], None
+
+    @staticmethod
+    def renew_subscriptions_bulk(pairs, extend_days=None, expires_at=None, batch_size=500):
+        """Extend the live subscriptions for a list of (email, product_id) pairs.
+
+        Each batch of ``batch_size`` pairs is one UPDATE and one commit; no
+        Bot API calls are made. Returns a summary with the new expiries and
+        the pairs that had no live subscription.
+        """
+        pairs = list(dict.fromkeys((email, product_id) for email, product_id in pairs))
+        summary = {"requested": len(pairs), "renewed": 0, "not_found": [], "items": []}
+        for start in range(0, len(pairs), batch_size):
+            batch = pairs[start:start + batch_size]
+            try:
+                rows = SubscriptionService._renew_where(
+                    (tuple_(User.email, Subscription.product_id).in_(batch),),
+                    extend_days,
+                    expires_at,
+                )
+                db.session.commit()
+            except SQLAlchemyError as e:
+                db.session.rollback()
+                raise e
+
+            SubscriptionService._record_renewals(rows)
+            matched = {(row[1], row[2]) for row in rows}
+            summary["renewed"] += len(rows)
+            summary["not_found"] += [
+                {"email": email, "product_id": product_id}
+                for email, product_id in batch
+                if (email, product_id) not in matched
+            ]
+            summary["items"] += [
+                {
+                    "subscription_id": subscription_id,
+                    "email": email,
+                    "product_id": product_id,
+                    "previous_expires_at": previous_expires_at,
+                    "subscription_expires_at": new_expires_at,
+                }
+                for subscription_id, email, product_id, previous_expires_at, new_expires_at in rows
+            ]
+        return summary
+
+    @staticmethod
+    def is_still_expired(subscription_id):
+        """Whether a subscription is still active and past expiry (not renewed meanwhile)"""
+        return (
+            db.session.query(Subscription.id)
+            .filter(
+                Subscription.id == subscription_id,
+                Subscription.status == "active",
+                Subscription.subscription_expires_at <= datetime.utcnow(),
+            )
+            .first()
+            is not None
+        )
+
     def update_subscription_status(subscription_id, new_status):
 
         if new_status not in ["pending_join", "active", "expired", "cancelled"]:
@@ -317,6 +978,12 @@ class SubscriptionService:
             if not subscription:
                 return False
 
+            MembershipStatsService.record_transition(
+                subscription.product_id,
+                subscription.telegram_group_id,
+                subscription.status,
+                new_status,
+            )
             subscription.status = new_status
             db.session.commit()
             return True
@@ -0,0 +1,87 @@
+import threading
+import time
+from datetime import datetime, timezone
+from app import db
+from app.models import TableVersion
+from flask import current_app
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+# name -> (version, updated_at, fetched_at); read by every cached endpoint so
+# unchanged data can be answered with a 304 without touching the database
+_versions = {}
+_versions_lock = threading.Lock()
+
+_BUMPED_KEY = "bumped_table_versions"
+
+
+class TableVersionService:
+    @staticmethod
+    def bump(*names):
+        """Increment the versions of ``names`` in the caller's transaction.
+
+        Does not commit. The local cache entries are dropped once the
+        transaction commits, so this process sees the new version immediately.
+        """
+        now = datetime.now(timezone.utc)
+        table = TableVersion.__table__
+        for name in sorted(names):
+            updated = db.session.execute(
+                table.update()
+                .where(table.c.name == name)
+                .values(version=table.c.version + 1, updated_at=now)
+            )
+            if not updated.rowcount:
+                db.session.execute(
+                    table.insert().values(name=name, version=1, updated_at=now)
+                )
+        db.session.info.setdefault(_BUMPED_KEY, set()).update(names)
+
+    @staticmethod
+    def get_versions(*names):
+        """Return {name: (version, updated_at)}, cached for a short time.
+
+        Writes from this process invalidate the cache on commit; the
+        TABLE_VERSION_CACHE_SECONDS window only bounds how long writes from
+        other workers take to become visible.
+        """
+        ttl = current_app.config.get("TABLE_VERSION_CACHE_SECONDS", 1.0)
+        now = time.monotonic()
+        result = {}
+        missing = []
+        with _versions_lock:
+            for name in names:
+                cached = _versions.get(name)
+                if cached and now - cached[2] < ttl:
+                    result[name] = cached[:2]
+                else:
+                    missing.append(name)
+
+        if missing:
+            rows = (
+                db.session.query(
+                    TableVersion.name, TableVersion.version, TableVersion.updated_at
+                )
+                .filter(TableVersion.name.in_(missing))
+                .all()
+            )
+            found = {row.name: (row.version, row.updated_at) for row in rows}
+            with _versions_lock:
+                for name in missing:
+                    result[name] = found.get(name, (0, None))
+                    _versions[name] = result[name] + (now,)
+        return result
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_bumped_versions(session):
+    names = session.info.pop(_BUMPED_KEY, None)
+    if names:
+        with _versions_lock:
+            for name in names:
+                _versions.pop(name, None)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_bumped_versions(session):
+    session.info.pop(_BUMPED_KEY, None)
@@ -1,7 +1,7 @@
 import logging
 import asyncio
 import json
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
 from typing import Dict, Optional, Tuple
 from telegram import Update, ChatMember, Bot
 from telegram.ext import (
@@ -9,31 +9,62 @@ from telegram.ext import (
     ChatMemberHandler,
     ContextTypes,
     MessageHandler,
+    TypeHandler,
     filters,
     ChatJoinRequestHandler,
 )
-from telegram.constants import ChatMemberStatus
-from telegram.error import TelegramError
+from telegram.constants import ChatMemberStatus, ChatType
+from telegram.error import BadRequest, ChatMigrated, Forbidden, TelegramError
 import threading
-from concurrent.futures import ThreadPoolExecutor
+import time
+from concurrent.futures import ThreadPoolExecutor, wait as wait_futures
+from app.db_pool import db_component
+from app.services.circuit_breaker import CircuitBreakerRegistry
+from app.services.telegram_lanes import TelegramLaneScheduler, current_lane
+from flask import has_app_context
 
 
-# Configure logging
-logging.basicConfig(
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s", level=logging.INFO
-)
 logger = logging.getLogger(__name__)
 
 
+ALLOWED_UPDATES = ["message", "chat_member", "my_chat_member", "chat_join_request"]
+
+# How often chats and offsets seen in the update stream are written to the DB
+STREAM_FLUSH_SECONDS = 5
+
+# getUpdates long polling: updates per batch and seconds to wait for one
+UPDATE_BATCH_SIZE = 100
+POLL_TIMEOUT = 30
+# Telegram restarts update IDs at random after a week without updates, so
+# older saved offsets are not resumed from
+OFFSET_MAX_AGE = timedelta(days=7)
+
+
+def bot_id_from_token(token: str) -> str:
+    """The numeric bot ID is the part of the token before the colon"""
+    return token.split(":", 1)[0]
+
+
 class TelegramGroupBotService:
-    def __init__(self, bot_token: str = None):
+    def __init__(self, bot_token: str = None, extra_tokens=()):
         self.bot_token = bot_token
+        # Pool of bots keyed by bot ID. Each group is served by its owning bot
+        # (TelegramGroup.bot_id); the primary bot owns groups without one.
+        self.applications: Dict[str, Application] = {}
+        self.bots: Dict[str, Bot] = {}
+        self.primary_bot_id = bot_id_from_token(bot_token) if bot_token else None
         if bot_token:
             import os
             os.environ['TELEGRAM_DISABLE_WEB_PAGE_PREVIEW'] = '1'
-            
-            self.application = Application.builder().token(bot_token).build()
-            self.bot = Bot(token=bot_token)
+
+            for token in [bot_token, *extra_tokens]:
+                bot_id = bot_id_from_token(token)
+                if bot_id in self.bots:
+                    continue
+                self.applications[bot_id] = Application.builder().token(token).build()
+                self.bots[bot_id] = Bot(token=token)
+            self.application = self.applications[self.primary_bot_id]
+            self.bot = self.bots[self.primary_bot_id]
         else:
             self.application = None
             self.bot = None
@@ -43,6 +74,36 @@ class TelegramGroupBotService:
         self.running = False
         self.event_loop = None
         self.executor = ThreadPoolExecutor(max_workers=4)
+        # Work handed to the executor and coroutines scheduled on the bot loop
+        # from other threads, tracked so shutdown can wait for them
+        self._tasks = set()
+        self._outbound = set()
+        self._stopping = False
+        self._applications_stopped = False
+
+        # Per-method and per-chat circuit breakers around Bot API calls
+        self.breakers = CircuitBreakerRegistry()
+
+        # Priority lanes sharing a bounded number of concurrent Bot API calls
+        import os
+        self.lanes = TelegramLaneScheduler(
+            max_concurrency=int(os.environ.get("TELEGRAM_MAX_CONCURRENT_CALLS", "8")),
+            reserved_interactive=int(os.environ.get("TELEGRAM_RESERVED_INTERACTIVE", "2")),
+        )
+
+        # Group chats seen by _observe_update and update offsets processed by
+        # _poll, flushed to the DB in batches by _stream_flush_loop
+        self._seen_chats = set()
+        self._pending_chats = {}
+        self._pending_offsets = {}
+        self._stream_flush_task = None
+
+        # One getUpdates poller per bot; chats within a batch are handled
+        # concurrently, up to this many at once
+        self.update_concurrency = int(os.environ.get("TELEGRAM_UPDATE_CONCURRENCY", "8"))
+        self._polling = False
+        self._poll_tasks = {}
+        self._fetches = {}
 
         self.setup_handlers()
 
@@ -50,39 +111,85 @@ class TelegramGroupBotService:
         self.app = app
 
     def setup_handlers(self):
-        """Setup all event handlers"""
-        if not self.application:
-            return
-            
+        """Setup all event handlers on every bot in the pool"""
+        for application in self.applications.values():
+            self._setup_application_handlers(application)
+
+    def _setup_application_handlers(self, application: Application):
+        # Sees every update before the handlers below, for group discovery
+        application.add_handler(TypeHandler(Update, self._observe_update), group=-1)
+
         # Chat member updates (bot added/removed, user joins/leaves)
-        self.application.add_handler(
+        application.add_handler(
             ChatMemberHandler(
                 self._handle_chat_member_update, ChatMemberHandler.CHAT_MEMBER
             )
         )
 
         # My chat member updates (specifically for bot being added/removed)
-        self.application.add_handler(
+        application.add_handler(
             ChatMemberHandler(
                 self._handle_my_chat_member_update, ChatMemberHandler.MY_CHAT_MEMBER
             )
         )
 
         # Message handler for tracking joins via invite links
-        self.application.add_handler(
+        application.add_handler(
             MessageHandler(
                 filters.StatusUpdate.NEW_CHAT_MEMBERS, self._handle_new_members
             )
         )
 
-        self.application.add_handler(ChatJoinRequestHandler(self._handle_join_request))
+        application.add_handler(ChatJoinRequestHandler(self._handle_join_request))
         
         # Add test command handler
         from telegram.ext import CommandHandler
-        self.application.add_handler(CommandHandler("test", self._handle_test_command))
+        application.add_handler(CommandHandler("test", self._handle_test_command))
         
         # Enable chat member updates
-        self.application.bot_data['chat_member_updates'] = True
+        application.bot_data['chat_member_updates'] = True
+
+    async def _observe_update(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Note any group chat not seen before"""
+        bot_id = str(context.bot.id)
+        chat = update.effective_chat
+        # my_chat_member updates are handled by _on_bot_added/removed
+        if (
+            chat is None
+            or chat.type not in (ChatType.GROUP, ChatType.SUPERGROUP)
+            or update.my_chat_member is not None
+            or chat.id in self._seen_chats
+        ):
+            return
+        self._seen_chats.add(chat.id)
+        self._pending_chats[chat.id] = (chat.title, bot_id)
+
+    async def _stream_flush_loop(self):
+        while True:
+            await asyncio.sleep(STREAM_FLUSH_SECONDS)
+            await self._flush_stream()
+
+    async def _flush_stream(self):
+        if not self._pending_chats and not self._pending_offsets:
+            return
+        chats, self._pending_chats = self._pending_chats, {}
+        offsets, self._pending_offsets = self._pending_offsets, {}
+
+        def run_in_flask_context():
+            with self.app.app_context(), db_component("bot"):
+                from app.services.group_discovery_service import GroupDiscoveryService
+
+                try:
+                    registered = GroupDiscoveryService.record_stream(chats, offsets)
+                except Exception as e:
+                    logger.error(f"Failed to record update stream state: {e}")
+                    # Let the chats be picked up again by the next update
+                    self._seen_chats.difference_update(chats)
+                    return
+                for chat_id in registered:
+                    logger.info(f"🔎 Discovered group {chats[int(chat_id)][0]} (ID: {chat_id})")
+
+        await asyncio.get_running_loop().run_in_executor(self.executor, run_in_flask_context)
 
     async def _handle_my_chat_member_update(
         self, update: Update, context: ContextTypes.DEFAULT_TYPE
@@ -118,18 +225,43 @@ class TelegramGroupBotService:
         """Handle regular chat member updates (users joining/leaving)"""
         try:
             chat = update.effective_chat
-            user = update.chat_member.from_user
+            # from_user is whoever made the change; the member is new_chat_member.user
+            user = update.chat_member.new_chat_member.user
             new_member = update.chat_member.new_chat_member
             old_member = update.chat_member.old_chat_member
 
-            # User joined the group
-            if old_member.status in [
+            joined = old_member.status in [
                 ChatMemberStatus.LEFT,
             ] and new_member.status in [
                 ChatMemberStatus.MEMBER,
                 ChatMemberStatus.ADMINISTRATOR,
                 ChatMemberStatus.RESTRICTED,
-            ]:
+            ]
+            invite_link = update.chat_member.invite_link
+
+            if not user.is_bot:
+                # Links are created with creates_join_request=False, so a
+                # subscriber's join arrives here rather than as a join request.
+                # Attribute it before the roster row exists, or reconciliation
+                # would see a member without a live subscription.
+                if (
+                    joined
+                    and invite_link
+                    and invite_link.name
+                    and not update.chat_member.via_join_request
+                ):
+                    await self._on_user_joined_via_invite(
+                        chat, user, invite_link.name, context
+                    )
+                status = new_member.status
+                if status == ChatMemberStatus.RESTRICTED and not new_member.is_member:
+                    status = ChatMemberStatus.LEFT
+                self._record_membership(
+                    chat.id, user.id, status, update.chat_member.date, str(context.bot.id)
+                )
+
+            # User joined the group
+            if joined:
                 await self._on_user_joined_group(chat, user, context)
 
             # User left the group
@@ -141,7 +273,7 @@ class TelegramGroupBotService:
                 await self._on_user_left_group(chat, user, context)
 
         except Exception as e:
-            logger.error(f"Error handling chat member update: {e}")
+            logger.error("Error handling chat member update: %s", e)
 
     async def _handle_new_members(
         self, update: Update, context: ContextTypes.DEFAULT_TYPE
@@ -162,22 +294,25 @@ class TelegramGroupBotService:
                     )
 
         except Exception as e:
-            logger.error(f"Error handling new members: {e}")
+            logger.error("Error handling new members: %s", e)
 
     async def _on_bot_added_to_group(self, chat, context: ContextTypes.DEFAULT_TYPE):
         """Called when bot is added to a group"""
 
-        logger.info(f"🟢 Bot added to group: {chat.title} (ID: {chat.id})")
+        bot_id = str(context.bot.id)
+        logger.info(f"🟢 Bot {bot_id} added to group: {chat.title} (ID: {chat.id})")
 
         # Run Flask context operations in a thread
         def run_in_flask_context():
-            with self.app.app_context():
+            with self.app.app_context(), db_component("bot"):
                 from app.services.telegram_group_service import TelegramGroupService
 
-                TelegramGroupService.create_or_update_group(chat.id, chat.title)
+                TelegramGroupService.create_or_update_group(
+                    chat.id, chat.title, bot_id=bot_id
+                )
 
         # Execute in thread pool to avoid blocking
-        self.executor.submit(run_in_flask_context)
+        self._submit(run_in_flask_context)
 
         # Send welcome message
         try:
@@ -199,47 +334,94 @@ class TelegramGroupBotService:
         self, chat, context: ContextTypes.DEFAULT_TYPE
     ):
         """Called when bot is removed from a group"""
-        logger.info(f"🔴 Bot removed from group: {chat.title} (ID: {chat.id})")
+        bot_id = str(context.bot.id)
+        logger.info(f"🔴 Bot {bot_id} removed from group: {chat.title} (ID: {chat.id})")
 
         # Run Flask context operations in a thread
         def run_in_flask_context():
-            with self.app.app_context():
+            with self.app.app_context(), db_component("bot"):
                 from app.services.telegram_group_service import TelegramGroupService
 
+                # Another pool bot leaving doesn't affect the owner's access
+                if self.owner_bot_id(chat.id) != bot_id:
+                    logger.info(f"Bot {bot_id} is not the owner of {chat.id}, group stays active")
+                    return
                 TelegramGroupService.mark_group_as_inactive(chat.id)
 
-        self.executor.submit(run_in_flask_context)
+        self._submit(run_in_flask_context)
+
+    def _record_membership(self, chat_id, user_id, status, changed_at, bot_id):
+        """Update the group roster used by membership reconciliation"""
+
+        def run_in_flask_context():
+            with self.app.app_context(), db_component("bot"):
+                from app.services.group_member_service import GroupMemberService
+
+                # Every admin bot in the pool sees the update; the owner records it
+                if self.owner_bot_id(chat_id) != bot_id:
+                    return
+                GroupMemberService.record_update(chat_id, user_id, str(status), changed_at)
+
+        self._submit(run_in_flask_context)
 
     async def _on_user_joined_group(
         self, chat, user, context: ContextTypes.DEFAULT_TYPE
     ):
         """Called when a user joins the group"""
         logger.info(
-            f"👤 User {user.full_name} (ID: {user.id}) joined group {chat.title}"
+            "👤 User %s joined group %s",
+            user.full_name,
+            chat.title,
+            extra={"sample": "join", "fields": {"user_id": user.id, "chat_id": chat.id}},
         )
 
     async def _on_user_left_group(self, chat, user, context: ContextTypes.DEFAULT_TYPE):
         """Called when a user leaves the group"""
-        logger.info(f"👋 User {user.full_name} (ID: {user.id}) left group {chat.title}")
+        logger.info(
+            "👋 User %s left group %s",
+            user.full_name,
+            chat.title,
+            extra={"sample": "leave", "fields": {"user_id": user.id, "chat_id": chat.id}},
+        )
 
     async def _on_user_joined_via_invite(
         self, chat, user, invite_token: str, context: ContextTypes.DEFAULT_TYPE
     ):
         """Called when a user joins via a tracked invite link"""
         logger.info(
-            f"🔗 User {user.full_name} (ID: {user.id}) joined {chat.title} via invite token: {invite_token}"
+            "🔗 User %s joined %s via invite",
+            user.full_name,
+            chat.title,
+            extra={
+                "sample": "join",
+                "fields": {"user_id": user.id, "chat_id": chat.id, "invite_token": invite_token},
+            },
         )
 
-        # Run Flask context operations in a thread
+        bot_id = str(context.bot.id)
+
         def run_in_flask_context():
-            with self.app.app_context():
+            with self.app.app_context(), db_component("bot"):
                 from app.services.subscription_service import SubscriptionService
 
+                # Every admin bot in the pool sees the join; the owner records it
+                if self.owner_bot_id(chat.id) != bot_id:
+                    return
+                subscription = SubscriptionService.get_subscription_by_invite_token(
+                    invite_token
+                )
+                # Only a subscription waiting for this join is activated; a
+                # reused link must not revive an expired or cancelled one
+                if not subscription or subscription.status != "pending_join":
+                    return
                 SubscriptionService.update_subscription_with_telegram_user(
                     invite_token, user.id, user.username
                 )
 
-        self.executor.submit(run_in_flask_context)
+        # Awaited, so the roster update submitted after it sees the link
+        await asyncio.get_running_loop().run_in_executor(
+            self.executor, run_in_flask_context
+        )
 
     async def _identify_invite_token(
         self, chat_id: int, user_id: int, context: ContextTypes.DEFAULT_TYPE
@@ -269,45 +451,80 @@ class TelegramGroupBotService:
             join_request.invite_link.invite_link if join_request.invite_link else "N/A"
         )
 
+        join_fields = {"user_id": user_id, "chat_id": chat_id, "invite_token": invite_link_name}
         logger.info(
-            f"Received join request from {user_name} (ID: {user_id}) for chat {chat_id} "
-            f"via link '{invite_link_name}' ({invite_link_url})"
+            "Received join request from %s via %s",
+            user_name,
+            invite_link_url,
+            extra={"sample": "join_request", "fields": join_fields},
         )
 
-        with self.app.app_context():
-            from app.services.subscription_service import SubscriptionService
+        from app.services.subscription_service import SubscriptionService
+        from app.services.subscription_event_service import SubscriptionEventService
+
+        loop = asyncio.get_running_loop()
+        bot_id = str(context.bot.id)
+
+        # Database work runs on the executor so the other chats in the batch,
+        # the other bots' polls and the lanes keep moving meanwhile
+        def find_subscription():
+            with self.app.app_context(), db_component("bot"):
+                # Every admin bot in the pool receives the request; only the
+                # group's owner answers it
+                if self.owner_bot_id(chat_id) != bot_id:
+                    return False, None
+                return True, SubscriptionService.get_subscription_by_invite_token(
+                    invite_link_name
+                )
 
-            subsciption = SubscriptionService.get_subscription_by_invite_token(
-                invite_link_name
-            )
+        def activate_subscription():
+            with self.app.app_context(), db_component("bot"):
+                SubscriptionService.update_subscription_with_telegram_user(
+                    invite_link_name, user_id, user_name
+                )
+
+                SubscriptionService.update_subscription_status(
+                    subsciption.id, "active"
+                )
+
+        is_owner, subsciption = await loop.run_in_executor(
+            self.executor, find_subscription
+        )
+        if not is_owner:
+            return
 
         if not subsciption:
-            logger.error(f"Subscription not found for invite token: {invite_link_name}")
+            logger.error(
+                "Subscription not found for invite token: %s", invite_link_name,
+                extra={"fields": join_fields},
+            )
             return
 
         if subsciption.status == "pending_join":
             try:
-                await join_request.approve()
+                async with self.lanes.slot("interactive"):
+                    await join_request.approve()
                 # Send a confirmation message to the chat
                 # await context.bot.send_message(
                 #     chat_id=chat_id,
                 #     text=f"✅ Join request from {user_name} via link '{invite_link_name}' has been automatically APPROVED.",
                 # )
                 logger.info(
-                    f"Approved join request for {user_name} via link '{invite_link_name}'"
+                    "Approved join request for %s",
+                    user_name,
+                    extra={"sample": "approval", "fields": join_fields},
+                )
+                SubscriptionEventService.record(
+                    subsciption.id, "join_approved", user_id, chat_id=chat_id
                 )
 
-                with self.app.app_context():
-                    SubscriptionService.update_subscription_with_telegram_user(
-                        invite_link_name, user_id, user_name
-                    )
-
-                    SubscriptionService.update_subscription_status(
-                        subsciption.id, "active"
-                    )
+                await loop.run_in_executor(self.executor, activate_subscription)
 
             except Exception as e:
-                logger.error(f"Failed to approve join request for {user_name}: {e}")
+                logger.error(
+                    "Failed to approve join request for %s: %s", user_name, e,
+                    extra={"fields": join_fields},
+                )
                 await context.bot.send_message(
                     chat_id=chat_id,
                     text=f"❌ Failed to approve join request from {user_name} via link '{invite_link_name}'. Error: {e}",
@@ -317,20 +534,28 @@ class TelegramGroupBotService:
 
         if subsciption.status == "active":
             logger.info(
-                f"Subscription already active for invite token: {invite_link_name}"
+                "Subscription already active for invite token: %s", invite_link_name,
+                extra={"sample": "approval", "fields": join_fields},
             )
 
         if (
             subsciption.status == "expired"
             or subsciption.subscription_expires_at > datetime.now()
         ):
-            logger.info(f"Subscription expired for invite token: {invite_link_name}")
+            logger.info(
+                "Subscription expired for invite token: %s", invite_link_name,
+                extra={"sample": "approval", "fields": join_fields},
+            )
 
         if subsciption.status == "cancelled":
-            logger.info(f"Subscription cancelled for invite token: {invite_link_name}")
+            logger.info(
+                "Subscription cancelled for invite token: %s", invite_link_name,
+                extra={"sample": "approval", "fields": join_fields},
+            )
 
         try:
-            await join_request.decline()
+            async with self.lanes.slot("interactive"):
+                await join_request.decline()
             # Send a confirmation message to the chat
             # await context.bot.send_message(
             #     chat_id=chat_id,
@@ -338,22 +563,46 @@ class TelegramGroupBotService:
             #     "This link does not meet auto-approval criteria.",
             # )
             logger.info(
-                f"Declined join request for {user_name} via link '{invite_link_name}'"
+                "Declined join request for %s",
+                user_name,
+                extra={"sample": "approval", "fields": join_fields},
+            )
+            SubscriptionEventService.record(
+                subsciption.id,
+                "join_declined",
+                user_id,
+                chat_id=chat_id,
+                status=subsciption.status,
             )
         except Exception as e:
-            logger.error(f"Failed to decline join request for {user_name}: {e}")
+            logger.error(
+                "Failed to decline join request for %s: %s", user_name, e,
+                extra={"fields": join_fields},
+            )
             await context.bot.send_message(
                 chat_id=chat_id,
                 text=f"❌ Failed to decline join request from {user_name} via link '{invite_link_name}'. Error: {e}",
             )
 
+    def _submit(self, func):
+        """Run ``func`` on the executor; shutdown waits for it"""
+        future = self.executor.submit(func)
+        self._tasks.add(future)
+        future.add_done_callback(self._tasks.discard)
+        return future
+
     # Helper method to run async function in bot's event loop
-    def _run_async_in_bot_loop(self, coro):
+    def _run_async_in_bot_loop(self, coro, timeout=60):
         """Run an async coroutine in the bot's event loop"""
         if self.event_loop and self.event_loop.is_running():
             # If event loop is running, schedule the coroutine
             future = asyncio.run_coroutine_threadsafe(coro, self.event_loop)
-            return future.result(timeout=60)  # 30 second timeout
+            self._outbound.add(future)
+            future.add_done_callback(self._outbound.discard)
+            return future.result(timeout=timeout)
+        elif self._stopping:
+            coro.close()
+            raise RuntimeError("Bot service is shutting down")
         else:
             # If no event loop is running, create a new one
             loop = asyncio.new_event_loop()
@@ -363,10 +612,72 @@ class TelegramGroupBotService:
             finally:
                 loop.close()
 
+    # Bot API methods used by each synchronous wrapper, for circuit checks
+    OPERATION_METHODS = {
+        "create_invite_link": ("get_chat", "create_chat_invite_link"),
+        "remove_user": ("get_chat_member", "ban_chat_member", "unban_chat_member"),
+        "revoke_invite_link": ("revoke_chat_invite_link",),
+    }
+
+    def owner_bot_id(self, chat_id) -> Optional[str]:
+        """Return the ID of the pool bot that should call the Bot API for a chat.
+
+        Falls back to the primary bot for unowned groups, for owners whose
+        token is no longer configured, and outside an app context.
+        """
+        bot_id = None
+        if has_app_context():
+            from app.services.telegram_group_service import TelegramGroupService
+
+            bot_id = TelegramGroupService.get_owner_bot_id(chat_id)
+        if bot_id not in self.bots:
+            if bot_id:
+                logger.warning(
+                    f"Owner bot {bot_id} of chat {chat_id} is not in the pool, using the primary bot"
+                )
+            bot_id = self.primary_bot_id
+        return bot_id
+
+    async def _call_bot(
+        self, bot_id: Optional[str], method: str, chat_id, *args, lane: str = "admin", **kwargs
+    ):
+        """Call ``<bot>.<method>(chat_id, ...)`` on a pool bot through its circuit breakers.
+
+        Method breakers are per bot, since flood limits are. Raises
+        CircuitOpenError without calling Telegram while the method or the chat
+        breaker is open; otherwise waits for a slot in ``lane``.
+        """
+        bot_id = bot_id or self.primary_bot_id
+        bot = self.bots.get(bot_id, self.bot)
+        breaker_method = f"{bot_id}:{method}"
+        self.breakers.before_call(breaker_method, chat_id)
+        try:
+            async with self.lanes.slot(lane):
+                result = await getattr(bot, method)(chat_id, *args, **kwargs)
+        except Exception as e:
+            self.breakers.record_error(breaker_method, chat_id, e)
+            raise
+        except BaseException:
+            # Cancelled: no verdict, but don't leave a half-open probe claimed
+            self.breakers.release_probe(breaker_method, chat_id)
+            raise
+        self.breakers.record_success(breaker_method, chat_id)
+        return result
+
+    def circuit_blocked(self, operation: str, chat_id=None):
+        """Return (scope, retry_after) if ``operation`` would fail fast, else None.
+
+        ``scope`` is "method" when Telegram itself is unhealthy (pause the
+        batch) or "chat" when only this chat is (skip it).
+        """
+        bot_id = self.owner_bot_id(chat_id) if chat_id is not None else self.primary_bot_id
+        methods = [f"{bot_id}:{method}" for method in self.OPERATION_METHODS[operation]]
+        return self.breakers.blocked(methods, chat_id)
+
     # API METHODS
 
     async def create_invite_link_aysnc(
-        self, chat_id: int, token: str
+        self, chat_id: int, token: str, bot_id: Optional[str] = None, lane: str = "admin"
     ) -> Tuple[bool, str, Optional[str]]:
         """
         API method to create an invite link with custom token
@@ -377,30 +688,31 @@ class TelegramGroupBotService:
 
             # Get chat info
             try:
-                chat = await self.bot.get_chat(chat_id)
+                chat = await self._call_bot(bot_id, "get_chat", chat_id, lane=lane)
             except TelegramError as e:
                 return False, f"Could not access chat: {str(e)}", None
 
             # Create invite link
-            invite_link = await self.bot.create_chat_invite_link(
-                chat_id=chat_id,
+            invite_link = await self._call_bot(
+                bot_id,
+                "create_chat_invite_link",
+                chat_id,
                 name=token,
                 member_limit=1,
                 expire_date=None,
                 creates_join_request=False,
+                lane=lane,
             )
 
-            logger.info(
-                f"✅ API: Created invite link for chat {chat_id} with token {token}"
-            )
+            logger.info("✅ API: Created invite link for chat %s with token %s", chat_id, token)
             return True, "Invite link created successfully", invite_link.invite_link
 
         except Exception as e:
-            logger.error(f"❌ API: Error creating invite link: {e}")
+            logger.error("❌ API: Error creating invite link: %s", e)
             return False, f"Error creating invite link: {str(e)}", None
 
     async def remove_user_api_async(
-        self, chat_id: int, user_id: int
+        self, chat_id: int, user_id: int, bot_id: Optional[str] = None, lane: str = "admin"
     ) -> Tuple[bool, str]:
         """
         API method to remove a user from a group
@@ -410,98 +722,504 @@ class TelegramGroupBotService:
 
             # Check if user exists in chat
             try:
-                member = await self.bot.get_chat_member(chat_id, user_id)
+                member = await self._call_bot(
+                    bot_id, "get_chat_member", chat_id, user_id, lane=lane
+                )
                 if member.status in [ChatMemberStatus.LEFT]:
                     return False, f"User {user_id} is not in the chat"
             except TelegramError as e:
                 return False, f"Could not find user in chat: {str(e)}"
 
             # Remove user
-            await self.bot.ban_chat_member(chat_id, user_id)
-            await self.bot.unban_chat_member(
-                chat_id, user_id
+            await self._call_bot(bot_id, "ban_chat_member", chat_id, user_id, lane=lane)
+            await self._call_bot(
+                bot_id, "unban_chat_member", chat_id, user_id, lane=lane
             )  # Unban to allow rejoining
 
-            logger.info(f"✅ API: Removed user {user_id} from chat {chat_id}")
+            logger.info("✅ API: Removed user %s from chat %s", user_id, chat_id)
             return True, f"User {user_id} removed successfully"
 
         except Exception as e:
-            logger.error(f"❌ API: Error removing user: {e}")
+            logger.error("❌ API: Error removing user: %s", e)
             return False, f"Error removing user: {str(e)}"
 
+    async def revoke_invite_link_async(
+        self, chat_id: int, invite_link: str, bot_id: Optional[str] = None, lane: str = "admin"
+    ) -> Tuple[str, str]:
+        """
+        API method to revoke an invite link
+        Returns: (status: str, message: str) where status is "revoked",
+        "rejected" (Telegram refused for good, e.g. the link is unknown or
+        already revoked) or "failed" (worth retrying later)
+        """
+        try:
+            await self._call_bot(
+                bot_id, "revoke_chat_invite_link", chat_id, invite_link, lane=lane
+            )
+            return "revoked", "Invite link revoked"
+        except BadRequest as e:
+            return "rejected", f"Could not revoke invite link: {str(e)}"
+        except Exception as e:
+            logger.warning("❌ API: Error revoking invite link in chat %s: %s", chat_id, e)
+            return "failed", f"Error revoking invite link: {str(e)}"
+
+    async def _revoke_invite_links_async(self, links, lane: str, concurrency: int):
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def revoke(chat_id, invite_link, bot_id):
+            async with semaphore:
+                return await self.revoke_invite_link_async(chat_id, invite_link, bot_id, lane)
+
+        return await asyncio.gather(*(revoke(*link) for link in links))
+
     # SYNCHRONOUS WRAPPERS
 
     def create_invite_link(
-        self, chat_id: int, token: str
+        self, chat_id: int, token: str, lane: Optional[str] = None
     ) -> Tuple[bool, str, Optional[str]]:
-        """Synchronous wrapper for create_invite_link_aysnc"""
+        """Synchronous wrapper for create_invite_link_aysnc.
+
+        ``lane`` defaults to the caller's telegram_lane() context.
+        """
         return self._run_async_in_bot_loop(
-            self.create_invite_link_aysnc(chat_id, token)
+            self.create_invite_link_aysnc(
+                chat_id, token, self.owner_bot_id(chat_id), lane or current_lane()
+            )
         )
 
-    def remove_user(self, chat_id: int, user_id: int) -> Tuple[bool, str]:
+    def remove_user(
+        self, chat_id: int, user_id: int, lane: Optional[str] = None
+    ) -> Tuple[bool, str]:
         """Synchronous wrapper for remove_user_api_async"""
-        return self._run_async_in_bot_loop(self.remove_user_api_async(chat_id, user_id))
+        return self._run_async_in_bot_loop(
+            self.remove_user_api_async(
+                chat_id, user_id, self.owner_bot_id(chat_id), lane or current_lane()
+            )
+        )
+
+    def revoke_invite_links(self, links, lane: str = "bulk", concurrency: int = 5):
+        """Revoke [(chat_id, invite_link)] with up to ``concurrency`` calls in flight.
+
+        Calls still queue for ``lane`` and go through the circuit breakers.
+        Returns the (status, message) of each link, in order.
+        """
+        if not links:
+            return []
+        links = [
+            (chat_id, invite_link, self.owner_bot_id(chat_id))
+            for chat_id, invite_link in links
+        ]
+        return self._run_async_in_bot_loop(
+            self._revoke_invite_links_async(links, lane, concurrency), timeout=None
+        )
+
+    # BOT POOL MANAGEMENT
+
+    async def bot_is_admin_async(self, chat_id: int, bot_id: str) -> bool:
+        """Whether ``bot_id`` can invite and remove members in the chat"""
+        try:
+            member = await self._call_bot(bot_id, "get_chat_member", chat_id, int(bot_id))
+        except TelegramError as e:
+            logger.warning(f"Could not check bot {bot_id} in chat {chat_id}: {e}")
+            return False
+        if member.status == ChatMemberStatus.OWNER:
+            return True
+        return (
+            member.status == ChatMemberStatus.ADMINISTRATOR
+            and member.can_invite_users
+            and member.can_restrict_members
+        )
+
+    def bot_is_admin(self, chat_id: int, bot_id: str) -> bool:
+        """Synchronous wrapper for bot_is_admin_async"""
+        return self._run_async_in_bot_loop(self.bot_is_admin_async(chat_id, bot_id))
+
+    def get_pool_status(self):
+        """Return [{"bot_id", "primary", "groups", "load"}] for every pool bot"""
+        from app.services.telegram_group_service import TelegramGroupService
+
+        status = {
+            bot_id: {"bot_id": bot_id, "primary": bot_id == self.primary_bot_id, "groups": 0, "load": 0}
+            for bot_id in self.bots
+        }
+        for _, bot_id, load in TelegramGroupService.get_bot_loads(self.primary_bot_id):
+            entry = status.setdefault(
+                bot_id, {"bot_id": bot_id, "primary": False, "groups": 0, "load": 0}
+            )
+            entry["groups"] += 1
+            entry["load"] += load
+        return list(status.values())
+
+    def rebalance_groups(self, apply: bool = False):
+        """Spread groups across the pool by live subscription count.
+
+        Without ``apply`` only the plan is returned. When applying, a group is
+        moved only if the target bot is an admin there with invite and ban
+        rights; other moves are reported as skipped.
+        """
+        from app.services.telegram_group_service import TelegramGroupService
+
+        moves, _ = TelegramGroupService.plan_bot_rebalance(
+            list(self.bots), self.primary_bot_id
+        )
+        applied = skipped = 0
+        for move in moves:
+            if not apply:
+                move["status"] = "planned"
+                continue
+            chat_id = int(move["telegram_group_id"])
+            if not self.bot_is_admin(chat_id, move["to_bot_id"]):
+                move["status"] = "skipped_not_admin"
+                skipped += 1
+                continue
+            TelegramGroupService.assign_bot(move["telegram_group_id"], move["to_bot_id"])
+            move["status"] = "moved"
+            applied += 1
+            logger.info(
+                f"Moved group {chat_id} from bot {move['from_bot_id']} to bot {move['to_bot_id']}"
+            )
+        return {"moves": moves, "applied": applied, "skipped": skipped}
+
+    # GROUP VERIFICATION
+
+    async def _verify_chat(self, chat_id: str, bot_id: str) -> dict:
+        """Check one known group with getChat and getChatMember for the owning bot"""
+        result = {"telegram_group_id": chat_id, "status": "ok", "title": None, "new_chat_id": None}
+        try:
+            chat = await self._call_bot(bot_id, "get_chat", int(chat_id), lane="bulk")
+            member = await self._call_bot(
+                bot_id, "get_chat_member", int(chat_id), int(bot_id), lane="bulk"
+            )
+        except ChatMigrated as e:
+            result.update(status="migrated", new_chat_id=e.new_chat_id)
+            return result
+        except Forbidden:
+            result["status"] = "gone"
+            return result
+        except BadRequest as e:
+            result["status"] = "gone" if "chat not found" in str(e).lower() else "error"
+            return result
+        except TelegramError as e:
+            logger.warning(f"Could not verify group {chat_id}: {e}")
+            result["status"] = "error"
+            return result
+
+        result["title"] = chat.title
+        if member.status in (ChatMemberStatus.LEFT, ChatMemberStatus.BANNED):
+            result["status"] = "gone"
+        elif member.status not in (ChatMemberStatus.OWNER, ChatMemberStatus.ADMINISTRATOR):
+            result["status"] = "not_admin"
+        return result
+
+    async def _verify_chats_async(self, groups, batch_size: int, pause: float):
+        results = []
+        for start in range(0, len(groups), batch_size):
+            if start:
+                # Keep the pass well under Telegram's per-bot rate limits
+                await asyncio.sleep(pause)
+            batch = groups[start:start + batch_size]
+            results.extend(
+                await asyncio.gather(
+                    *(self._verify_chat(chat_id, bot_id) for chat_id, bot_id in batch)
+                )
+            )
+        return results
+
+    def verify_groups(self, batch_size: int = 10, pause: float = 1.0):
+        """Check every active group against Telegram and store the differences.
+
+        Groups are checked ``batch_size`` at a time through the bulk lane,
+        using each group's owning bot. Renames, removals and supergroup
+        migrations are applied in one transaction. Returns the counts from
+        GroupDiscoveryService.apply_verification.
+        """
+        from app.services.group_discovery_service import GroupDiscoveryService
+
+        groups = [
+            (chat_id, bot_id if bot_id in self.bots else self.primary_bot_id)
+            for chat_id, _, bot_id in GroupDiscoveryService.get_groups_to_verify()
+        ]
+        results = self._run_async_in_bot_loop(
+            self._verify_chats_async(groups, batch_size, pause), timeout=None
+        )
+        summary = GroupDiscoveryService.apply_verification(results)
+        logger.info(f"Verified {len(groups)} groups: {summary}")
+        return summary
 
     # BOT LIFECYCLE MANAGEMENT
 
     def start_bot(self):
         """Start the bot in a separate thread"""
         if not self.application or not self.bot_token:
-            logger.error("Bot token not available, skipping bot startup")
-            print(f"DEBUG: Bot token exists: {bool(self.bot_token)}")
+            logger.error(
+                "Bot token not available, skipping bot startup",
+                extra={"fields": {"token_set": bool(self.bot_token)}},
+            )
             return
 
-        print(f"DEBUG: Starting bot with token: {self.bot_token[:10]}...")
-        
+        logger.debug("Starting bot %s", bot_id_from_token(self.bot_token))
+
         def run_bot():
             logger.info("🚀 Starting Telegram Bot Service...")
-            print("DEBUG: Bot thread started")
             self.running = True
 
             try:
-                print("DEBUG: About to start polling")
                 import asyncio
                 loop = asyncio.new_event_loop()
                 asyncio.set_event_loop(loop)
                 self.event_loop = loop
                 
-                self.application.run_polling(
-                    drop_pending_updates=True,
-                    allowed_updates=[
-                        'message', 'chat_member', 'my_chat_member', 'chat_join_request'
-                    ],
-                    stop_signals=None
-                )
-                print("DEBUG: Polling started successfully")
+                # All pool bots poll from this one loop, so outbound calls
+                # for any bot can be scheduled with _run_async_in_bot_loop
+                loop.run_until_complete(self._start_applications())
+                logger.debug("Polling started")
+                loop.run_forever()
             except Exception as e:
-                logger.error(f"Error running bot: {e}")
-                print(f"DEBUG: Bot error: {e}")
-                import traceback
-                traceback.print_exc()
+                logger.exception("Error running bot: %s", e)
             finally:
+                try:
+                    loop.run_until_complete(self._stop_applications())
+                except Exception as e:
+                    logger.error(f"Error stopping bots: {e}")
                 self.running = False
-                print("DEBUG: Bot stopped")
+                logger.debug("Bot thread stopped")
 
         if not self.running:
             self.bot_thread = threading.Thread(target=run_bot, daemon=True)
             self.bot_thread.start()
             logger.info("✅ Bot service started in background thread")
-            print("DEBUG: Bot thread created")
+
+    async def _start_applications(self):
+        """Initialize every pool bot and start polling each from its saved offset"""
+        self._applications_stopped = False
+        loop = asyncio.get_running_loop()
+        offsets = await loop.run_in_executor(self.executor, self._load_offsets)
+        self._polling = True
+        for bot_id, application in self.applications.items():
+            await application.initialize()
+            await application.start()
+            try:
+                # getUpdates answers 409 Conflict while a webhook is set
+                await application.bot.delete_webhook(drop_pending_updates=False)
+            except TelegramError as e:
+                logger.error(f"Could not delete webhook for bot {bot_id}: {e}")
+            self._poll_tasks[bot_id] = loop.create_task(
+                self._poll(bot_id, application, offsets.get(bot_id))
+            )
+            if bot_id in offsets:
+                logger.info(f"Polling started for bot {bot_id}, resuming after update {offsets[bot_id]}")
+            else:
+                logger.info(f"Polling started for bot {bot_id}")
+        self._stream_flush_task = loop.create_task(self._stream_flush_loop())
+
+    def _load_offsets(self):
+        with self.app.app_context(), db_component("bot"):
+            from app.services.group_discovery_service import GroupDiscoveryService
+
+            try:
+                return GroupDiscoveryService.get_offsets(max_age=OFFSET_MAX_AGE)
+            except Exception as e:
+                logger.error(f"Could not load update offsets, polling from Telegram's: {e}")
+                return {}
+
+    async def _poll(self, bot_id: str, application: Application, last_update_id=None):
+        """Long-poll one bot, handling each batch before confirming it.
+
+        getUpdates confirms only the updates below the offset it is given,
+        and the offset moves past a batch once every update in it has been
+        handled, so updates that were received but not handled before a
+        restart are delivered again. Updates at or below the last handled
+        update_id are skipped, which makes the replay idempotent.
+        """
+        offset = last_update_id + 1 if last_update_id is not None else None
+        backoff = 1
+        while self._polling:
+            fetch = asyncio.ensure_future(
+                application.bot.get_updates(
+                    offset=offset,
+                    limit=UPDATE_BATCH_SIZE,
+                    timeout=POLL_TIMEOUT,
+                    allowed_updates=ALLOWED_UPDATES,
+                )
+            )
+            self._fetches[bot_id] = fetch
+            try:
+                updates = await fetch
+            except asyncio.CancelledError:
+                if self._polling:
+                    raise
+                break
+            except Exception as e:
+                logger.warning(f"getUpdates failed for bot {bot_id}, retrying in {backoff}s: {e}")
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, 30)
+                continue
+            finally:
+                self._fetches.pop(bot_id, None)
+            backoff = 1
+            if not updates:
+                continue
+
+            offset = max(update.update_id for update in updates) + 1
+            fresh = {
+                update.update_id: update
+                for update in updates
+                if last_update_id is None or update.update_id > last_update_id
+            }
+            if fresh:
+                await self._process_batch(bot_id, application, list(fresh.values()))
+                last_update_id = max(fresh)
+                self._pending_offsets[bot_id] = last_update_id
+
+    async def _process_batch(self, bot_id: str, application: Application, updates):
+        """Handle a batch: each chat's updates in order, chats concurrently"""
+        by_chat = {}
+        for update in sorted(updates, key=lambda update: update.update_id):
+            chat = update.effective_chat
+            by_chat.setdefault(chat.id if chat else None, []).append(update)
+        semaphore = asyncio.Semaphore(self.update_concurrency)
+
+        async def run(chat_updates):
+            async with semaphore:
+                for update in chat_updates:
+                    try:
+                        await application.process_update(update)
+                    except Exception as e:
+                        logger.exception(
+                            "Error processing update %s for bot %s: %s",
+                            update.update_id, bot_id, e,
+                        )
+
+        await asyncio.gather(*(run(chat_updates) for chat_updates in by_chat.values()))
+
+    async def _stop_polling(self):
+        # Pending getUpdates calls are abandoned (nothing they return has been
+        # confirmed yet); a batch being handled is finished first
+        self._polling = False
+        for fetch in list(self._fetches.values()):
+            fetch.cancel()
+        tasks, self._poll_tasks = self._poll_tasks, {}
+        for bot_id, result in zip(
+            tasks, await asyncio.gather(*tasks.values(), return_exceptions=True)
+        ):
+            if isinstance(result, BaseException) and not isinstance(result, asyncio.CancelledError):
+                logger.error(f"Error stopping polling for bot {bot_id}: {result}")
+
+    async def _stop_applications(self):
+        if self._applications_stopped:
+            return
+        self._applications_stopped = True
+        await self._stop_polling()
+        if self._stream_flush_task:
+            self._stream_flush_task.cancel()
+            self._stream_flush_task = None
+        for bot_id, application in self.applications.items():
+            try:
+                if application.running:
+                    await application.stop()
+                await application.shutdown()
+            except Exception as e:
+                logger.error(f"Error stopping bot {bot_id}: {e}")
+        # Persist offsets and chats seen since the last periodic flush
+        await self._flush_stream()
 
     def stop_bot(self):
         """Stop the bot"""
         if self.running:
             self.running = False
-            if self.application.updater:
-                self.application.updater.stop()
             logger.info("🛑 Bot service stopped")
 
-        if self.event_loop.is_running():
+        # run_bot shuts the applications down once the loop stops
+        if self.event_loop and self.event_loop.is_running():
             self.event_loop.call_soon_threadsafe(self.event_loop.stop)
             logger.info("🛑 Bot event loop stopped")
 
+    def shutdown(self, timeout: float = 20.0):
+        """Stop the bot without losing the work it has already accepted.
+
+        Polling stops first, once the batch being handled is done, so no new
+        updates come in. Outbound calls already scheduled on the bot loop
+        (invites, kicks, revocations) get to finish, then the applications
+        stop and the offset of the last handled update is persisted. Finally the executor's queued DB
+        work is given the rest of ``timeout``. Returns counts of drained and
+        abandoned outbound calls and executor tasks.
+        """
+        deadline = time.monotonic() + timeout
+        # Stopping the applications and persisting offsets gets a share of
+        # the time even if outbound calls use up the rest
+        reserve = min(5.0, timeout / 4)
+        self._stopping = True
+        tasks = set(self._tasks)
+        report = {
+            "outbound_drained": 0,
+            "outbound_abandoned": 0,
+            "tasks_drained": 0,
+            "tasks_abandoned": 0,
+        }
+
+        loop = self.event_loop
+        if loop and loop.is_running():
+            try:
+                asyncio.run_coroutine_threadsafe(self._stop_polling(), loop).result(
+                    max(0.0, deadline - time.monotonic())
+                )
+            except Exception as e:
+                logger.error(f"Error stopping polling: {e}")
+
+            done, pending = wait_futures(
+                set(self._outbound), max(0.0, deadline - reserve - time.monotonic())
+            )
+            report["outbound_drained"] = len(done)
+            report["outbound_abandoned"] = len(pending)
+            for future in pending:
+                future.cancel()
+
+            try:
+                asyncio.run_coroutine_threadsafe(self._stop_applications(), loop).result(
+                    max(0.0, deadline - time.monotonic())
+                )
+            except Exception as e:
+                logger.error(f"Error stopping bots: {e}")
+            self.stop_bot()
+            if self.bot_thread:
+                self.bot_thread.join(max(0.0, deadline - time.monotonic()))
+
+        tasks |= self._tasks
+        done, pending = wait_futures(tasks, max(0.0, deadline - time.monotonic()))
+        report["tasks_drained"] = len(done)
+        report["tasks_abandoned"] = len(pending)
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        return report
+
 
 import os
 
-tg_bot = TelegramGroupBotService(os.environ.get("TELEGRAM_BOT_TOKEN"))
+# The service is built on first use rather than at import time so that CLI
+# commands (e.g. ``flask db upgrade``) never construct an Application/Bot.
+_tg_bot = None
+_tg_bot_lock = threading.Lock()
+
+
+def get_tg_bot() -> TelegramGroupBotService:
+    """Return the process-wide bot service, constructing it on first call"""
+    global _tg_bot
+    if _tg_bot is None:
+        with _tg_bot_lock:
+            if _tg_bot is None:
+                extra_tokens = [
+                    token.strip()
+                    for token in os.environ.get("TELEGRAM_BOT_TOKENS", "").split(",")
+                    if token.strip()
+                ]
+                primary = os.environ.get("TELEGRAM_BOT_TOKEN") or (
+                    extra_tokens[0] if extra_tokens else None
+                )
+                _tg_bot = TelegramGroupBotService(primary, extra_tokens)
+    return _tg_bot
+
+
+def __getattr__(name):
+    # Keep ``from app.services.telegram import tg_bot`` working for callers
+    if name == "tg_bot":
+        return get_tg_bot()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
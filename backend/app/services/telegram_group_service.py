@@ -1,5 +1,6 @@
 from app import db
-from app.models import TelegramGroup, Product
+from app.models import MembershipCounter, TelegramGroup, Product
+from app.services.table_version_service import TableVersionService
 from sqlalchemy.exc import SQLAlchemyError
 
 
@@ -29,7 +30,12 @@ class TelegramGroupService:
         return TelegramGroup.query.filter_by(product_id=product_id).all()
 
     @staticmethod
-    def create_or_update_group(telegram_group_id, telegram_group_name):
+    def create_or_update_group(telegram_group_id, telegram_group_name, bot_id=None):
+        """Register a group the bot was added to.
+
+        ``bot_id`` becomes the owning bot for new groups and for groups whose
+        previous owner had left (inactive); active groups keep their owner.
+        """
         try:
             # Convert telegram_group_id to string to match database column type
             telegram_group_id_str = str(telegram_group_id)
@@ -42,12 +48,16 @@ class TelegramGroupService:
                 group = TelegramGroup(
                     telegram_group_id=telegram_group_id_str,
                     telegram_group_name=telegram_group_name,
+                    bot_id=bot_id,
                 )
                 db.session.add(group)
             else:
+                if bot_id and group.is_active is False:
+                    group.bot_id = bot_id
                 group.telegram_group_name = telegram_group_name
                 group.is_active = True
 
+            TableVersionService.bump("telegram_groups")
             db.session.commit()
             return group
         except SQLAlchemyError as e:
@@ -80,6 +90,7 @@ class TelegramGroupService:
 
             # Map the product to the group
             group.product_id = product_id
+            TableVersionService.bump("telegram_groups")
             db.session.commit()
             return group, None
         except SQLAlchemyError as e:
@@ -98,6 +109,7 @@ class TelegramGroupService:
                 if not group:
                     return False
                 group.product_id = None
+                TableVersionService.bump("telegram_groups")
                 db.session.commit()
                 return True
             else:
@@ -107,6 +119,7 @@ class TelegramGroupService:
                     return False
                 for group in groups:
                     group.product_id = None
+                TableVersionService.bump("telegram_groups")
                 db.session.commit()
                 return True
         except SQLAlchemyError as e:
@@ -124,9 +137,100 @@ class TelegramGroupService:
             ).first()
             if group:
                 group.is_active = False
+                TableVersionService.bump("telegram_groups")
                 db.session.commit()
                 return True
             return False
         except SQLAlchemyError as e:
             db.session.rollback()
             raise e
+
+
+    @staticmethod
+    def get_owner_bot_id(telegram_group_id):
+        """Return the owning bot ID for a group, or None for the primary bot"""
+        return (
+            db.session.query(TelegramGroup.bot_id)
+            .filter_by(telegram_group_id=str(telegram_group_id))
+            .scalar()
+        )
+
+    @staticmethod
+    def assign_bot(telegram_group_id, bot_id):
+        try:
+            group = TelegramGroup.query.filter_by(
+                telegram_group_id=str(telegram_group_id)
+            ).first()
+            if not group:
+                return None, "Telegram group not found"
+            group.bot_id = bot_id
+            TableVersionService.bump("telegram_groups")
+            db.session.commit()
+            return group, None
+        except SQLAlchemyError as e:
+            db.session.rollback()
+            raise e
+
+    @staticmethod
+    def get_bot_loads(primary_bot_id):
+        """Return [(telegram_group_id, bot_id, load)] for active groups.
+
+        ``load`` is the number of live (pending_join or active) subscriptions
+        from the membership counters. Groups without an owner are reported
+        under ``primary_bot_id``.
+        """
+        load = db.func.coalesce(db.func.sum(MembershipCounter.count), 0)
+        rows = (
+            db.session.query(TelegramGroup.telegram_group_id, TelegramGroup.bot_id, load)
+            .outerjoin(
+                MembershipCounter,
+                db.and_(
+                    MembershipCounter.telegram_group_id == TelegramGroup.id,
+                    MembershipCounter.status.in_(("pending_join", "active")),
+                ),
+            )
+            .filter(TelegramGroup.is_active.is_(True))
+            .group_by(TelegramGroup.id, TelegramGroup.telegram_group_id, TelegramGroup.bot_id)
+            .order_by(TelegramGroup.id)
+            .all()
+        )
+        return [
+            (group_id, bot_id or primary_bot_id, int(count))
+            for group_id, bot_id, count in rows
+        ]
+
+    @staticmethod
+    def plan_bot_rebalance(bot_ids, primary_bot_id):
+        """Plan moves that even out live subscriptions across ``bot_ids``.
+
+        Groups are visited heaviest first and stay with their current bot while
+        it is under its fair share, so a balanced pool produces no moves.
+        Returns (moves, loads) where moves is a list of
+        {"telegram_group_id", "from_bot_id", "to_bot_id", "load"} and loads is
+        the projected load per bot.
+        """
+        groups = TelegramGroupService.get_bot_loads(primary_bot_id)
+        total = sum(load for _, _, load in groups) + len(groups)
+        share = total / max(len(bot_ids), 1)
+        loads = dict.fromkeys(bot_ids, 0)
+        moves = []
+        for telegram_group_id, current, load in sorted(
+            groups, key=lambda item: item[2], reverse=True
+        ):
+            # +1 so empty groups are spread out too
+            weight = load + 1
+            if current in loads and loads[current] + weight <= share + 1:
+                target = current
+            else:
+                target = min(loads, key=loads.get)
+            loads[target] += weight
+            if target != current:
+                moves.append(
+                    {
+                        "telegram_group_id": telegram_group_id,
+                        "from_bot_id": current,
+                        "to_bot_id": target,
+                        "load": load,
+                    }
+                )
+        return moves, loads
@@ -0,0 +1,179 @@
+"""Priority lanes for outbound Telegram Bot API calls.
+
+Every call made through the bot service takes a slot from a shared pool.
+Calls are classed into lanes:
+
+- ``interactive``: join approvals and invites for paying users
+- ``admin``: single actions from the admin API (the default)
+- ``bulk``: the expiry sweep, imports and other batch jobs
+
+When slots are scarce, waiting calls are granted by smooth weighted round
+robin across lanes, and ``reserved_interactive`` slots are only ever used by
+the interactive lane, so a sweep can never occupy the whole pool.
+"""
+import asyncio
+import contextvars
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+
+LANES = ("interactive", "admin", "bulk")
+DEFAULT_LANE = "admin"
+DEFAULT_WEIGHTS = {"interactive": 6, "admin": 3, "bulk": 1}
+
+_current_lane = contextvars.ContextVar("telegram_lane", default=DEFAULT_LANE)
+
+
+@contextmanager
+def telegram_lane(lane: str):
+    """Run Telegram calls made by this thread/greenlet in ``lane``"""
+    token = _current_lane.set(lane)
+    try:
+        yield
+    finally:
+        _current_lane.reset(token)
+
+
+def current_lane() -> str:
+    return _current_lane.get()
+
+
+def _percentile(values, fraction):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+class _LaneStats:
+    def __init__(self):
+        self.queued = 0
+        self.calls = 0
+        self.wait_total = 0.0
+        self.call_total = 0.0
+        self.max_wait = 0.0
+        self.recent_waits = deque(maxlen=500)
+        self.recent_latencies = deque(maxlen=500)
+
+    def record(self, wait, duration):
+        self.calls += 1
+        self.wait_total += wait
+        self.call_total += duration
+        self.max_wait = max(self.max_wait, wait)
+        self.recent_waits.append(wait)
+        self.recent_latencies.append(wait + duration)
+
+
+class TelegramLaneScheduler:
+    def __init__(self, max_concurrency=8, reserved_interactive=2, weights=None):
+        self.max_concurrency = max_concurrency
+        self.reserved_interactive = min(reserved_interactive, max_concurrency - 1)
+        self.weights = dict(DEFAULT_WEIGHTS, **(weights or {}))
+        self.in_flight = 0
+        self._lock = threading.Lock()
+        self._waiters = {lane: deque() for lane in LANES}
+        self._credits = dict.fromkeys(LANES, 0)
+        self._stats = {lane: _LaneStats() for lane in LANES}
+
+    def _can_run(self, lane):
+        limit = self.max_concurrency
+        if lane != "interactive":
+            limit -= self.reserved_interactive
+        return self.in_flight < limit
+
+    @asynccontextmanager
+    async def slot(self, lane: str = DEFAULT_LANE):
+        """Hold one call slot in ``lane`` for the duration of the block"""
+        if lane not in LANES:
+            lane = DEFAULT_LANE
+        stats = self._stats[lane]
+        queued_at = time.monotonic()
+        entry = None
+        with self._lock:
+            if self._can_run(lane) and not self._waiters[lane]:
+                self.in_flight += 1
+            else:
+                loop = asyncio.get_running_loop()
+                entry = (loop, loop.create_future())
+                self._waiters[lane].append(entry)
+                stats.queued += 1
+
+        if entry is not None:
+            try:
+                await entry[1]
+            except asyncio.CancelledError:
+                with self._lock:
+                    if entry in self._waiters[lane]:
+                        self._waiters[lane].remove(entry)
+                        stats.queued -= 1
+                if entry[1].done() and not entry[1].cancelled():
+                    # _grant ran before the cancellation reached us; the
+                    # slot is ours, so give it back
+                    self._release()
+                # If the grant is still pending, _grant hands the slot back
+                raise
+
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            finished = time.monotonic()
+            with self._lock:
+                stats.record(started - queued_at, finished - started)
+            self._release()
+
+    def _release(self):
+        with self._lock:
+            self.in_flight -= 1
+            self._dispatch()
+
+    def _dispatch(self):
+        # Lock held. Grant free slots to waiting lanes by smooth weighted round robin.
+        while True:
+            eligible = [lane for lane in LANES if self._waiters[lane] and self._can_run(lane)]
+            if not eligible:
+                return
+            total = sum(self.weights[lane] for lane in eligible)
+            for lane in eligible:
+                self._credits[lane] += self.weights[lane]
+            lane = max(eligible, key=lambda name: self._credits[name])
+            self._credits[lane] -= total
+            loop, future = self._waiters[lane].popleft()
+            self._stats[lane].queued -= 1
+            self.in_flight += 1
+            loop.call_soon_threadsafe(self._grant, future)
+
+    def _grant(self, future):
+        if future.cancelled():
+            self._release()
+        else:
+            future.set_result(None)
+
+    def stats(self):
+        with self._lock:
+            lanes = []
+            for lane in LANES:
+                stats = self._stats[lane]
+                calls = stats.calls or 1
+                lanes.append(
+                    {
+                        "lane": lane,
+                        "weight": self.weights[lane],
+                        "queued": stats.queued,
+                        "calls": stats.calls,
+                        "avg_wait_ms": round(stats.wait_total / calls * 1000, 1),
+                        "p95_wait_ms": round(_percentile(stats.recent_waits, 0.95) * 1000, 1),
+                        "max_wait_ms": round(stats.max_wait * 1000, 1),
+                        "avg_call_ms": round(stats.call_total / calls * 1000, 1),
+                        "p95_latency_ms": round(
+                            _percentile(stats.recent_latencies, 0.95) * 1000, 1
+                        ),
+                    }
+                )
+            return {
+                "in_flight": self.in_flight,
+                "max_concurrency": self.max_concurrency,
+                "reserved_interactive": self.reserved_interactive,
+                "lanes": lanes,
+            }
@@ -0,0 +1,40 @@
+from app import db
+from app.models import User
+from sqlalchemy import func, or_
+
+
+def _escape_like(value):
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+class UserService:
+    @staticmethod
+    def lookup_users(query=None, limit=20, cursor=None):
+        """Prefix search on email/telegram_username with keyset pagination.
+
+        Results are ordered by email; ``cursor`` is the last email of the
+        previous page. The prefix filters match the lower(...) pattern indexes
+        on users, so each page is an index range scan rather than a full scan.
+        Returns (users, next_cursor), where next_cursor is None on the last page.
+        """
+        q = db.session.query(User)
+
+        if query:
+            pattern = _escape_like(query.strip().lower()) + "%"
+            q = q.filter(
+                or_(
+                    func.lower(User.email).like(pattern, escape="\\"),
+                    func.lower(User.telegram_username).like(pattern, escape="\\"),
+                )
+            )
+
+        if cursor:
+            q = q.filter(User.email > cursor)
+
+        # Fetch one extra row to know whether another page exists
+        users = q.order_by(User.email.asc()).limit(limit + 1).all()
+        next_cursor = None
+        if len(users) > limit:
+            users = users[:limit]
+            next_cursor = users[-1].email
+        return users, next_cursor
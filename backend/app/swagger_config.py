@@ -39,13 +39,19 @@ product_update_model = api.model('ProductUpdate', {
     'description': fields.String(description='Product description')
 })
 
+product_summary_model = api.model('ProductSummary', {
+    'id': fields.String(description='Product ID'),
+    'name': fields.String(description='Product name')
+})
+
 # Group models
 telegram_group_model = api.model('TelegramGroup', {
     'id': fields.Integer(description='Internal group ID'),
     'telegram_group_id': fields.String(required=True, description='Telegram group ID'),
     'telegram_group_name': fields.String(required=True, description='Telegram group name'),
     'product_id': fields.String(description='Mapped product ID'),
-    'is_active': fields.Boolean(description='Whether group is active')
+    'is_active': fields.Boolean(description='Whether group is active'),
+    'bot_id': fields.String(description='Owning pool bot ID (null = primary bot)')
 })
 
 # Add telegram_groups to product model after telegram_group_model is defined
@@ -69,7 +75,39 @@ subscription_model = api.model('Subscription', {
     'subscription_expires_at': fields.DateTime(description='Subscription expiration'),
     'invite_link_url': fields.String(description='Invite link URL'),
     'invite_link_expires_at': fields.DateTime(description='Invite link expiration'),
-    'created_at': fields.DateTime(description='Creation timestamp')
+    'created_at': fields.DateTime(description='Creation timestamp'),
+    'archived': fields.Boolean(default=False, description='Whether the row comes from the archive')
+})
+
+subscription_event_model = api.model('SubscriptionEvent', {
+    'id': fields.Integer(description='Event ID'),
+    'subscription_id': fields.Integer(description='Subscription ID'),
+    'event_type': fields.String(description='Event type (created, invite_issued, join_approved, join_declined, expired, cancelled, renewed, kicked, kick_failed, invite_revoked)'),
+    'telegram_user_id': fields.String(description='Telegram user ID involved, if any'),
+    'details': fields.Raw(description='Event-specific details'),
+    'created_at': fields.DateTime(description='When the event happened')
+})
+
+status_counts = {
+    'pending_join': fields.Integer(description='Subscriptions waiting for the user to join'),
+    'active': fields.Integer(description='Active subscriptions'),
+    'expired': fields.Integer(description='Expired subscriptions'),
+    'cancelled': fields.Integer(description='Cancelled subscriptions')
+}
+
+product_stats_model = api.model('ProductMembershipStats', dict({
+    'product_id': fields.String(description='Product ID')
+}, **status_counts))
+
+group_stats_model = api.model('GroupMembershipStats', dict({
+    'id': fields.Integer(description='Internal group ID'),
+    'telegram_group_id': fields.String(description='Telegram group ID'),
+    'telegram_group_name': fields.String(description='Telegram group name')
+}, **status_counts))
+
+membership_stats_model = api.model('MembershipStats', {
+    'products': fields.List(fields.Nested(product_stats_model)),
+    'groups': fields.List(fields.Nested(group_stats_model))
 })
 
 subscription_request_model = api.model('SubscriptionRequest', {
@@ -102,6 +140,11 @@ user_model = api.model('User', {
     'telegram_username': fields.String(description='Telegram username')
 })
 
+user_lookup_model = api.model('UserLookup', {
+    'items': fields.List(fields.Nested(user_model)),
+    'next_cursor': fields.String(description='Cursor for the next page, null on the last page')
+})
+
 member_model = api.model('Member', {
     'subscription_id': fields.Integer(description='Subscription ID'),
     'status': fields.String(description='Subscription status'),
@@ -110,7 +153,8 @@ member_model = api.model('Member', {
     'invite_link_expires_at': fields.DateTime(description='Invite link expiration'),
     'user': fields.Nested(user_model),
     'product': fields.Nested(product_model),
-    'telegram_group': fields.Nested(telegram_group_model)
+    'telegram_group': fields.Nested(telegram_group_model),
+    'archived': fields.Boolean(default=False, description='Whether the subscription is archived')
 })
 
 # Telegram models
@@ -154,6 +198,203 @@ telegram_response_model = api.model('TelegramResponse', {
     'token': fields.String(description='Token used (for regenerate)')
 })
 
+admission_stats_model = api.model('AdmissionStats', {
+    'in_flight': fields.Integer(description='Telegram-bound requests currently running'),
+    'queued': fields.Integer(description='Requests waiting for a slot'),
+    'peak_queued': fields.Integer(description='Highest queue depth since start'),
+    'max_concurrency': fields.Integer(description='Configured concurrent request limit'),
+    'max_queue': fields.Integer(description='Configured queue depth limit'),
+    'queue_timeout': fields.Float(description='Seconds a request may wait for a slot'),
+    'admitted_total': fields.Integer(description='Requests admitted since start'),
+    'shed_total': fields.Integer(description='Requests rejected with 503 since start'),
+    'shed_queue_full': fields.Integer(description='Rejected because the queue was full'),
+    'shed_timeout': fields.Integer(description='Rejected after waiting past the deadline'),
+    'queue_wait_seconds_total': fields.Float(description='Total time spent queued')
+})
+
+circuit_breaker_model = api.model('CircuitBreaker', {
+    'name': fields.String(description='Breaker key (method:<bot method> or chat:<chat id>)'),
+    'state': fields.String(description='closed, open or half_open'),
+    'retry_after': fields.Float(description='Seconds until a probe is allowed while open'),
+    'recent_calls': fields.Integer(description='Calls in the current window'),
+    'recent_failures': fields.Integer(description='Failures in the current window'),
+    'trips': fields.Integer(description='Times the breaker has opened since start')
+})
+
+bot_pool_model = api.model('BotPoolMember', {
+    'bot_id': fields.String(description='Bot ID (token prefix)'),
+    'primary': fields.Boolean(description='Whether this is the primary bot'),
+    'groups': fields.Integer(description='Active groups owned by this bot'),
+    'load': fields.Integer(description='Live subscriptions in those groups')
+})
+
+db_pool_model = api.model('DatabasePool', {
+    'bind': fields.String(description='Engine: web, bot, background or replica_<n>'),
+    'pool': fields.String(description='Pool class'),
+    'size': fields.Integer(description='Configured pool size'),
+    'checked_out': fields.Integer(description='Connections currently in use'),
+    'overflow': fields.Integer(description='Connections open beyond the pool size'),
+    'checkouts': fields.Integer(description='Checkouts since start'),
+    'timeouts': fields.Integer(description='Checkouts that gave up after DB_POOL_TIMEOUT'),
+    'wait_seconds_total': fields.Float(description='Total time spent waiting for a connection'),
+    'wait_seconds_max': fields.Float(description='Longest wait for a connection'),
+    'wait_seconds_avg': fields.Float(description='Average wait per checkout')
+})
+
+group_bot_assign_model = api.model('GroupBotAssign', {
+    'bot_id': fields.String(required=True, description='Pool bot ID to take over the group')
+})
+
+bot_rebalance_request_model = api.model('BotRebalanceRequest', {
+    'apply': fields.Boolean(default=False, description='Apply the moves (default: only plan them)')
+})
+
+bot_move_model = api.model('BotMove', {
+    'telegram_group_id': fields.String(description='Telegram group ID'),
+    'from_bot_id': fields.String(description='Current owner'),
+    'to_bot_id': fields.String(description='New owner'),
+    'load': fields.Integer(description='Live subscriptions in the group'),
+    'status': fields.String(description='planned, moved or skipped_not_admin')
+})
+
+bot_rebalance_model = api.model('BotRebalance', {
+    'moves': fields.List(fields.Nested(bot_move_model)),
+    'applied': fields.Integer(description='Moves applied'),
+    'skipped': fields.Integer(description='Moves skipped because the target bot lacks admin rights')
+})
+
+telegram_lane_model = api.model('TelegramLane', {
+    'lane': fields.String(description='interactive, admin or bulk'),
+    'weight': fields.Integer(description='Scheduling weight when slots are contended'),
+    'queued': fields.Integer(description='Calls waiting for a slot'),
+    'calls': fields.Integer(description='Calls completed since start'),
+    'avg_wait_ms': fields.Float(description='Average time waiting for a slot'),
+    'p95_wait_ms': fields.Float(description='95th percentile wait (recent calls)'),
+    'max_wait_ms': fields.Float(description='Longest wait since start'),
+    'avg_call_ms': fields.Float(description='Average Bot API call duration'),
+    'p95_latency_ms': fields.Float(description='95th percentile wait + call (recent calls)')
+})
+
+telegram_lanes_model = api.model('TelegramLanes', {
+    'in_flight': fields.Integer(description='Bot API calls currently running'),
+    'max_concurrency': fields.Integer(description='Concurrent call slots'),
+    'reserved_interactive': fields.Integer(description='Slots only the interactive lane may use'),
+    'lanes': fields.List(fields.Nested(telegram_lane_model))
+})
+
+group_verify_model = api.model('GroupVerify', {
+    'checked': fields.Integer(description='Active groups checked'),
+    'renamed': fields.Integer(description='Groups whose title changed'),
+    'deactivated': fields.Integer(description='Groups the owning bot is no longer in'),
+    'migrated': fields.Integer(description='Groups upgraded to a supergroup with a new ID'),
+    'not_admin': fields.Integer(description='Groups where the owning bot lacks admin rights'),
+    'errors': fields.Integer(description='Groups that could not be checked')
+})
+
+membership_reconcile_request_model = api.model('MembershipReconcileRequest', {
+    'apply': fields.Boolean(default=False, description='Expire and kick (default: only count the differences)')
+})
+
+membership_reconcile_model = api.model('MembershipReconcile', {
+    'dry_run': fields.Boolean(description='Whether only counts were produced'),
+    'departed': fields.Integer(description='Active subscriptions whose user left the group'),
+    'expired': fields.Integer(description='Of those, subscriptions expired'),
+    'intruders': fields.Integer(description='Members without a live subscription'),
+    'kicked': fields.Integer(description='Of those, members removed'),
+    'kick_failed': fields.Integer(description='Removals that failed'),
+    'skipped': fields.Integer(description='Removals skipped because the chat circuit is open'),
+    'paused_for': fields.Integer(description='Seconds until the Bot API circuit allows calls, if the run stopped early')
+})
+
+subscription_archive_request_model = api.model('SubscriptionArchiveRequest', {
+    'older_than_days': fields.Float(description='Archive rows last changed at least this long ago (default: SUBSCRIPTION_ARCHIVE_AFTER_DAYS)'),
+    'max_batches': fields.Integer(description='Stop after this many batches; the rest is archived on the next run')
+})
+
+subscription_archive_model = api.model('SubscriptionArchiveResult', {
+    'archived': fields.Integer(description='Subscriptions moved to the archive')
+})
+
+pending_reap_request_model = api.model('PendingReapRequest', {
+    'ttl_hours': fields.Float(description='Reap pending subscriptions whose invite link is at least this old (default: PENDING_JOIN_TTL_HOURS)'),
+    'max_batches': fields.Integer(description='Stop after this many batches; the rest is reaped on the next run')
+})
+
+pending_reap_model = api.model('PendingReapResult', {
+    'found': fields.Integer(description='Stale pending_join subscriptions examined'),
+    'revoked': fields.Integer(description='Invite links revoked'),
+    'rejected': fields.Integer(description='Invite links Telegram refused to revoke (unknown or already revoked)'),
+    'revoke_failed': fields.Integer(description='Revocations that failed and are retried on the next run'),
+    'revoke_skipped': fields.Integer(description='Revocations skipped because a circuit is open'),
+    'expired': fields.Integer(description='Subscriptions moved from pending_join to expired'),
+    'paused_for': fields.Integer(description='Seconds until the Bot API circuit allows calls, if the run stopped early')
+})
+
+subscription_pair_model = api.model('SubscriptionPair', {
+    'email': fields.String(required=True, description='User email'),
+    'product_id': fields.String(required=True, description='Product ID')
+})
+
+bulk_subscription_request_model = api.model('BulkSubscriptionRequest', {
+    'items': fields.List(fields.Nested(subscription_pair_model), required=True, description='Subscriptions to act on')
+})
+
+bulk_cancel_model = api.model('BulkCancelResult', {
+    'requested': fields.Integer(description='Distinct (email, product_id) pairs requested'),
+    'cancelled': fields.Integer(description='Subscriptions cancelled'),
+    'not_found': fields.List(fields.Nested(subscription_pair_model), description='Pairs without a live subscription'),
+    'kicked': fields.Integer(description='Members removed from their group'),
+    'kick_failed': fields.Integer(description='Removals Telegram rejected'),
+    'kick_skipped': fields.Integer(description='Removals skipped while a circuit was open (left to membership reconciliation)'),
+    'paused_for': fields.Integer(description='Seconds until the Bot API accepts calls again, if kicking stopped early')
+})
+
+bulk_invite_item_model = api.model('BulkInviteItem', {
+    'subscription_id': fields.Integer(description='Subscription ID'),
+    'email': fields.String(description='User email'),
+    'product_id': fields.String(description='Product ID'),
+    'invite_link': fields.String(description='New invite link'),
+    'token': fields.String(description='New invite token')
+})
+
+bulk_regenerate_model = api.model('BulkRegenerateResult', {
+    'requested': fields.Integer(description='Distinct (email, product_id) pairs requested'),
+    'regenerated': fields.Integer(description='Invite links issued'),
+    'failed': fields.Integer(description='Links Telegram refused to create'),
+    'skipped': fields.Integer(description='Links skipped while a circuit was open'),
+    'paused_for': fields.Integer(description='Seconds until the Bot API accepts calls again, if the run stopped early'),
+    'not_found': fields.List(fields.Nested(subscription_pair_model), description='Pairs without a live subscription'),
+    'items': fields.List(fields.Nested(bulk_invite_item_model), description='Issued links')
+})
+
+renew_request_model = api.model('RenewRequest', {
+    'email': fields.String(required=True, description='User email'),
+    'product_id': fields.String(required=True, description='Product ID'),
+    'extend_days': fields.Float(description='Days to add to the current expiry (or to now, if already past)'),
+    'expiration_datetime': fields.DateTime(description='New expiry; never moves an expiry earlier')
+})
+
+renewal_model = api.model('Renewal', {
+    'subscription_id': fields.Integer(description='Subscription ID'),
+    'email': fields.String(description='User email'),
+    'product_id': fields.String(description='Product ID'),
+    'previous_expires_at': fields.DateTime(description='Expiry before the renewal'),
+    'subscription_expires_at': fields.DateTime(description='Expiry after the renewal')
+})
+
+bulk_renew_request_model = api.model('BulkRenewRequest', {
+    'items': fields.List(fields.Nested(subscription_pair_model), required=True, description='Subscriptions to renew'),
+    'extend_days': fields.Float(description='Days to add to each current expiry (or to now, if already past)'),
+    'expiration_datetime': fields.DateTime(description='New expiry for all items; never moves an expiry earlier')
+})
+
+bulk_renew_model = api.model('BulkRenewResult', {
+    'requested': fields.Integer(description='Distinct (email, product_id) pairs requested'),
+    'renewed': fields.Integer(description='Subscriptions extended'),
+    'not_found': fields.List(fields.Nested(subscription_pair_model), description='Pairs without a live subscription'),
+    'items': fields.List(fields.Nested(renewal_model), description='New expiries')
+})
+
 success_message_model = api.model('SuccessMessage', {
     'message': fields.String(description='Success message')
 })
\ No newline at end of file
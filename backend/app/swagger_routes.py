@@ -1,45 +1,67 @@
-from flask import request, jsonify
+from flask import current_app, request, jsonify
 from flask_restx import Resource, Namespace
 from marshmallow import ValidationError
-from app.services import ProductService, TelegramGroupService, SubscriptionService
-from app.schemas import (
-    product_schema, products_schema, product_create_schema, product_update_schema,
-    telegram_group_schema, telegram_groups_schema,
-    subscription_schema, subscriptions_schema, subscription_request_schema
+from app.services.subscription_service import INVITE_LINK_FAILED
+from app.services import (
+    ProductService, TelegramGroupService, SubscriptionService, SubscriptionEventService,
+    MembershipStatsService, UserService, GroupMemberService, SubscriptionArchiveService,
+    PendingJoinService
 )
+from app.schemas import product_create_schema, product_update_schema, subscription_request_schema
 from app.swagger_config import (
     product_model, product_create_model, product_update_model, error_model, validation_error_model,
     telegram_group_model, group_mapping_model, group_unmap_model, success_message_model,
     subscription_model, subscription_request_model, subscription_response_model, paginated_subscriptions_model,
     user_model, member_model, kick_user_model, kick_by_email_model, regenerate_invite_model, telegram_response_model,
-    regenerate_user_invite_model, invite_link_response_model
+    regenerate_user_invite_model, invite_link_response_model, subscription_event_model,
+    membership_stats_model, user_lookup_model, product_summary_model, admission_stats_model,
+    circuit_breaker_model, bot_pool_model, group_bot_assign_model, bot_rebalance_request_model,
+    bot_rebalance_model, telegram_lanes_model, membership_reconcile_request_model,
+    membership_reconcile_model, group_verify_model, subscription_archive_request_model,
+    subscription_archive_model, db_pool_model, bulk_subscription_request_model, bulk_cancel_model,
+    bulk_regenerate_model, renew_request_model, renewal_model, bulk_renew_request_model,
+    bulk_renew_model, pending_reap_request_model, pending_reap_model
 )
-from app.models import User, Subscription, Product, TelegramGroup
-# Import tg_bot conditionally to avoid startup issues
-try:
-    from app.services.telegram import tg_bot
-except ImportError:
-    tg_bot = None
-from sqlalchemy import and_
+from app.models import User, Subscription
+from app.serialization import serialize_with
+from app.http_cache import cached_by_versions
+from app.idempotency import IDEMPOTENCY_DOC, idempotent
+from app.admission import admission_controlled, telegram_admission
+from app.db_routing import replica_reads
+from app.utils.export import EXPORT_FORMATS, export_response
 import logging
+from datetime import datetime, timezone
 
 logger = logging.getLogger(__name__)
 
+
+def _get_tg_bot():
+    """Resolve the bot service on first use so importing the routes stays cheap"""
+    try:
+        from app.services.telegram import get_tg_bot
+    except ImportError:
+        return None
+    return get_tg_bot()
+
+def _include_archived():
+    """Whether the request asks for archived subscriptions too"""
+    return request.args.get('include_archived', '').lower() in ('1', 'true', 'yes')
+
 # Product namespace
 products_ns = Namespace('products', description='Product management operations')
 
 @products_ns.route('')
 class ProductList(Resource):
     @products_ns.doc('list_products')
-    @products_ns.marshal_list_with(product_model)
+    @cached_by_versions('products', 'telegram_groups', public=True)
+    @serialize_with(products_ns, product_model, as_list=True)
     def get(self):
         """Get all products"""
-        products = ProductService.get_all_products()
-        return products_schema.dump(products)
+        return list(ProductService.get_catalog().products)
 
     @products_ns.doc('create_product')
     @products_ns.expect(product_create_model)
-    @products_ns.marshal_with(product_model, code=201)
+    @serialize_with(products_ns, product_model, code=201)
     @products_ns.response(400, 'Validation error', validation_error_model)
     @products_ns.response(500, 'Internal server error', error_model)
     def post(self):
@@ -47,28 +69,37 @@ class ProductList(Resource):
         try:
             product_data = product_create_schema.load(request.json)
             product = ProductService.create_product(product_data)
-            return product_schema.dump(product), 201
+            return product, 201
         except ValidationError as e:
             return {'message': 'Validation error', 'errors': e.messages}, 400
         except Exception as e:
             return {'message': str(e)}, 500
 
+@products_ns.route('/summary')
+class ProductSummaryList(Resource):
+    @products_ns.doc('list_products_summary')
+    @serialize_with(products_ns, product_summary_model, as_list=True)
+    def get(self):
+        """Get product IDs and names only (cached, for dropdowns)"""
+        return ProductService.get_products_summary()
+
 @products_ns.route('/<string:product_id>')
 @products_ns.param('product_id', 'Product ID (string)')
 class Product(Resource):
     @products_ns.doc('get_product')
-    @products_ns.marshal_with(product_model)
+    @cached_by_versions('products', 'telegram_groups', public=True)
+    @serialize_with(products_ns, product_model)
     @products_ns.response(404, 'Product not found', error_model)
     def get(self, product_id):
         """Get a specific product"""
-        product = ProductService.get_product_by_id(product_id)
+        product = ProductService.get_catalog().by_id.get(product_id)
         if not product:
             return {'message': 'Product not found'}, 404
-        return product_schema.dump(product)
+        return product
 
     @products_ns.doc('update_product')
     @products_ns.expect(product_update_model)
-    @products_ns.marshal_with(product_model)
+    @serialize_with(products_ns, product_model)
     @products_ns.response(400, 'Validation error', validation_error_model)
     @products_ns.response(404, 'Product not found', error_model)
     @products_ns.response(500, 'Internal server error', error_model)
@@ -79,14 +110,14 @@ class Product(Resource):
             product = ProductService.update_product(product_id, product_data)
             if not product:
                 return {'message': 'Product not found'}, 404
-            return product_schema.dump(product)
+            return product
         except ValidationError as e:
             return {'message': 'Validation error', 'errors': e.messages}, 400
         except Exception as e:
             return {'message': str(e)}, 500
 
     @products_ns.doc('delete_product')
-    @products_ns.marshal_with(success_message_model)
+    @serialize_with(products_ns, success_message_model)
     @products_ns.response(404, 'Product not found', error_model)
     @products_ns.response(500, 'Internal server error', error_model)
     def delete(self, product_id):
@@ -104,7 +135,7 @@ class Product(Resource):
 class ProductMapping(Resource):
     @products_ns.doc('map_product_to_group')
     @products_ns.expect(group_mapping_model)
-    @products_ns.marshal_with(telegram_group_model)
+    @serialize_with(products_ns, telegram_group_model)
     @products_ns.response(400, 'Bad request', error_model)
     @products_ns.response(500, 'Internal server error', error_model)
     def post(self, product_id):
@@ -123,7 +154,7 @@ class ProductMapping(Resource):
             if error:
                 return {'message': error}, 400
             
-            return telegram_group_schema.dump(group)
+            return group
         except Exception as e:
             return {'message': str(e)}, 500
 
@@ -132,7 +163,7 @@ class ProductMapping(Resource):
 class ProductUnmapping(Resource):
     @products_ns.doc('unmap_product')
     @products_ns.expect(group_unmap_model, validate=False)
-    @products_ns.marshal_with(success_message_model)
+    @serialize_with(products_ns, success_message_model)
     @products_ns.response(404, 'No mapping found', error_model)
     @products_ns.response(500, 'Internal server error', error_model)
     def delete(self, product_id):
@@ -154,52 +185,36 @@ class ProductUnmapping(Resource):
 @products_ns.param('product_id', 'Product ID (string)')
 class ProductGroups(Resource):
     @products_ns.doc('list_product_groups')
-    @products_ns.marshal_list_with(telegram_group_model)
+    @cached_by_versions('products', 'telegram_groups', public=True)
+    @serialize_with(products_ns, telegram_group_model, as_list=True)
     def get(self, product_id):
         """List Telegram groups for a product"""
-        groups = TelegramGroupService.get_groups_by_product_id(product_id)
-        return telegram_groups_schema.dump(groups)
+        return list(ProductService.get_catalog().groups_by_product.get(product_id, ()))
 
 @products_ns.route('/<string:product_id>/members')
 @products_ns.param('product_id', 'Product ID (string)')
 class ProductMembers(Resource):
     @products_ns.doc('list_product_members')
-    @products_ns.marshal_list_with(member_model)
+    @serialize_with(products_ns, member_model, as_list=True)
+    @replica_reads
     def get(self, product_id):
         """List members for a product"""
-        def _serialize_member(sub):
-            return {
-                'subscription_id': sub.id,
-                'status': sub.status,
-                'subscription_expires_at': sub.subscription_expires_at,
-                'invite_link_url': sub.invite_link_url,
-                'invite_link_expires_at': sub.invite_link_expires_at,
-                'user': {
-                    'id': sub.user.id,
-                    'email': sub.user.email,
-                    'telegram_user_id': sub.user.telegram_user_id,
-                    'telegram_username': sub.user.telegram_username,
-                },
-                'product': {
-                    'id': sub.product.id,
-                    'name': sub.product.name,
-                    'description': sub.product.description,
-                },
-                'telegram_group': {
-                    'id': sub.telegram_group.id,
-                    'telegram_group_id': sub.telegram_group.telegram_group_id,
-                    'telegram_group_name': sub.telegram_group.telegram_group_name,
-                    'is_active': sub.telegram_group.is_active,
-                },
-            }
-        
-        q = (
-            Subscription.query.join(User).join(Product).outerjoin(TelegramGroup)
-            .filter(Subscription.product_id == product_id)
-            .filter(User.telegram_user_id.isnot(None))
-        )
-        subs = q.all()
-        return [_serialize_member(s) for s in subs]
+        return list(SubscriptionService.iter_members(product_id=product_id))
+
+@products_ns.route('/<string:product_id>/members/export')
+@products_ns.param('product_id', 'Product ID (string)')
+class ProductMembersExport(Resource):
+    @products_ns.doc('export_product_members')
+    @products_ns.param('format', 'Export format (ndjson or csv)', default='ndjson')
+    @products_ns.response(400, 'Bad request', error_model)
+    @replica_reads
+    def get(self, product_id):
+        """Stream members for a product as NDJSON or CSV"""
+        export_format = request.args.get('format', 'ndjson')
+        if export_format not in EXPORT_FORMATS:
+            return {'message': 'format must be one of: ndjson, csv'}, 400
+        rows = SubscriptionService.iter_members(product_id=product_id)
+        return export_response(rows, export_format, f'product-{product_id}-members')
 
 # Groups namespace
 groups_ns = Namespace('groups', description='Telegram group operations')
@@ -207,61 +222,93 @@ groups_ns = Namespace('groups', description='Telegram group operations')
 @groups_ns.route('')
 class GroupList(Resource):
     @groups_ns.doc('list_groups')
-    @groups_ns.marshal_list_with(telegram_group_model)
+    @cached_by_versions('products', 'telegram_groups')
+    @serialize_with(groups_ns, telegram_group_model, as_list=True)
     def get(self):
         """Get all Telegram groups"""
         groups = TelegramGroupService.get_all_groups()
-        return telegram_groups_schema.dump(groups)
+        return groups
 
 @groups_ns.route('/unmapped')
 class UnmappedGroups(Resource):
     @groups_ns.doc('list_unmapped_groups')
-    @groups_ns.marshal_list_with(telegram_group_model)
+    @cached_by_versions('products', 'telegram_groups')
+    @serialize_with(groups_ns, telegram_group_model, as_list=True)
     def get(self):
         """Get unmapped Telegram groups"""
         groups = TelegramGroupService.get_unmapped_groups()
-        return telegram_groups_schema.dump(groups)
+        return groups
+
+@groups_ns.route('/verify')
+class GroupVerify(Resource):
+    @groups_ns.doc('verify_groups')
+    @serialize_with(groups_ns, group_verify_model)
+    @groups_ns.response(503, 'Telegram bot not configured', error_model)
+    @groups_ns.response(500, 'Internal server error', error_model)
+    def post(self):
+        """Check every active group against Telegram now"""
+        try:
+            tg_bot = _get_tg_bot()
+            if not tg_bot or not tg_bot.bots:
+                return {'message': 'Telegram bot not configured'}, 503
+            return tg_bot.verify_groups(
+                batch_size=current_app.config['GROUP_VERIFY_BATCH_SIZE']
+            )
+        except Exception as e:
+            logger.exception('Error verifying groups')
+            return {'message': str(e)}, 500
+
+@groups_ns.route('/<string:telegram_group_id>/bot')
+@groups_ns.param('telegram_group_id', 'Telegram group ID')
+class GroupBot(Resource):
+    @groups_ns.doc('assign_group_bot')
+    @groups_ns.expect(group_bot_assign_model)
+    @serialize_with(groups_ns, telegram_group_model)
+    @groups_ns.response(400, 'Bad request', error_model)
+    @groups_ns.response(404, 'Not found', error_model)
+    @groups_ns.response(500, 'Internal server error', error_model)
+    def put(self, telegram_group_id):
+        """Move a group to another bot in the pool"""
+        try:
+            data = request.get_json(force=True) or {}
+            bot_id = str(data.get('bot_id') or '')
+            tg_bot = _get_tg_bot()
+            if not tg_bot or bot_id not in tg_bot.bots:
+                return {'message': 'bot_id is not a configured pool bot'}, 400
+            if not tg_bot.bot_is_admin(int(telegram_group_id), bot_id):
+                return {'message': 'Bot must be an admin of the group with invite and ban rights'}, 400
+            group, error = TelegramGroupService.assign_bot(telegram_group_id, bot_id)
+            if error:
+                return {'message': error}, 404
+            return group
+        except Exception as e:
+            logger.exception('Error assigning group bot')
+            return {'message': str(e)}, 500
 
 @groups_ns.route('/<string:telegram_group_id>/members')
 @groups_ns.param('telegram_group_id', 'Telegram group ID')
 class GroupMembers(Resource):
     @groups_ns.doc('list_group_members')
-    @groups_ns.marshal_list_with(member_model)
+    @serialize_with(groups_ns, member_model, as_list=True)
+    @replica_reads
     def get(self, telegram_group_id):
         """List members for a Telegram group"""
-        def _serialize_member(sub):
-            return {
-                'subscription_id': sub.id,
-                'status': sub.status,
-                'subscription_expires_at': sub.subscription_expires_at,
-                'invite_link_url': sub.invite_link_url,
-                'invite_link_expires_at': sub.invite_link_expires_at,
-                'user': {
-                    'id': sub.user.id,
-                    'email': sub.user.email,
-                    'telegram_user_id': sub.user.telegram_user_id,
-                    'telegram_username': sub.user.telegram_username,
-                },
-                'product': {
-                    'id': sub.product.id,
-                    'name': sub.product.name,
-                    'description': sub.product.description,
-                },
-                'telegram_group': {
-                    'id': sub.telegram_group.id,
-                    'telegram_group_id': sub.telegram_group.telegram_group_id,
-                    'telegram_group_name': sub.telegram_group.telegram_group_name,
-                    'is_active': sub.telegram_group.is_active,
-                },
-            }
-        
-        q = (
-            Subscription.query.join(User).join(Product).outerjoin(TelegramGroup)
-            .filter(TelegramGroup.telegram_group_id == str(telegram_group_id))
-            .filter(User.telegram_user_id.isnot(None))
-        )
-        subs = q.all()
-        return [_serialize_member(s) for s in subs]
+        return list(SubscriptionService.iter_members(telegram_group_id=telegram_group_id))
+
+@groups_ns.route('/<string:telegram_group_id>/members/export')
+@groups_ns.param('telegram_group_id', 'Telegram group ID')
+class GroupMembersExport(Resource):
+    @groups_ns.doc('export_group_members')
+    @groups_ns.param('format', 'Export format (ndjson or csv)', default='ndjson')
+    @groups_ns.response(400, 'Bad request', error_model)
+    @replica_reads
+    def get(self, telegram_group_id):
+        """Stream members for a Telegram group as NDJSON or CSV"""
+        export_format = request.args.get('format', 'ndjson')
+        if export_format not in EXPORT_FORMATS:
+            return {'message': 'format must be one of: ndjson, csv'}, 400
+        rows = SubscriptionService.iter_members(telegram_group_id=telegram_group_id)
+        return export_response(rows, export_format, f'group-{telegram_group_id}-members')
 
 # Subscriptions namespace
 subscriptions_ns = Namespace('subscriptions', description='Subscription management')
@@ -269,7 +316,7 @@ subscriptions_ns = Namespace('subscriptions', description='Subscription manageme
 @subscriptions_ns.route('')
 class SubscriptionList(Resource):
     @subscriptions_ns.doc('list_subscriptions')
-    @subscriptions_ns.marshal_with(paginated_subscriptions_model)
+    @serialize_with(subscriptions_ns, paginated_subscriptions_model)
     @subscriptions_ns.param('page', 'Page number', type='integer', default=1)
     @subscriptions_ns.param('per_page', 'Items per page', type='integer', default=10)
     @subscriptions_ns.param('sort_by', 'Sort field', default='created_at')
@@ -278,6 +325,8 @@ class SubscriptionList(Resource):
     @subscriptions_ns.param('status', 'Filter by status')
     @subscriptions_ns.param('product_id', 'Filter by product ID')
     @subscriptions_ns.param('user_id', 'Filter by user ID', type='integer')
+    @subscriptions_ns.param('include_archived', 'Also list archived subscriptions', type='boolean', default=False)
+    @replica_reads
     def get(self):
         """Get all subscriptions (admin only)"""
         page = request.args.get("page", 1, type=int)
@@ -288,6 +337,7 @@ class SubscriptionList(Resource):
         status = request.args.get("status")
         product_id = request.args.get("product_id")
         user_id = request.args.get("user_id", type=int)
+        include_archived = _include_archived()
         
         per_page = min(per_page, 100)
         
@@ -299,11 +349,12 @@ class SubscriptionList(Resource):
             search=search,
             status=status,
             product_id=product_id,
-            user_id=user_id
+            user_id=user_id,
+            include_archived=include_archived
         )
         
         return {
-            "items": subscriptions_schema.dump(result["items"]),
+            "items": result["items"],
             "total": result["total"],
             "page": result["page"],
             "per_page": result["per_page"],
@@ -312,9 +363,11 @@ class SubscriptionList(Resource):
 
     @subscriptions_ns.doc('cancel_subscription_by_email')
     @subscriptions_ns.expect(subscription_request_model)
-    @subscriptions_ns.marshal_with(success_message_model)
+    @admission_controlled()
+    @serialize_with(subscriptions_ns, success_message_model)
     @subscriptions_ns.response(400, 'Bad request', error_model)
     @subscriptions_ns.response(500, 'Internal server error', error_model)
+    @subscriptions_ns.response(503, 'Server busy, retry later', error_model)
     def delete(self):
         """Cancel subscription by email and product ID"""
         try:
@@ -339,9 +392,11 @@ class SubscriptionList(Resource):
 @subscriptions_ns.param('subscription_id', 'Subscription ID')
 class SubscriptionCancel(Resource):
     @subscriptions_ns.doc('cancel_subscription')
-    @subscriptions_ns.marshal_with(success_message_model)
+    @admission_controlled()
+    @serialize_with(subscriptions_ns, success_message_model)
     @subscriptions_ns.response(400, 'Bad request', error_model)
     @subscriptions_ns.response(500, 'Internal server error', error_model)
+    @subscriptions_ns.response(503, 'Server busy, retry later', error_model)
     def post(self, subscription_id):
         """Cancel a specific subscription"""
         try:
@@ -357,16 +412,243 @@ class SubscriptionCancel(Resource):
             logging.exception("Error cancelling subscription")
             return {"message": str(e)}, 500
 
+def _subscription_pairs(data):
+    """Return ([(email, product_id)], error) from a bulk request body"""
+    items = data.get('items')
+    if not isinstance(items, list) or not items:
+        return None, 'items must be a non-empty list'
+    limit = current_app.config['BULK_MAX_ITEMS']
+    if len(items) > limit:
+        return None, f'At most {limit} items per request'
+    pairs = []
+    for item in items:
+        if not isinstance(item, dict) or not item.get('email') or not item.get('product_id'):
+            return None, 'Each item needs email and product_id'
+        pairs.append((item['email'], str(item['product_id'])))
+    return pairs, None
+
+@subscriptions_ns.route('/cancel/bulk')
+class SubscriptionBulkCancel(Resource):
+    @subscriptions_ns.doc('cancel_subscriptions_bulk')
+    @subscriptions_ns.expect(bulk_subscription_request_model)
+    @admission_controlled()
+    @serialize_with(subscriptions_ns, bulk_cancel_model)
+    @subscriptions_ns.response(400, 'Bad request', error_model)
+    @subscriptions_ns.response(500, 'Internal server error', error_model)
+    @subscriptions_ns.response(503, 'Server busy, retry later', error_model)
+    def post(self):
+        """Cancel subscriptions for a list of (email, product_id) pairs"""
+        try:
+            pairs, error = _subscription_pairs(request.get_json(silent=True) or {})
+            if error:
+                return {'message': error}, 400
+            return SubscriptionService.cancel_subscriptions_bulk(pairs)
+        except Exception as e:
+            logging.exception('Error cancelling subscriptions in bulk')
+            return {'message': str(e)}, 500
+
+def _renewal_period(data):
+    """Return (extend_days, expires_at, error) from a renewal request body"""
+    extend_days = data.get('extend_days')
+    expiration = data.get('expiration_datetime')
+    if (extend_days is None) == (expiration is None):
+        return None, None, 'Exactly one of extend_days or expiration_datetime is required'
+    if extend_days is not None:
+        try:
+            extend_days = float(extend_days)
+        except (TypeError, ValueError):
+            return None, None, 'extend_days must be a number'
+        if extend_days <= 0:
+            return None, None, 'extend_days must be positive'
+        return extend_days, None, None
+    try:
+        expires_at = datetime.fromisoformat(str(expiration).replace('Z', '+00:00'))
+    except ValueError:
+        return None, None, 'expiration_datetime must be an ISO 8601 datetime'
+    if expires_at.tzinfo is not None:
+        expires_at = expires_at.astimezone(timezone.utc).replace(tzinfo=None)
+    if expires_at <= datetime.utcnow():
+        return None, None, 'expiration_datetime must be in the future'
+    return None, expires_at, None
+
+@subscriptions_ns.route('/renew')
+class SubscriptionRenew(Resource):
+    @subscriptions_ns.doc('renew_subscription', **IDEMPOTENCY_DOC)
+    @subscriptions_ns.expect(renew_request_model)
+    @idempotent('renew')
+    @serialize_with(subscriptions_ns, renewal_model)
+    @subscriptions_ns.response(400, 'Bad request', error_model)
+    @subscriptions_ns.response(404, 'Not found', error_model)
+    @subscriptions_ns.response(500, 'Internal server error', error_model)
+    def post(self):
+        """Extend a live subscription; the member stays in the group"""
+        try:
+            data = request.get_json(silent=True) or {}
+            if not data.get('email') or not data.get('product_id'):
+                return {'message': 'email and product_id are required'}, 400
+            extend_days, expires_at, error = _renewal_period(data)
+            if error:
+                return {'message': error}, 400
+
+            renewal, error = SubscriptionService.renew_subscription(
+                data['email'], str(data['product_id']), extend_days, expires_at
+            )
+            if error:
+                return {'message': error}, 404
+
+            subscription_id, email, product_id, previous_expires_at, new_expires_at = renewal
+            return {
+                'subscription_id': subscription_id,
+                'email': email,
+                'product_id': product_id,
+                'previous_expires_at': previous_expires_at,
+                'subscription_expires_at': new_expires_at,
+            }
+        except Exception as e:
+            logging.exception('Error renewing subscription')
+            return {'message': str(e)}, 500
+
+@subscriptions_ns.route('/renew/bulk')
+class SubscriptionBulkRenew(Resource):
+    @subscriptions_ns.doc('renew_subscriptions_bulk', **IDEMPOTENCY_DOC)
+    @subscriptions_ns.expect(bulk_renew_request_model)
+    @idempotent('renew_bulk')
+    @serialize_with(subscriptions_ns, bulk_renew_model)
+    @subscriptions_ns.response(400, 'Bad request', error_model)
+    @subscriptions_ns.response(500, 'Internal server error', error_model)
+    def post(self):
+        """Extend live subscriptions for a list of (email, product_id) pairs"""
+        try:
+            data = request.get_json(silent=True) or {}
+            pairs, error = _subscription_pairs(data)
+            if error:
+                return {'message': error}, 400
+            extend_days, expires_at, error = _renewal_period(data)
+            if error:
+                return {'message': error}, 400
+            return SubscriptionService.renew_subscriptions_bulk(pairs, extend_days, expires_at)
+        except Exception as e:
+            logging.exception('Error renewing subscriptions in bulk')
+            return {'message': str(e)}, 500
+
+@subscriptions_ns.route('/<int:subscription_id>/events')
+@subscriptions_ns.param('subscription_id', 'Subscription ID')
+class SubscriptionEvents(Resource):
+    @subscriptions_ns.doc('list_subscription_events')
+    @serialize_with(subscriptions_ns, subscription_event_model, as_list=True)
+    def get(self, subscription_id):
+        """Get the audit timeline of a subscription"""
+        events = SubscriptionEventService.get_timeline(subscription_id)
+        return events
+
+@subscriptions_ns.route('/export')
+class SubscriptionExport(Resource):
+    @subscriptions_ns.doc('export_subscriptions')
+    @subscriptions_ns.param('status', 'Filter by status')
+    @subscriptions_ns.param('product_id', 'Filter by product ID')
+    @subscriptions_ns.param('user_id', 'Filter by user ID', type='integer')
+    @subscriptions_ns.param('include_archived', 'Also export archived subscriptions', type='boolean', default=False)
+    @subscriptions_ns.param('format', 'Export format (ndjson or csv)', default='ndjson')
+    @subscriptions_ns.response(400, 'Bad request', error_model)
+    @replica_reads
+    def get(self):
+        """Stream all subscriptions as NDJSON or CSV (admin only)"""
+        export_format = request.args.get('format', 'ndjson')
+        if export_format not in EXPORT_FORMATS:
+            return {'message': 'format must be one of: ndjson, csv'}, 400
+        rows = SubscriptionService.iter_subscriptions(
+            status=request.args.get('status'),
+            product_id=request.args.get('product_id'),
+            user_id=request.args.get('user_id', type=int),
+            include_archived=_include_archived(),
+        )
+        return export_response(rows, export_format, 'subscriptions')
+
+@subscriptions_ns.route('/archive')
+class SubscriptionArchiveRun(Resource):
+    @subscriptions_ns.doc('archive_subscriptions')
+    @subscriptions_ns.expect(subscription_archive_request_model)
+    @serialize_with(subscriptions_ns, subscription_archive_model)
+    @subscriptions_ns.response(500, 'Internal server error', error_model)
+    def post(self):
+        """Move old expired and cancelled subscriptions to the archive now"""
+        try:
+            data = request.get_json(silent=True) or {}
+            config = current_app.config
+            archived = SubscriptionArchiveService.archive(
+                older_than_days=float(
+                    data.get('older_than_days') or config['SUBSCRIPTION_ARCHIVE_AFTER_DAYS']
+                ),
+                batch_size=config['SUBSCRIPTION_ARCHIVE_BATCH_SIZE'],
+                max_batches=data.get('max_batches'),
+            )
+            return {'archived': archived}
+        except Exception as e:
+            logging.exception('Error archiving subscriptions')
+            return {'message': str(e)}, 500
+
+@subscriptions_ns.route('/pending/reap')
+class PendingJoinReap(Resource):
+    @subscriptions_ns.doc('reap_pending_subscriptions')
+    @subscriptions_ns.expect(pending_reap_request_model)
+    @serialize_with(subscriptions_ns, pending_reap_model)
+    @subscriptions_ns.response(500, 'Internal server error', error_model)
+    def post(self):
+        """Revoke unused invite links and expire subscriptions that never joined, now"""
+        try:
+            data = request.get_json(silent=True) or {}
+            config = current_app.config
+            return PendingJoinService.reap(
+                ttl_hours=float(data.get('ttl_hours') or config['PENDING_JOIN_TTL_HOURS']),
+                batch_size=config['PENDING_REAPER_BATCH_SIZE'],
+                concurrency=config['PENDING_REAPER_CONCURRENCY'],
+                max_batches=data.get('max_batches'),
+            )
+        except Exception as e:
+            logging.exception('Error reaping pending subscriptions')
+            return {'message': str(e)}, 500
+
+@subscriptions_ns.route('/stats')
+class SubscriptionStats(Resource):
+    @subscriptions_ns.doc('membership_stats')
+    @serialize_with(subscriptions_ns, membership_stats_model)
+    @subscriptions_ns.param('product_id', 'Filter by product ID')
+    @subscriptions_ns.param('telegram_group_id', 'Filter by Telegram group ID')
+    @replica_reads
+    def get(self):
+        """Subscription counts by status per product and per group"""
+        return MembershipStatsService.get_stats(
+            product_id=request.args.get('product_id'),
+            telegram_group_id=request.args.get('telegram_group_id'),
+        )
+
+@subscriptions_ns.route('/stats/rebuild')
+class SubscriptionStatsRebuild(Resource):
+    @subscriptions_ns.doc('rebuild_membership_stats')
+    @serialize_with(subscriptions_ns, success_message_model)
+    @subscriptions_ns.response(500, 'Internal server error', error_model)
+    def post(self):
+        """Rebuild subscription counters from scratch (admin only)"""
+        try:
+            MembershipStatsService.rebuild()
+            return {'message': 'Membership counters rebuilt successfully'}
+        except Exception as e:
+            logging.exception('Error rebuilding membership counters')
+            return {'message': str(e)}, 500
+
 # Subscribe namespace (separate for public access)
 subscribe_ns = Namespace('subscribe', description='Public subscription creation')
 
 @subscribe_ns.route('')
 class Subscribe(Resource):
-    @subscribe_ns.doc('create_subscription')
+    @subscribe_ns.doc('create_subscription', **IDEMPOTENCY_DOC)
     @subscribe_ns.expect(subscription_request_model)
-    @subscribe_ns.marshal_with(subscription_response_model, code=201)
+    @idempotent('subscribe')
+    @admission_controlled()
+    @serialize_with(subscribe_ns, subscription_response_model, code=201)
     @subscribe_ns.response(400, 'Bad request', error_model)
     @subscribe_ns.response(500, 'Internal server error', error_model)
+    @subscribe_ns.response(503, 'Server busy or Telegram unavailable, retry later', error_model)
     def post(self):
         """Create a new subscription"""
         try:
@@ -384,6 +666,13 @@ class Subscribe(Resource):
                     )
                 )
 
+            if error == INVITE_LINK_FAILED:
+                # Telegram is failing, not the request: a 5xx releases the
+                # idempotency key so the retry actually tries again
+                tg_bot = _get_tg_bot()
+                blocked = tg_bot.circuit_blocked("create_invite_link") if tg_bot else None
+                retry_after = max(1, round(blocked[1])) if blocked else 5
+                return {"message": error}, 503, {"Retry-After": str(retry_after)}
             if error:
                 return {"message": error}, 400
 
@@ -407,7 +696,8 @@ users_ns = Namespace('users', description='User management')
 @users_ns.route('')
 class UserList(Resource):
     @users_ns.doc('list_users')
-    @users_ns.marshal_list_with(user_model)
+    @serialize_with(users_ns, user_model, as_list=True)
+    @replica_reads
     def get(self):
         """Get all users"""
         users = User.query.all()
@@ -419,73 +709,153 @@ class UserList(Resource):
             })
         return result
 
+@users_ns.route('/lookup')
+class UserLookup(Resource):
+    @users_ns.doc('lookup_users')
+    @serialize_with(users_ns, user_lookup_model)
+    @users_ns.param('q', 'Prefix of the email or Telegram username')
+    @users_ns.param('limit', 'Maximum number of users (1-100)', type='integer', default=20)
+    @users_ns.param('cursor', 'next_cursor from the previous page')
+    def get(self):
+        """Search users by email/Telegram username prefix, one page at a time"""
+        limit = max(1, min(request.args.get('limit', 20, type=int), 100))
+        users, next_cursor = UserService.lookup_users(
+            query=request.args.get('q'),
+            limit=limit,
+            cursor=request.args.get('cursor'),
+        )
+        return {'items': users, 'next_cursor': next_cursor}
+
+def _joined_users_filters():
+    statuses = None
+    status_param = request.args.get('status')
+    if status_param:
+        statuses = [s.strip() for s in status_param.split(',') if s.strip()] or None
+    return {
+        'product_id': request.args.get('product_id'),
+        'telegram_group_id': request.args.get('telegram_group_id'),
+        'statuses': statuses,
+        'include_archived': _include_archived(),
+    }
+
 @users_ns.route('/joined')
 class JoinedUsers(Resource):
     @users_ns.doc('list_joined_users')
-    @users_ns.marshal_list_with(member_model)
+    @serialize_with(users_ns, member_model, as_list=True)
     @users_ns.param('product_id', 'Filter by product ID')
     @users_ns.param('telegram_group_id', 'Filter by Telegram group ID')
     @users_ns.param('status', 'Filter by status (comma-separated)')
+    @users_ns.param('include_archived', 'Also list archived subscriptions', type='boolean', default=False)
+    @replica_reads
     def get(self):
         """List users who joined via invite link with context"""
-        def _serialize_member(sub):
-            return {
-                'subscription_id': sub.id,
-                'status': sub.status,
-                'subscription_expires_at': sub.subscription_expires_at,
-                'invite_link_url': sub.invite_link_url,
-                'invite_link_expires_at': sub.invite_link_expires_at,
-                'user': {
-                    'id': sub.user.id,
-                    'email': sub.user.email,
-                    'telegram_user_id': sub.user.telegram_user_id,
-                    'telegram_username': sub.user.telegram_username,
-                },
-                'product': {
-                    'id': sub.product.id,
-                    'name': sub.product.name,
-                    'description': sub.product.description,
-                },
-                'telegram_group': {
-                    'id': sub.telegram_group.id,
-                    'telegram_group_id': sub.telegram_group.telegram_group_id,
-                    'telegram_group_name': sub.telegram_group.telegram_group_name,
-                    'is_active': sub.telegram_group.is_active,
-                },
-            }
-        
-        product_id = request.args.get('product_id')
-        telegram_group_id = request.args.get('telegram_group_id')
-        status_param = request.args.get('status')
+        return list(SubscriptionService.iter_members(**_joined_users_filters()))
 
-        q = Subscription.query.join(User).join(Product).outerjoin(TelegramGroup)
-        q = q.filter(User.telegram_user_id.isnot(None))
+@users_ns.route('/joined/export')
+class JoinedUsersExport(Resource):
+    @users_ns.doc('export_joined_users')
+    @users_ns.param('product_id', 'Filter by product ID')
+    @users_ns.param('telegram_group_id', 'Filter by Telegram group ID')
+    @users_ns.param('status', 'Filter by status (comma-separated)')
+    @users_ns.param('include_archived', 'Also export archived subscriptions', type='boolean', default=False)
+    @users_ns.param('format', 'Export format (ndjson or csv)', default='ndjson')
+    @users_ns.response(400, 'Bad request', error_model)
+    @replica_reads
+    def get(self):
+        """Stream users who joined via invite link as NDJSON or CSV"""
+        export_format = request.args.get('format', 'ndjson')
+        if export_format not in EXPORT_FORMATS:
+            return {'message': 'format must be one of: ndjson, csv'}, 400
+        rows = SubscriptionService.iter_members(**_joined_users_filters())
+        return export_response(rows, export_format, 'joined-users')
 
-        if product_id:
-            q = q.filter(Subscription.product_id == product_id)
+# Telegram namespace
+telegram_ns = Namespace('telegram', description='Telegram bot operations')
 
-        if telegram_group_id:
-            q = q.filter(TelegramGroup.telegram_group_id == str(telegram_group_id))
+@telegram_ns.route('/admission')
+class TelegramAdmission(Resource):
+    @telegram_ns.doc('telegram_admission_stats')
+    @serialize_with(telegram_ns, admission_stats_model)
+    def get(self):
+        """Admission control metrics for Telegram-bound endpoints"""
+        return telegram_admission.stats()
 
-        if status_param:
-            statuses = [s.strip() for s in status_param.split(',') if s.strip()]
-            if statuses:
-                q = q.filter(Subscription.status.in_(statuses))
+@telegram_ns.route('/circuits')
+class TelegramCircuits(Resource):
+    @telegram_ns.doc('telegram_circuit_breakers')
+    @serialize_with(telegram_ns, circuit_breaker_model, as_list=True)
+    def get(self):
+        """State of the Bot API circuit breakers"""
+        tg_bot = _get_tg_bot()
+        return tg_bot.breakers.snapshot() if tg_bot else []
 
-        subs = q.all()
-        return [_serialize_member(s) for s in subs]
+@telegram_ns.route('/lanes')
+class TelegramLanes(Resource):
+    @telegram_ns.doc('telegram_lane_stats')
+    @serialize_with(telegram_ns, telegram_lanes_model)
+    def get(self):
+        """Per-lane queue depth and latency of Bot API calls"""
+        tg_bot = _get_tg_bot()
+        return tg_bot.lanes.stats() if tg_bot else None
 
-# Telegram namespace
-telegram_ns = Namespace('telegram', description='Telegram bot operations')
+@telegram_ns.route('/bots')
+class TelegramBots(Resource):
+    @telegram_ns.doc('list_pool_bots')
+    @serialize_with(telegram_ns, bot_pool_model, as_list=True)
+    def get(self):
+        """Bots in the pool with their group counts and load"""
+        tg_bot = _get_tg_bot()
+        return tg_bot.get_pool_status() if tg_bot else []
+
+@telegram_ns.route('/bots/rebalance')
+class TelegramBotsRebalance(Resource):
+    @telegram_ns.doc('rebalance_pool_bots')
+    @telegram_ns.expect(bot_rebalance_request_model)
+    @serialize_with(telegram_ns, bot_rebalance_model)
+    @telegram_ns.response(500, 'Internal server error', error_model)
+    def post(self):
+        """Plan (or apply) moving groups between bots to even out load"""
+        try:
+            data = request.get_json(silent=True) or {}
+            tg_bot = _get_tg_bot()
+            if not tg_bot:
+                return {'moves': [], 'applied': 0, 'skipped': 0}
+            return tg_bot.rebalance_groups(apply=bool(data.get('apply')))
+        except Exception as e:
+            logger.exception('Error rebalancing bots')
+            return {'message': str(e)}, 500
+
+@telegram_ns.route('/membership/reconcile')
+class TelegramMembershipReconcile(Resource):
+    @telegram_ns.doc('reconcile_group_membership')
+    @telegram_ns.expect(membership_reconcile_request_model)
+    @serialize_with(telegram_ns, membership_reconcile_model)
+    @telegram_ns.response(500, 'Internal server error', error_model)
+    def post(self):
+        """Diff group rosters against subscriptions, optionally acting on the drift"""
+        try:
+            data = request.get_json(silent=True) or {}
+            config = current_app.config
+            return GroupMemberService.reconcile(
+                dry_run=not data.get('apply'),
+                kick_intruders=config['MEMBERSHIP_RECONCILE_KICK_INTRUDERS'],
+                batch_size=config['MEMBERSHIP_RECONCILE_BATCH_SIZE'],
+                grace_seconds=config['MEMBERSHIP_RECONCILE_GRACE_SECONDS'],
+            )
+        except Exception as e:
+            logger.exception('Error reconciling group membership')
+            return {'message': str(e)}, 500
 
 @telegram_ns.route('/kick-user')
 class KickUser(Resource):
     @telegram_ns.doc('kick_user')
     @telegram_ns.expect(kick_user_model)
-    @telegram_ns.marshal_with(telegram_response_model)
+    @admission_controlled()
+    @serialize_with(telegram_ns, telegram_response_model)
     @telegram_ns.response(400, 'Bad request', error_model)
     @telegram_ns.response(404, 'Not found', error_model)
     @telegram_ns.response(500, 'Internal server error', error_model)
+    @telegram_ns.response(503, 'Server busy, retry later', error_model)
     def post(self):
         """Kick a user from a Telegram group"""
         try:
@@ -499,7 +869,7 @@ class KickUser(Resource):
 
             chat_id = None
             if product_id:
-                product = Product.query.get(product_id)
+                product = ProductService.get_product_by_id(product_id)
                 if not product or not product.telegram_groups:
                     return {'message': 'Product not found or not mapped to any Telegram groups'}, 404
                 # Use first active group
@@ -518,6 +888,7 @@ class KickUser(Resource):
             except ValueError:
                 return {'message': 'telegram_user_id must be numeric'}, 400
 
+            tg_bot = _get_tg_bot()
             if tg_bot:
                 success, message = tg_bot.remove_user(chat_id, user_id)
             else:
@@ -532,10 +903,12 @@ class KickUser(Resource):
 class KickByEmail(Resource):
     @telegram_ns.doc('kick_by_email')
     @telegram_ns.expect(kick_by_email_model)
-    @telegram_ns.marshal_with(telegram_response_model)
+    @admission_controlled()
+    @serialize_with(telegram_ns, telegram_response_model)
     @telegram_ns.response(400, 'Bad request', error_model)
     @telegram_ns.response(404, 'Not found', error_model)
     @telegram_ns.response(500, 'Internal server error', error_model)
+    @telegram_ns.response(503, 'Server busy, retry later', error_model)
     def post(self):
         """Kick a user from a Telegram group by email"""
         try:
@@ -559,7 +932,7 @@ class KickByEmail(Resource):
             if not subscription:
                 return {'message': 'Active/pending subscription not found for user and product'}, 404
 
-            product = Product.query.get(product_id)
+            product = ProductService.get_product_by_id(product_id)
             if not product or not product.telegram_groups:
                 return {'message': 'Product not mapped to any Telegram groups'}, 404
             
@@ -571,6 +944,7 @@ class KickByEmail(Resource):
             chat_id = int(str(telegram_group.telegram_group_id))
             user_id = int(str(user.telegram_user_id))
 
+            tg_bot = _get_tg_bot()
             if tg_bot:
                 success, message = tg_bot.remove_user(chat_id, user_id)
             else:
@@ -585,10 +959,12 @@ class KickByEmail(Resource):
 class RegenerateInvite(Resource):
     @telegram_ns.doc('regenerate_invite')
     @telegram_ns.expect(regenerate_invite_model)
-    @telegram_ns.marshal_with(telegram_response_model)
+    @admission_controlled()
+    @serialize_with(telegram_ns, telegram_response_model)
     @telegram_ns.response(400, 'Bad request', error_model)
     @telegram_ns.response(404, 'Not found', error_model)
     @telegram_ns.response(500, 'Internal server error', error_model)
+    @telegram_ns.response(503, 'Server busy, retry later', error_model)
     def post(self):
         """Regenerate an invite link for a Telegram group"""
         try:
@@ -600,7 +976,7 @@ class RegenerateInvite(Resource):
 
             chat_id = None
             if product_id:
-                product = Product.query.get(product_id)
+                product = ProductService.get_product_by_id(product_id)
                 if not product or not product.telegram_groups:
                     return {'message': 'Product not found or not mapped to any Telegram groups'}, 404
                 # Use first active group
@@ -614,6 +990,7 @@ class RegenerateInvite(Resource):
             else:
                 return {'message': 'Either product_id or telegram_group_id is required'}, 400
 
+            tg_bot = _get_tg_bot()
             if tg_bot:
                 success, msg, invite_link = tg_bot.create_invite_link(chat_id, token)
             else:
@@ -630,10 +1007,12 @@ class RegenerateInvite(Resource):
 class RegenerateInviteLink(Resource):
     @subscriptions_ns.doc('regenerate_invite_link')
     @subscriptions_ns.expect(regenerate_user_invite_model)
-    @subscriptions_ns.marshal_with(invite_link_response_model)
+    @admission_controlled()
+    @serialize_with(subscriptions_ns, invite_link_response_model)
     @subscriptions_ns.response(400, 'Bad request', error_model)
     @subscriptions_ns.response(404, 'Not found', error_model)
     @subscriptions_ns.response(500, 'Internal server error', error_model)
+    @subscriptions_ns.response(503, 'Server busy, retry later', error_model)
     def post(self):
         """Regenerate invite link for a subscription"""
         try:
@@ -669,5 +1048,38 @@ class RegenerateInviteLink(Resource):
             logging.exception('Error regenerating invite link')
             return {'message': str(e)}, 500
 
+@subscriptions_ns.route('/regenerate-invite/bulk')
+class RegenerateInviteLinksBulk(Resource):
+    @subscriptions_ns.doc('regenerate_invite_links_bulk', **IDEMPOTENCY_DOC)
+    @subscriptions_ns.expect(bulk_subscription_request_model)
+    @idempotent('regenerate_invite_bulk')
+    @admission_controlled()
+    @serialize_with(subscriptions_ns, bulk_regenerate_model)
+    @subscriptions_ns.response(400, 'Bad request', error_model)
+    @subscriptions_ns.response(500, 'Internal server error', error_model)
+    @subscriptions_ns.response(503, 'Server busy, retry later', error_model)
+    def post(self):
+        """Issue new invite links for a list of (email, product_id) pairs"""
+        try:
+            pairs, error = _subscription_pairs(request.get_json(silent=True) or {})
+            if error:
+                return {'message': error}, 400
+            return SubscriptionService.regenerate_invite_links_bulk(pairs)
+        except Exception as e:
+            logging.exception('Error regenerating invite links in bulk')
+            return {'message': str(e)}, 500
+
+# Database namespace
+database_ns = Namespace('database', description='Database connection pools')
+
+@database_ns.route('/pools')
+class DatabasePools(Resource):
+    @database_ns.doc('database_pools')
+    @serialize_with(database_ns, db_pool_model, as_list=True)
+    def get(self):
+        """Connection pool occupancy and checkout waits for this worker"""
+        from app.db_pool import pool_stats
+        return pool_stats(current_app.extensions['sqlalchemy'].engines)
+
 # Export all namespaces
-__all__ = ['products_ns', 'groups_ns', 'subscriptions_ns', 'users_ns', 'telegram_ns', 'subscribe_ns']
\ No newline at end of file
+__all__ = ['products_ns', 'groups_ns', 'subscriptions_ns', 'users_ns', 'telegram_ns', 'subscribe_ns', 'database_ns']
\ No newline at end of file
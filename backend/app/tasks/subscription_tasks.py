@@ -1,29 +1,60 @@
 import logging
-from datetime import datetime
-from apscheduler.schedulers.background import BackgroundScheduler
-# Import services within functions to avoid circular imports
-
-# Configure logging
-logging.basicConfig(
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s", level=logging.INFO
-)
+import threading
+import time
+from datetime import datetime, timedelta
+# Import services and apscheduler within functions to avoid circular imports
+# and to keep CLI/migration startup free of scheduler imports
+
 logger = logging.getLogger(__name__)
 
 # Global scheduler instance
 scheduler = None
+flask_app = None
+
+# Jobs currently running, so shutdown can wait for them
+_running_jobs = 0
+_jobs_idle = threading.Condition()
+
+
+def _with_app_context(func, **kwargs):
+    """Run a scheduled job inside the Flask app context, on the background pool"""
+    from app.db_pool import db_component
+
+    def job():
+        global _running_jobs
+        with _jobs_idle:
+            _running_jobs += 1
+        try:
+            with flask_app.app_context(), db_component("background"):
+                return func(**kwargs)
+        finally:
+            with _jobs_idle:
+                _running_jobs -= 1
+                _jobs_idle.notify_all()
 
+    job.__name__ = func.__name__
+    return job
 
-def check_expired_subscriptions():
-    """Check for expired subscriptions and remove users from groups."""
+
+def check_expired_subscriptions(lookback_days=None):
+    """Check for expired subscriptions and remove users from groups.
+
+    With ``lookback_days`` only subscriptions that expired within that window
+    are considered, which keeps the scan to the latest partitions.
+    """
     logger.info("Checking for expired subscriptions...")
 
     try:
         # Import services here to avoid circular imports
         from app.services.subscription_service import SubscriptionService
+        from app.services.subscription_event_service import SubscriptionEventService
         from app.services.telegram import tg_bot
         
         # Get all expired subscriptions
-        expired_subscriptions = SubscriptionService.get_expired_subscriptions()
+        since = None
+        if lookback_days is not None:
+            since = datetime.utcnow() - timedelta(days=lookback_days)
+        expired_subscriptions = SubscriptionService.get_expired_subscriptions(since)
 
         for subscription in expired_subscriptions:
             logger.info(f"Processing expired subscription: {subscription.id}")
@@ -35,10 +66,39 @@ def check_expired_subscriptions():
                 )
                 continue
 
+            # The batch was loaded up front; skip anything renewed since
+            if not SubscriptionService.is_still_expired(subscription.id):
+                logger.info(f"Subscription {subscription.id} was renewed, not removing")
+                continue
+
+            chat_id = subscription.telegram_group.telegram_group_id
+            blocked = tg_bot.circuit_blocked("remove_user", chat_id)
+            if blocked:
+                scope, retry_after = blocked
+                if scope == "chat":
+                    logger.warning(
+                        f"Circuit open for group {chat_id}, skipping subscription {subscription.id}"
+                    )
+                    continue
+                # Telegram is failing as a whole: stop here instead of timing
+                # out on every remaining subscription, and pick up once the
+                # breaker allows a probe again
+                _schedule_sweep_resume(retry_after)
+                return
+
             # Remove user from the Telegram group
+            # Sweep kicks yield to invites and approvals for buyers
             success, message = tg_bot.remove_user(
                 subscription.telegram_group.telegram_group_id,
                 subscription.user.telegram_user_id,
+                lane="bulk",
+            )
+            SubscriptionEventService.record(
+                subscription.id,
+                "kicked" if success else "kick_failed",
+                subscription.user.telegram_user_id,
+                reason="expired",
+                message=message,
             )
 
             if success:
@@ -57,25 +117,236 @@ def check_expired_subscriptions():
         logger.error(f"Error checking expired subscriptions: {e}")
 
 
-def init_scheduler():
+def _schedule_sweep_resume(retry_after):
+    """Re-run the expiry sweep once the Telegram circuit allows a probe."""
+    run_date = datetime.now() + timedelta(seconds=retry_after + 1)
+    logger.warning(
+        f"Telegram API circuit open, pausing expiry sweep until {run_date:%H:%M:%S}"
+    )
+    if scheduler:
+        scheduler.add_job(
+            _with_app_context(check_expired_subscriptions),
+            "date",
+            run_date=run_date,
+            id="expiry_sweep_resume",
+            replace_existing=True,
+        )
+
+
+def ensure_event_partitions():
+    """Create upcoming monthly partitions for the subscription audit log."""
+    try:
+        from app.services.subscription_event_service import SubscriptionEventService
+
+        partitions = SubscriptionEventService.ensure_partitions()
+        if partitions:
+            logger.info(f"Subscription event partitions ready: {', '.join(partitions)}")
+    except Exception as e:
+        logger.error(f"Error creating subscription event partitions: {e}")
+
+
+def ensure_subscription_partitions():
+    """Create upcoming monthly partitions for the subscriptions table."""
+    try:
+        from app.services.subscription_partition_service import (
+            SubscriptionPartitionService,
+        )
+
+        partitions = SubscriptionPartitionService.ensure_partitions(
+            flask_app.config["SUBSCRIPTION_PARTITION_MONTHS_AHEAD"]
+        )
+        if partitions:
+            logger.info(f"Subscription partitions created: {', '.join(partitions)}")
+    except Exception as e:
+        logger.error(f"Error creating subscription partitions: {e}")
+
+
+def reconcile_membership_counters():
+    """Rebuild the materialized membership counters from subscriptions."""
+    try:
+        from app.services.membership_stats_service import MembershipStatsService
+
+        MembershipStatsService.rebuild()
+        logger.info("Membership counters reconciled")
+    except Exception as e:
+        logger.error(f"Error reconciling membership counters: {e}")
+
+
+def reconcile_group_membership():
+    """Expire subscriptions of users who left and kick members without one."""
+    try:
+        from app.services.group_member_service import GroupMemberService
+
+        config = flask_app.config
+        summary = GroupMemberService.reconcile(
+            kick_intruders=config["MEMBERSHIP_RECONCILE_KICK_INTRUDERS"],
+            batch_size=config["MEMBERSHIP_RECONCILE_BATCH_SIZE"],
+            grace_seconds=config["MEMBERSHIP_RECONCILE_GRACE_SECONDS"],
+        )
+        logger.info(f"Group membership reconciled: {summary}")
+    except Exception as e:
+        logger.error(f"Error reconciling group membership: {e}")
+
+
+def verify_telegram_groups():
+    """Check known groups against Telegram and record renames/removals/migrations."""
+    try:
+        from app.services.telegram import tg_bot
+
+        if not tg_bot.bots:
+            return
+        tg_bot.verify_groups(batch_size=flask_app.config["GROUP_VERIFY_BATCH_SIZE"])
+    except Exception as e:
+        logger.error(f"Error verifying Telegram groups: {e}")
+
+
+def archive_subscriptions():
+    """Move old expired and cancelled subscriptions to the archive table."""
+    try:
+        from app.services.subscription_archive_service import SubscriptionArchiveService
+
+        archived = SubscriptionArchiveService.archive(
+            older_than_days=flask_app.config["SUBSCRIPTION_ARCHIVE_AFTER_DAYS"],
+            batch_size=flask_app.config["SUBSCRIPTION_ARCHIVE_BATCH_SIZE"],
+        )
+        if archived:
+            logger.info(f"Archived {archived} subscriptions")
+    except Exception as e:
+        logger.error(f"Error archiving subscriptions: {e}")
+
+
+def reap_stale_pending_joins():
+    """Revoke unused invite links and expire subscriptions that never joined."""
+    try:
+        from app.services.pending_join_service import PendingJoinService
+
+        config = flask_app.config
+        PendingJoinService.reap(
+            ttl_hours=config["PENDING_JOIN_TTL_HOURS"],
+            batch_size=config["PENDING_REAPER_BATCH_SIZE"],
+            concurrency=config["PENDING_REAPER_CONCURRENCY"],
+        )
+    except Exception as e:
+        logger.error(f"Error reaping stale pending subscriptions: {e}")
+
+
+def purge_idempotency_keys():
+    """Delete stored Idempotency-Key responses past their TTL."""
+    try:
+        from app.services.idempotency_service import IdempotencyService
+
+        deleted = IdempotencyService.purge_expired()
+        if deleted:
+            logger.info(f"Purged {deleted} expired idempotency keys")
+    except Exception as e:
+        logger.error(f"Error purging idempotency keys: {e}")
+
+
+def init_scheduler(app):
     """Initialize the scheduler for subscription expiry checks."""
-    global scheduler
+    global scheduler, flask_app
+    from apscheduler.schedulers.background import BackgroundScheduler
 
     if scheduler:
         scheduler.shutdown()
 
+    flask_app = app
     scheduler = BackgroundScheduler()
 
-    # Check for expired subscriptions every hour
-    scheduler.add_job(check_expired_subscriptions, "interval", hours=1)
+    # Check for recently expired subscriptions every hour, and sweep the whole
+    # table once a day for anything older that was missed
+    scheduler.add_job(
+        _with_app_context(
+            check_expired_subscriptions,
+            lookback_days=app.config["EXPIRY_SWEEP_LOOKBACK_DAYS"],
+        ),
+        "interval",
+        hours=1,
+    )
+    scheduler.add_job(
+        _with_app_context(check_expired_subscriptions), "interval", days=1
+    )
+
+    # Keep audit log partitions created ahead of time
+    scheduler.add_job(
+        _with_app_context(ensure_event_partitions),
+        "interval",
+        days=1,
+        next_run_time=datetime.now(),
+    )
+
+    # Keep monthly subscription partitions created ahead of time
+    scheduler.add_job(
+        _with_app_context(ensure_subscription_partitions),
+        "interval",
+        days=1,
+        next_run_time=datetime.now(),
+    )
+
+    # Correct any drift in the membership counters
+    scheduler.add_job(
+        _with_app_context(reconcile_membership_counters), "interval", hours=6
+    )
+
+    # Act on drift between group rosters and subscriptions
+    scheduler.add_job(
+        _with_app_context(reconcile_group_membership),
+        "interval",
+        minutes=app.config["MEMBERSHIP_RECONCILE_INTERVAL_MINUTES"],
+    )
+
+    # Catch group changes the update stream missed, starting shortly after boot
+    scheduler.add_job(
+        _with_app_context(verify_telegram_groups),
+        "interval",
+        hours=app.config["GROUP_VERIFY_INTERVAL_HOURS"],
+        next_run_time=datetime.now() + timedelta(minutes=1),
+    )
+
+    # Keep the subscriptions table down to live and recent rows
+    scheduler.add_job(_with_app_context(archive_subscriptions), "interval", days=1)
+
+    # Revoke invite links nobody used and expire their subscriptions
+    scheduler.add_job(
+        _with_app_context(reap_stale_pending_joins),
+        "interval",
+        minutes=app.config["PENDING_REAPER_INTERVAL_MINUTES"],
+    )
+
+    # Evict expired idempotency keys
+    scheduler.add_job(
+        _with_app_context(purge_idempotency_keys), "interval", hours=1
+    )
 
     scheduler.start()
+    from app.lifecycle import lifecycle
+    lifecycle.register("scheduler", shutdown_scheduler)
     logger.info("Subscription scheduler initialized")
 
 
-def shutdown_scheduler():
-    """Shutdown the scheduler."""
+def shutdown_scheduler(timeout=None):
+    """Shutdown the scheduler.
+
+    No job starts after this; running jobs get up to ``timeout`` seconds
+    (no limit if None) to finish. Returns how many were drained and how
+    many were still running.
+    """
     global scheduler
-    if scheduler:
-        scheduler.shutdown()
-        logger.info("Subscription scheduler shutdown")
+    report = {"jobs_drained": 0, "jobs_abandoned": 0}
+    if not scheduler:
+        return report
+    scheduler.shutdown(wait=False)
+    scheduler = None
+
+    deadline = None if timeout is None else time.monotonic() + timeout
+    with _jobs_idle:
+        running = _running_jobs
+        while _running_jobs:
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                break
+            _jobs_idle.wait(remaining)
+        report["jobs_abandoned"] = _running_jobs
+        report["jobs_drained"] = max(0, running - _running_jobs)
+    logger.info("Subscription scheduler shutdown")
+    return report
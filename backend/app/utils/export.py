@@ -0,0 +1,81 @@
+import csv
+import io
+import json
+from datetime import datetime
+from flask import Response, stream_with_context
+
+EXPORT_FORMATS = ("ndjson", "csv")
+
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+
+def _flatten(row, prefix=""):
+    """Flatten nested dicts into dotted keys, e.g. {"user": {"id": 1}} -> user.id"""
+    flat = {}
+    for key, value in row.items():
+        if isinstance(value, dict):
+            flat.update(_flatten(value, f"{prefix}{key}."))
+        else:
+            flat[f"{prefix}{key}"] = value
+    return flat
+
+
+def iter_ndjson(rows, chunk_size=500):
+    """Serialize rows one JSON document per line, yielding chunk_size rows at a time"""
+    chunk = []
+    for row in rows:
+        chunk.append(json.dumps(row, default=_json_default))
+        if len(chunk) >= chunk_size:
+            yield "\n".join(chunk) + "\n"
+            chunk = []
+    if chunk:
+        yield "\n".join(chunk) + "\n"
+
+
+def iter_csv(rows, chunk_size=500):
+    """Serialize rows as CSV with a header taken from the first row"""
+    buffer = io.StringIO()
+    writer = None
+    pending = 0
+    for row in rows:
+        row = _flatten(row)
+        if writer is None:
+            writer = csv.DictWriter(buffer, fieldnames=list(row.keys()))
+            writer.writeheader()
+        writer.writerow(
+            {k: v.isoformat() if isinstance(v, datetime) else v for k, v in row.items()}
+        )
+        pending += 1
+        if pending >= chunk_size:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+            pending = 0
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def export_response(rows, export_format, filename):
+    """Build a streaming response for rows in the requested format.
+
+    Rows are consumed lazily while the response is sent, so the full result
+    set is never held in memory.
+    """
+    if export_format == "csv":
+        body, mimetype = iter_csv(rows), "text/csv"
+    else:
+        body, mimetype = iter_ndjson(rows), "application/x-ndjson"
+
+    return Response(
+        stream_with_context(body),
+        mimetype=mimetype,
+        headers={
+            "Content-Disposition": f'attachment; filename="{filename}.{export_format}"',
+            # Keep nginx from buffering the whole export before sending it
+            "X-Accel-Buffering": "no",
+        },
+    )
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""Micro-benchmark of per-row response serialization cost.
+
+Compares the previous path (marshmallow dump, then flask-restx marshal, then
+json.dumps) with the compiled serializers in app.serialization. Rows are
+transient ORM objects, so no database is needed. Run from the backend
+directory:
+
+    python benchmarks/serialization.py --rows 2000
+"""
+import argparse
+import json
+import os
+import sys
+import timeit
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask_restx import marshal  # noqa: E402
+
+from app.models import Product, Subscription, TelegramGroup, User  # noqa: E402
+from app.schemas import products_schema, subscriptions_schema  # noqa: E402
+from app.serialization import compile_serializer, dumps  # noqa: E402
+from app.swagger_config import product_model, subscription_model  # noqa: E402
+
+
+def build_rows(count):
+    now = datetime.now(timezone.utc)
+    products, subscriptions = [], []
+    for i in range(count):
+        product = Product(
+            id=f"prod-{i}", name=f"Product {i}", description="Description",
+            created_at=now, updated_at=now,
+        )
+        group = TelegramGroup(
+            id=i, telegram_group_id=str(-1000000 - i), telegram_group_name=f"Group {i}",
+            product_id=product.id, is_active=True, created_at=now, updated_at=now,
+        )
+        product.telegram_groups = [group]
+        user = User(id=i, email=f"user{i}@example.com", telegram_user_id=str(i))
+        subscription = Subscription(
+            id=i, user_id=i, product_id=product.id, telegram_group_id=i,
+            status="active", invite_link_url="https://t.me/+abc",
+            invite_link_token=f"token-{i}", invite_link_expires_at=now,
+            subscription_starts_at=now, subscription_expires_at=now + timedelta(days=30),
+            created_at=now, updated_at=now,
+        )
+        subscription.user, subscription.product, subscription.telegram_group = user, product, group
+        products.append(product)
+        subscriptions.append(subscription)
+    return products, subscriptions
+
+
+def old_path(schema, model, rows):
+    return json.dumps(marshal(schema.dump(rows), model)).encode()
+
+
+def new_path(model, rows):
+    serializer = compile_serializer(model)
+    return dumps([serializer(row) for row in rows])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    products, subscriptions = build_rows(args.rows)
+    cases = [
+        ("products", products_schema, product_model, products),
+        ("subscriptions", subscriptions_schema, subscription_model, subscriptions),
+    ]
+    for name, schema, model, rows in cases:
+        before = min(timeit.repeat(lambda: old_path(schema, model, rows), number=1, repeat=args.repeat))
+        after = min(timeit.repeat(lambda: new_path(model, rows), number=1, repeat=args.repeat))
+        print(
+            f"{name:14s} before {before / len(rows) * 1e6:7.2f} us/row  "
+            f"after {after / len(rows) * 1e6:7.2f} us/row  ({before / after:.1f}x)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""Cold-start benchmark for the backend.
+
+Each scenario runs in a fresh interpreter so module caches don't hide import
+cost. Run from the backend directory:
+
+    python benchmarks/startup_time.py --runs 5
+    python benchmarks/startup_time.py --importtime   # show slowest imports
+
+Scenarios:
+    app        create_app() with background services disabled
+    migrate    `flask db heads`, the same app loading path as `flask db upgrade`
+    worker     `run:app` import as gunicorn does it, bot and scheduler included
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+HEAVY_MODULES = ("telegram", "apscheduler")
+
+SCENARIOS = {
+    "app": {
+        "cmd": [sys.executable, "-c", "from app import create_app; create_app()"],
+        "env": {"START_BACKGROUND_SERVICES": "0"},
+    },
+    "migrate": {
+        "cmd": [sys.executable, "-m", "flask", "--app", "run:app", "db", "heads"],
+        "env": {},
+    },
+    "worker": {
+        "cmd": [sys.executable, "-c", "import run"],
+        "env": {"START_BACKGROUND_SERVICES": "1"},
+    },
+}
+
+
+def _env(extra):
+    env = dict(os.environ)
+    # A throwaway database keeps the benchmark runnable without PostgreSQL;
+    # engines are created lazily so no connection is made either way.
+    env.setdefault("DATABASE_URL", "sqlite://")
+    env.update(extra)
+    return env
+
+
+def time_scenario(name, runs):
+    scenario = SCENARIOS[name]
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(
+            scenario["cmd"],
+            cwd=BACKEND_DIR,
+            env=_env(scenario["env"]),
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            check=True,
+        )
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def import_profile(name, top):
+    """Return (slowest imports, heavy top-level packages loaded) for a scenario"""
+    scenario = SCENARIOS[name]
+    cmd = [scenario["cmd"][0], "-X", "importtime"] + scenario["cmd"][1:]
+    proc = subprocess.run(
+        cmd,
+        cwd=BACKEND_DIR,
+        env=_env(scenario["env"]),
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        text=True,
+        check=True,
+    )
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _self_us, cumulative_us, module = (
+            part.strip() for part in line.split(":", 1)[1].split("|")
+        )
+        rows.append((int(cumulative_us), module))
+    loaded = sorted({m.split(".")[0] for _, m in rows} & set(HEAVY_MODULES))
+    rows.sort(reverse=True)
+    return rows[:top], loaded
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument(
+        "--scenario", choices=sorted(SCENARIOS), action="append",
+        help="Scenario to run (repeatable, default: all)",
+    )
+    parser.add_argument("--importtime", action="store_true")
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+
+    for name in args.scenario or list(SCENARIOS):
+        samples = time_scenario(name, args.runs)
+        print(
+            f"{name:8s} median {statistics.median(samples) * 1000:7.1f} ms  "
+            f"min {min(samples) * 1000:7.1f} ms  ({args.runs} runs)"
+        )
+        if args.importtime:
+            rows, loaded = import_profile(name, args.top)
+            print(f"         heavy packages loaded: {', '.join(loaded) or 'none'}")
+            for cumulative_us, module in rows:
+                print(f"         {cumulative_us / 1000:7.1f} ms  {module}")
+
+
+if __name__ == "__main__":
+    main()
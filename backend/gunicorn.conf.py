@@ -0,0 +1,15 @@
+import os
+
+worker_class = "gevent"
+workers = 1
+bind = "0.0.0.0:5000"
+
+# Leave the worker time to drain the bot, scheduler and audit log after its
+# last request (see app.lifecycle)
+graceful_timeout = float(os.environ.get("SHUTDOWN_TIMEOUT_SECONDS", "20")) + 10
+
+
+def worker_exit(server, worker):
+    from app.lifecycle import lifecycle
+
+    lifecycle.shutdown("worker_exit")
@@ -97,6 +97,10 @@ def run_migrations_online():
     connectable = get_engine()
 
     with connectable.connect() as connection:
+        if connection.dialect.name == 'postgresql' and not current_app.config.get('DB_PGBOUNCER'):
+            # Migrations may rewrite large tables; the web statement_timeout
+            # configured on the engine does not apply to them
+            connection.exec_driver_sql('SET statement_timeout = 0')
         context.configure(
             connection=connection,
             target_metadata=get_metadata(),
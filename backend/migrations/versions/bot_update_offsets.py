@@ -0,0 +1,29 @@
+"""add bot_update_offsets for update stream tracking
+
+Revision ID: bot_update_offsets
+Revises: group_members
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'bot_update_offsets'
+down_revision = 'group_members'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('bot_update_offsets',
+    sa.Column('bot_id', sa.String(length=20), nullable=False),
+    sa.Column('update_id', sa.BigInteger(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('bot_id')
+    )
+
+
+def downgrade():
+    op.drop_table('bot_update_offsets')
@@ -0,0 +1,29 @@
+"""add owning bot to telegram_groups
+
+Revision ID: group_bot_owner
+Revises: idempotency_keys
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'group_bot_owner'
+down_revision = 'idempotency_keys'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Existing groups keep NULL, i.e. stay with the primary bot
+    with op.batch_alter_table('telegram_groups', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('bot_id', sa.String(length=20), nullable=True))
+        batch_op.create_index('ix_telegram_groups_bot_id', ['bot_id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('telegram_groups', schema=None) as batch_op:
+        batch_op.drop_index('ix_telegram_groups_bot_id')
+        batch_op.drop_column('bot_id')
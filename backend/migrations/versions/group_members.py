@@ -0,0 +1,36 @@
+"""add group_members roster for membership reconciliation
+
+Revision ID: group_members
+Revises: group_bot_owner
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'group_members'
+down_revision = 'group_bot_owner'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('group_members',
+    sa.Column('telegram_group_id', sa.Integer(), nullable=False),
+    sa.Column('telegram_user_id', sa.String(length=100), nullable=False),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('changed_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['telegram_group_id'], ['telegram_groups.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('telegram_group_id', 'telegram_user_id')
+    )
+    op.create_index('ix_group_members_group_status', 'group_members', ['telegram_group_id', 'status'], unique=False)
+    # Lets the reconciliation diff look up live subscriptions per group and user
+    op.create_index('ix_subscriptions_group_status_user', 'subscriptions', ['telegram_group_id', 'status', 'user_id'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_subscriptions_group_status_user', table_name='subscriptions')
+    op.drop_index('ix_group_members_group_status', table_name='group_members')
+    op.drop_table('group_members')
@@ -0,0 +1,41 @@
+"""add materialized membership counters
+
+Revision ID: membership_counters
+Revises: subscription_events
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'membership_counters'
+down_revision = 'subscription_events'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('membership_counters',
+    sa.Column('product_id', sa.String(length=24), nullable=False),
+    sa.Column('telegram_group_id', sa.Integer(), nullable=False),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('count', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['product_id'], ['products.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['telegram_group_id'], ['telegram_groups.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('product_id', 'telegram_group_id', 'status')
+    )
+
+    # Backfill from existing subscriptions
+    op.execute("""
+        INSERT INTO membership_counters (product_id, telegram_group_id, status, count)
+        SELECT product_id, telegram_group_id, status, COUNT(*)
+        FROM subscriptions
+        WHERE status IS NOT NULL
+        GROUP BY product_id, telegram_group_id, status
+    """)
+
+
+def downgrade():
+    op.drop_table('membership_counters')
@@ -0,0 +1,153 @@
+"""partition subscriptions by expiry month
+
+Revision ID: partition_subscriptions
+Revises: subscriptions_archive
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+from datetime import date
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'partition_subscriptions'
+down_revision = 'subscriptions_archive'
+branch_labels = None
+depends_on = None
+
+COLUMNS = (
+    'id, user_id, product_id, telegram_group_id, invite_link_token, invite_link_url, '
+    'invite_link_expires_at, subscription_starts_at, subscription_expires_at, status, '
+    'created_at, updated_at'
+)
+
+# Monthly partitions are created for this window around the migration date;
+# rows outside it land in the default partition until the scheduler carves
+# out their month (or the archiver moves them out)
+MONTHS_BEHIND = 12
+MONTHS_AHEAD = 12
+
+
+def _add_months(day, months):
+    month = day.month - 1 + months
+    return date(day.year + month // 12, month % 12 + 1, 1)
+
+
+def upgrade():
+    bind = op.get_bind()
+    if bind.dialect.name != 'postgresql':
+        op.create_index('ix_subscriptions_status_expires_at', 'subscriptions', ['status', 'subscription_expires_at'], unique=False)
+        return
+
+    # Keep the id sequence, move the old heap aside
+    op.execute("ALTER SEQUENCE subscriptions_id_seq OWNED BY NONE")
+    op.execute("ALTER TABLE subscriptions RENAME TO subscriptions_unpartitioned")
+    op.execute(
+        "ALTER TABLE subscriptions_unpartitioned "
+        "RENAME CONSTRAINT subscriptions_pkey TO subscriptions_unpartitioned_pkey"
+    )
+    op.execute(
+        "ALTER TABLE subscriptions_unpartitioned "
+        "DROP CONSTRAINT subscriptions_invite_link_token_key"
+    )
+    op.drop_index('ix_subscriptions_group_status_user', table_name='subscriptions_unpartitioned')
+
+    # The partition key has to be part of the primary key, and a unique
+    # constraint on invite_link_token alone is not possible any more
+    op.execute("""
+        CREATE TABLE subscriptions (
+            id INTEGER NOT NULL DEFAULT nextval('subscriptions_id_seq'),
+            user_id INTEGER NOT NULL,
+            product_id VARCHAR(24) NOT NULL,
+            telegram_group_id INTEGER NOT NULL,
+            invite_link_token VARCHAR(255),
+            invite_link_url VARCHAR(512),
+            invite_link_expires_at TIMESTAMP WITHOUT TIME ZONE,
+            subscription_starts_at TIMESTAMP WITHOUT TIME ZONE,
+            subscription_expires_at TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+            status VARCHAR(20),
+            created_at TIMESTAMP WITHOUT TIME ZONE,
+            updated_at TIMESTAMP WITHOUT TIME ZONE,
+            CONSTRAINT subscriptions_pkey PRIMARY KEY (id, subscription_expires_at),
+            CONSTRAINT subscriptions_user_id_fkey FOREIGN KEY (user_id) REFERENCES users (id),
+            CONSTRAINT subscriptions_product_id_fkey FOREIGN KEY (product_id) REFERENCES products (id),
+            CONSTRAINT subscriptions_telegram_group_id_fkey FOREIGN KEY (telegram_group_id) REFERENCES telegram_groups (id)
+        ) PARTITION BY RANGE (subscription_expires_at)
+    """)
+    op.execute("CREATE TABLE subscriptions_default PARTITION OF subscriptions DEFAULT")
+
+    this_month = date.today().replace(day=1)
+    oldest = bind.execute(
+        sa.text("SELECT min(subscription_expires_at) FROM subscriptions_unpartitioned")
+    ).scalar()
+    start = _add_months(this_month, -MONTHS_BEHIND)
+    if oldest is not None:
+        start = max(start, oldest.date().replace(day=1))
+    start = min(start, this_month)
+    last = _add_months(this_month, MONTHS_AHEAD)
+    while start <= last:
+        end = _add_months(start, 1)
+        op.execute(
+            f"CREATE TABLE subscriptions_y{start.year}m{start.month:02d} "
+            f"PARTITION OF subscriptions "
+            f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+        )
+        start = end
+
+    op.execute(
+        f"INSERT INTO subscriptions ({COLUMNS}) "
+        f"SELECT {COLUMNS} FROM subscriptions_unpartitioned"
+    )
+    op.execute("DROP TABLE subscriptions_unpartitioned")
+    op.execute("ALTER SEQUENCE subscriptions_id_seq OWNED BY subscriptions.id")
+
+    op.create_index('ix_subscriptions_invite_link_token', 'subscriptions', ['invite_link_token'], unique=False)
+    op.create_index('ix_subscriptions_group_status_user', 'subscriptions', ['telegram_group_id', 'status', 'user_id'], unique=False)
+    op.create_index('ix_subscriptions_status_expires_at', 'subscriptions', ['status', 'subscription_expires_at'], unique=False)
+
+
+def downgrade():
+    bind = op.get_bind()
+    if bind.dialect.name != 'postgresql':
+        op.drop_index('ix_subscriptions_status_expires_at', table_name='subscriptions')
+        return
+
+    op.execute("ALTER SEQUENCE subscriptions_id_seq OWNED BY NONE")
+    op.execute("ALTER TABLE subscriptions RENAME TO subscriptions_partitioned")
+    op.execute(
+        "ALTER TABLE subscriptions_partitioned "
+        "RENAME CONSTRAINT subscriptions_pkey TO subscriptions_partitioned_pkey"
+    )
+    op.drop_index('ix_subscriptions_invite_link_token', table_name='subscriptions_partitioned')
+    op.drop_index('ix_subscriptions_group_status_user', table_name='subscriptions_partitioned')
+    op.drop_index('ix_subscriptions_status_expires_at', table_name='subscriptions_partitioned')
+
+    op.create_table('subscriptions',
+    sa.Column('id', sa.Integer(), server_default=sa.text("nextval('subscriptions_id_seq')"), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('product_id', sa.String(length=24), nullable=False),
+    sa.Column('telegram_group_id', sa.Integer(), nullable=False),
+    sa.Column('invite_link_token', sa.String(length=255), nullable=True),
+    sa.Column('invite_link_url', sa.String(length=512), nullable=True),
+    sa.Column('invite_link_expires_at', sa.DateTime(), nullable=True),
+    sa.Column('subscription_starts_at', sa.DateTime(), nullable=True),
+    sa.Column('subscription_expires_at', sa.DateTime(), nullable=False),
+    sa.Column('status', sa.String(length=20), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['product_id'], ['products.id'], name='subscriptions_product_id_fkey'),
+    sa.ForeignKeyConstraint(['telegram_group_id'], ['telegram_groups.id'], name='subscriptions_telegram_group_id_fkey'),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], name='subscriptions_user_id_fkey'),
+    sa.PrimaryKeyConstraint('id', name='subscriptions_pkey'),
+    sa.UniqueConstraint('invite_link_token', name='subscriptions_invite_link_token_key')
+    )
+    op.execute(
+        f"INSERT INTO subscriptions ({COLUMNS}) "
+        f"SELECT {COLUMNS} FROM subscriptions_partitioned"
+    )
+    # Dropping a partitioned table drops all of its partitions as well
+    op.execute("DROP TABLE subscriptions_partitioned")
+    op.execute("ALTER SEQUENCE subscriptions_id_seq OWNED BY subscriptions.id")
+    op.create_index('ix_subscriptions_group_status_user', 'subscriptions', ['telegram_group_id', 'status', 'user_id'], unique=False)
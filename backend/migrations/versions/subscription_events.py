@@ -0,0 +1,74 @@
+"""add subscription events audit log
+
+Revision ID: subscription_events
+Revises: merge_heads
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+from datetime import date
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'subscription_events'
+down_revision = 'merge_heads'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    bind = op.get_bind()
+    if bind.dialect.name != 'postgresql':
+        op.create_table('subscription_events',
+        sa.Column('id', sa.BigInteger(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('subscription_id', sa.Integer(), nullable=False),
+        sa.Column('event_type', sa.String(length=32), nullable=False),
+        sa.Column('telegram_user_id', sa.String(length=100), nullable=True),
+        sa.Column('details', sa.JSON(), nullable=True),
+        sa.PrimaryKeyConstraint('id', 'created_at')
+        )
+    else:
+        # Range-partitioned by month; the partition key must be part of the PK
+        op.execute("""
+            CREATE TABLE subscription_events (
+                id BIGSERIAL NOT NULL,
+                created_at TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+                subscription_id INTEGER NOT NULL,
+                event_type VARCHAR(32) NOT NULL,
+                telegram_user_id VARCHAR(100),
+                details JSON,
+                PRIMARY KEY (id, created_at)
+            ) PARTITION BY RANGE (created_at)
+        """)
+        op.execute(
+            "CREATE TABLE subscription_events_default "
+            "PARTITION OF subscription_events DEFAULT"
+        )
+        # Current month plus two ahead; the scheduler keeps creating the rest
+        start = date.today().replace(day=1)
+        for _ in range(3):
+            end = date(start.year + start.month // 12, start.month % 12 + 1, 1)
+            op.execute(
+                f"CREATE TABLE subscription_events_y{start.year}m{start.month:02d} "
+                f"PARTITION OF subscription_events "
+                f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+            )
+            start = end
+
+    op.create_index(
+        'ix_subscription_events_subscription_id_created_at',
+        'subscription_events',
+        ['subscription_id', 'created_at'],
+    )
+
+
+def downgrade():
+    op.drop_index(
+        'ix_subscription_events_subscription_id_created_at',
+        table_name='subscription_events',
+    )
+    # Dropping a partitioned table drops all of its partitions as well
+    op.drop_table('subscription_events')
@@ -0,0 +1,43 @@
+"""add subscriptions_archive for terminal subscriptions
+
+Revision ID: subscriptions_archive
+Revises: bot_update_offsets
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'subscriptions_archive'
+down_revision = 'bot_update_offsets'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('subscriptions_archive',
+    sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('product_id', sa.String(length=24), nullable=False),
+    sa.Column('telegram_group_id', sa.Integer(), nullable=False),
+    sa.Column('invite_link_token', sa.String(length=255), nullable=True),
+    sa.Column('invite_link_url', sa.String(length=512), nullable=True),
+    sa.Column('invite_link_expires_at', sa.DateTime(), nullable=True),
+    sa.Column('subscription_starts_at', sa.DateTime(), nullable=True),
+    sa.Column('subscription_expires_at', sa.DateTime(), nullable=False),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.Column('archived_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_subscriptions_archive_user_id', 'subscriptions_archive', ['user_id'], unique=False)
+    op.create_index('ix_subscriptions_archive_product_id', 'subscriptions_archive', ['product_id'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_subscriptions_archive_product_id', table_name='subscriptions_archive')
+    op.drop_index('ix_subscriptions_archive_user_id', table_name='subscriptions_archive')
+    op.drop_table('subscriptions_archive')
@@ -0,0 +1,38 @@
+"""add table_versions for conditional GET caching
+
+Revision ID: table_versions
+Revises: user_lookup_indexes
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'table_versions'
+down_revision = 'user_lookup_indexes'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    table_versions = op.create_table(
+        'table_versions',
+        sa.Column('name', sa.String(length=64), nullable=False),
+        sa.Column('version', sa.BigInteger(), nullable=False, server_default='0'),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('name'),
+    )
+    op.execute(
+        table_versions.insert().from_select(
+            ['name', 'version', 'updated_at'],
+            sa.select(sa.literal('products'), sa.literal(1), sa.func.now()).union_all(
+                sa.select(sa.literal('telegram_groups'), sa.literal(1), sa.func.now())
+            ),
+        )
+    )
+
+
+def downgrade():
+    op.drop_table('table_versions')
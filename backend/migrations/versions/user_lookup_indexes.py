@@ -0,0 +1,37 @@
+"""add prefix search indexes for user lookup
+
+Revision ID: user_lookup_indexes
+Revises: membership_counters
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'user_lookup_indexes'
+down_revision = 'membership_counters'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # text_pattern_ops lets PostgreSQL use the index for LIKE 'prefix%'
+    # regardless of the database collation
+    ops = ' text_pattern_ops' if op.get_bind().dialect.name == 'postgresql' else ''
+    op.create_index(
+        'ix_users_email_lower_prefix',
+        'users',
+        [sa.text(f'lower(email){ops}')],
+    )
+    op.create_index(
+        'ix_users_telegram_username_lower_prefix',
+        'users',
+        [sa.text(f'lower(telegram_username){ops}')],
+    )
+
+
+def downgrade():
+    op.drop_index('ix_users_telegram_username_lower_prefix', table_name='users')
+    op.drop_index('ix_users_email_lower_prefix', table_name='users')
@@ -1,9 +1,9 @@
 import { useState, useEffect, useRef } from "react";
 import {
   getSubscriptions,
-  getProducts,
+  getProductsSummary,
   cancelSubscription,
-  getUsers,
+  lookupUsers,
 } from "../../services/api";
 import { debounce } from "lodash";
 
@@ -11,6 +11,7 @@ function Subscriptions() {
   const [subscriptions, setSubscriptions] = useState([]);
   const [products, setProducts] = useState([]);
   const [users, setUsers] = useState([]);
+  const [userQuery, setUserQuery] = useState("");
   const tableRef = useRef(null);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState(null);
@@ -61,12 +62,7 @@ function Subscriptions() {
         params.append("user_id", filter.userId);
       }
 
-      const [subscriptionsResponse, productsResponse, usersResponse] =
-        await Promise.all([
-          getSubscriptions(params),
-          getProducts(),
-          getUsers(),
-        ]);
+      const subscriptionsResponse = await getSubscriptions(params);
 
       setSubscriptions(subscriptionsResponse.data.items);
       setPagination({
@@ -75,8 +71,6 @@ function Subscriptions() {
         total: subscriptionsResponse.data.total,
         pages: subscriptionsResponse.data.pages,
       });
-      setProducts(productsResponse.data);
-      setUsers(usersResponse.data);
       setLoading(false);
 
       // Restore scroll position after data is loaded
@@ -97,6 +91,26 @@ function Subscriptions() {
     fetchData();
   }, 500);
 
+  // Product names for the filter only need loading once
+  useEffect(() => {
+    getProductsSummary()
+      .then((response) => setProducts(response.data))
+      .catch(() => setError("Failed to load products."));
+  }, []);
+
+  // Users for the filter are looked up by prefix as the admin types
+  const debouncedUserLookup = debounce((query) => {
+    lookupUsers({ q: query || undefined, limit: 20 })
+      .then((response) => setUsers(response.data.items))
+      .catch(() => setError("Failed to load users."));
+  }, 300);
+
+  useEffect(() => {
+    debouncedUserLookup(userQuery);
+    return () => debouncedUserLookup.cancel();
+    // eslint-disable-next-line react-hooks/exhaustive-deps
+  }, [userQuery]);
+
   useEffect(() => {
     fetchData();
     // eslint-disable-next-line react-hooks/exhaustive-deps
@@ -334,6 +348,13 @@ function Subscriptions() {
             >
               Filter by User
             </label>
+            <input
+              type="text"
+              className="shadow appearance-none border rounded w-full py-2 px-3 mb-2 text-gray-700 leading-tight focus:outline-none focus:shadow-outline"
+              placeholder="Search email or username..."
+              value={userQuery}
+              onChange={(e) => setUserQuery(e.target.value)}
+            />
             <select
               className="shadow appearance-none border rounded w-full py-2 px-3 text-gray-700 leading-tight focus:outline-none focus:shadow-outline"
               id="userId"
@@ -6,6 +6,7 @@ const api = axios.create({
 
 // Products
 export const getProducts = () => api.get('/products')
+export const getProductsSummary = () => api.get('/products/summary')
 export const getProduct = (id) => api.get(`/products/${id}`)
 export const createProduct = (data) => api.post('/products', data)
 export const updateProduct = (id, data) => api.put(`/products/${id}`, data)
@@ -21,8 +22,10 @@ export const unmapProduct = (productId) => api.delete(`/products/${productId}/un
 export const getSubscriptions = (params) => api.get('/subscriptions', { params })
 export const createSubscription = (data) => api.post('/subscribe', data)
 export const cancelSubscription = (id) => api.post(`/subscriptions/${id}/cancel`)
+export const getMembershipStats = (params) => api.get('/subscriptions/stats', { params })
 
 // Users
 export const getUsers = () => api.get('/users')
+export const lookupUsers = (params) => api.get('/users/lookup', { params })
 
 export default api
\ No newline at end of file